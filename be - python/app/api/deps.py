@@ -8,12 +8,20 @@ from app.core.config import settings
 from app.db.database import get_db
 from app.models.user import User
 from app.schemas.auth import TokenPayload
+from app.core.token_revocation import token_revocations
+from uuid import UUID
+from app.core.principal import (
+    Principal,
+    PRINCIPAL_COLUMNS,
+    get_cached_principal,
+    cache_principal,
+    principal_cache,
+)
 from functools import wraps
 from typing import Callable
 from enum import Enum
 from typing import List, Union
 import asyncio
-from sqlalchemy.orm import selectinload
 import logging
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -49,64 +57,134 @@ def public_endpoint(func: Callable):
         return func(*args, **kwargs)
     return sync_wrapper
 
+# Endpoint -> catalog namespaces, dùng bởi ConditionalGetMiddleware
+conditional_endpoints: dict[str, tuple[str, ...]] = {}
+
+def conditional_get(*namespaces: str):
+    """
+    Decorator enabling ETag / Last-Modified validation for a public GET.
+    `namespaces` are the catalog namespaces (app.core.cache) the response
+    is built from.
+    """
+    def decorator(func: Callable):
+        conditional_endpoints[f"{func.__module__}.{func.__name__}"] = tuple(namespaces)
+        return func
+    return decorator
+
+upload_endpoints: dict[str, int] = {}
+
+def upload_endpoint(max_bytes: int = settings.UPLOAD_MAX_BYTES):
+    """
+    Decorator capping the request body of a file upload endpoint: bodies
+    over `max_bytes` (plus multipart overhead) get 413 before they are read.
+    """
+    def decorator(func: Callable):
+        upload_endpoints[f"{func.__module__}.{func.__name__}"] = max_bytes
+        return func
+    return decorator
+
 logger = logging.getLogger(__name__)
 
+def decode_request_token(request: Request) -> tuple[dict, TokenPayload]:
+    """Verify the Bearer token set by the middleware and check it is not revoked"""
+    # Get token from request state (set by middleware)
+    token = getattr(request.state, "token", None)
+    logger.debug(f"Token from request state: {token[:10] if token else None}...")
+
+    if not token:
+        logger.error("No token found in request state")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+
+    try:
+        logger.debug("Attempting to decode token...")
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+        token_data = TokenPayload(**payload)
+        logger.debug(f"Token decoded successfully for user ID: {token_data.sub}")
+    except (JWTError, ValueError) as e:
+        logger.error(f"Token validation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+    if token_revocations.is_revoked(token_data.sub, token_data.iat):
+        logger.error(f"Revoked token used for user ID: {token_data.sub}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+    return payload, token_data
+
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     try:
-        # Lấy đường dẫn của endpoint hiện tại
-        route = request.scope.get("route")
-        if route:
-            endpoint_path = f"{route.endpoint.__module__}.{route.endpoint.__qualname__}"
-            logger.debug(f"Current endpoint: {endpoint_path}")
-            if endpoint_path in public_endpoints:
-                logger.debug("Public endpoint detected")
-                return None
-
-        # Get token from request state (set by middleware)
-        token = getattr(request.state, "token", None)
-        logger.debug(f"Token from request state: {token[:10] if token else None}...")
-
-        if not token:
-            logger.error("No token found in request state")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not authenticated"
-            )
-            
-        try:
-            logger.debug("Attempting to decode token...")
-            payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-            )
-            token_data = TokenPayload(**payload)
-            logger.debug(f"Token decoded successfully for user ID: {token_data.sub}")
-        except (JWTError, ValueError) as e:
-            logger.error(f"Token validation failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
+        # Middleware đã xác định endpoint public từ bảng route compile sẵn
+        if getattr(request.state, "is_public", False):
+            logger.debug("Public endpoint detected")
+            return None
+
+        _, token_data = decode_request_token(request)
             
-        # Load user with all needed relationships
+        principal = get_cached_principal(token_data.sub, token_data.iat)
+        if principal is not None:
+            return principal
+
+        # Lấy version trước khi query để không cache dữ liệu cũ nếu user thay đổi trong lúc load
+        version = principal_cache.version
+        # Chỉ load các cột cần thiết, không kéo theo relationships
         result = await db.execute(
-            select(User)
+            select(*(getattr(User, column) for column in PRINCIPAL_COLUMNS))
             .where(User.id == token_data.sub)
-            .options(selectinload(User.role))
         )
-        user = result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if not user:
+        if not row:
             logger.error(f"User not found for ID: {token_data.sub}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
-            
-        logger.debug(f"User authenticated successfully: {user.email}")
-        return user
+
+        principal = Principal(*row)
+        cache_principal(token_data.sub, token_data.iat, principal, version)
+        logger.debug(f"User authenticated successfully: {principal.email}")
+        return principal
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Authentication error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+async def get_claims_principal(request: Request) -> Principal:
+    """
+    Principal built from the verified JWT claims only, without a DB round trip.
+    Use for read-only, role-gated endpoints; revocation is enforced through
+    the in-memory token_revocations list.
+    """
+    try:
+        payload, token_data = decode_request_token(request)
+        return Principal(
+            id=UUID(token_data.sub),
+            email=payload["email"],
+            name=payload["name"],
+            roleId=int(payload["roleId"]),
+            phone=payload.get("phone"),
+            address=payload.get("address"),
+            gender=payload.get("gender"),
+            avatar=payload.get("avatar"),
+            description=payload.get("description"),
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -1,26 +1,125 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
 import logging
+from typing import Dict, FrozenSet, Iterable, List, Pattern, Set, Tuple
+from starlette.routing import BaseRoute, Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.responses import ErrorResponse
 
 logger = logging.getLogger(__name__)
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        try:
-            # Lấy token từ Authorization header
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                # Lưu token vào request state
-                request.state.token = token
-                logger.debug(f"Token found in header: {token[:10]}...")
-            else:
-                logger.debug("No token found in Authorization header")
-                request.state.token = None
-
-        except Exception as e:
-            logger.error(f"Error in auth middleware: {str(e)}")
-            request.state.token = None
-
-        response = await call_next(request)
-        return response 
\ No newline at end of file
+ALL_METHODS: FrozenSet[str] = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+class AuthMiddleware:
+    """
+    Pure ASGI middleware that extracts the Bearer token into request.state.token
+    and rejects unauthenticated calls to protected routes.
+
+    Public/protected status is compiled once from the app routes and the
+    `public_endpoints` registry. A path is resolved the way the router does
+    it, first match in declaration order, so a parametrised public route
+    never claims a path that an earlier protected route serves. Static
+    paths are resolved at startup and only cost a dict lookup per request.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Iterable[BaseRoute],
+        public_endpoints: Set[str],
+        debug_headers: bool = False,
+    ) -> None:
+        self.app = app
+        self.debug_headers = debug_headers
+        # Mọi route theo đúng thứ tự router: (regex, methods, public)
+        self._routes: Tuple[Tuple[Pattern, FrozenSet[str], bool], ...] = ()
+        self._static: Dict[Tuple[str, str], bool] = {}
+        self._compile(routes, public_endpoints)
+
+    def _compile(self, routes: Iterable[BaseRoute], public_endpoints: Set[str]) -> None:
+        ordered: List[Tuple[Pattern, FrozenSet[str], bool]] = []
+        static_paths: List[str] = []
+
+        for route in routes:
+            path = getattr(route, "path", None)
+            regex = getattr(route, "path_regex", None)
+            if path is None or regex is None:
+                continue
+
+            if isinstance(route, Mount):
+                ordered.append((regex, ALL_METHODS, path in public_endpoints))
+                continue
+
+            endpoint = getattr(route, "endpoint", None)
+            endpoint_path = f"{endpoint.__module__}.{endpoint.__name__}" if endpoint else None
+            public = endpoint_path in public_endpoints or path in public_endpoints
+            methods = frozenset(getattr(route, "methods", None) or ALL_METHODS)
+            ordered.append((regex, methods, public))
+            if not getattr(route, "param_convertors", None):
+                static_paths.append(path)
+
+        self._routes = tuple(ordered)
+        self._static = {
+            (method, path): self._resolve(method, path)
+            for path in static_paths
+            for method in ALL_METHODS
+        }
+        logger.info(
+            f"Auth route table compiled: {len(self._routes)} routes, "
+            f"{sum(public for _, _, public in self._routes)} public"
+        )
+
+    def _resolve(self, method: str, path: str) -> bool:
+        # Giống router: route đầu tiên khớp cả path lẫn method sẽ xử lý request
+        for regex, methods, public in self._routes:
+            if method in methods and regex.match(path):
+                return public
+        return False
+
+    def is_public(self, method: str, path: str) -> bool:
+        public = self._static.get((method, path))
+        if public is not None:
+            return public
+        return self._resolve(method, path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Lấy token từ Authorization header
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                if value.startswith(b"Bearer "):
+                    token = value[7:].decode("latin-1")
+                break
+
+        method = scope["method"]
+        is_public = method == "OPTIONS" or self.is_public(method, scope["path"])
+
+        # Lưu vào request state (request.state.token / request.state.is_public)
+        state = scope.setdefault("state", {})
+        state["token"] = token
+        state["is_public"] = is_public
+
+        if self.debug_headers:
+            logger.info(f"Request headers: {scope['headers']}")
+            send = self._debug_send(send)
+
+        if not is_public and token is None:
+            response = ErrorResponse(
+                message="Not authenticated",
+                status_code=401,
+                error_type="Unauthorized"
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _debug_send(send: Send) -> Send:
+        async def wrapped(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                logger.info(f"Response headers: {message.get('headers')}")
+            await send(message)
+        return wrapped
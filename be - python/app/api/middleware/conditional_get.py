@@ -0,0 +1,112 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.conditional import catalog_validator, is_not_modified
+
+logger = logging.getLogger(__name__)
+
+class ConditionalGetMiddleware:
+    """
+    Pure ASGI middleware answering conditional GETs on catalog endpoints.
+
+    Routes marked with @conditional_get are compiled once from the app
+    routes. A matching GET/HEAD gets ETag / Last-Modified headers, and a
+    request whose If-None-Match / If-Modified-Since still matches receives
+    a 304 before the endpoint (and its queries) run.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Iterable[BaseRoute],
+        conditional_endpoints: Dict[str, Tuple[str, ...]],
+    ) -> None:
+        self.app = app
+        self._static: Dict[str, Tuple[str, ...]] = {}
+        self._dynamic: Tuple[Pattern, ...] = ()
+        # Mọi GET route theo đúng thứ tự router: (regex, namespaces hoặc None)
+        self._get_routes: Tuple[Tuple[Pattern, Optional[Tuple[str, ...]]], ...] = ()
+        self._compile(routes, conditional_endpoints)
+
+    def _compile(self, routes: Iterable[BaseRoute], conditional_endpoints: Dict[str, Tuple[str, ...]]) -> None:
+        dynamic: List[Pattern] = []
+        get_routes: List[Tuple[Pattern, Optional[Tuple[str, ...]]]] = []
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is None or "GET" not in (getattr(route, "methods", None) or ()):
+                continue
+            namespaces = conditional_endpoints.get(f"{endpoint.__module__}.{endpoint.__name__}")
+            get_routes.append((route.path_regex, namespaces))
+            if namespaces is None:
+                continue
+            if getattr(route, "param_convertors", None):
+                dynamic.append(route.path_regex)
+            else:
+                self._static[route.path] = namespaces
+
+        self._dynamic = tuple(dynamic)
+        self._get_routes = tuple(get_routes)
+        logger.info(
+            f"Conditional GET routes compiled: {len(self._static)} static, {len(self._dynamic)} parametrised"
+        )
+
+    def match(self, path: str) -> Optional[Tuple[str, ...]]:
+        namespaces = self._static.get(path)
+        if namespaces is not None:
+            return namespaces
+        if not any(regex.match(path) for regex in self._dynamic):
+            return None
+        # Route parametrised chỉ áp dụng nếu router cũng chọn nó (route khai báo trước được ưu tiên)
+        for regex, namespaces in self._get_routes:
+            if regex.match(path):
+                return namespaces
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        namespaces = self.match(scope["path"])
+        if namespaces is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            validator = await catalog_validator(namespaces)
+        except Exception as e:
+            # Không có validator thì phục vụ như request thường
+            logger.error(f"Catalog validator failed: {str(e)}")
+            await self.app(scope, receive, send)
+            return
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        etag = validator.etag(f"{scope['path']}?{query}")
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"etag", etag.encode("latin-1")),
+            # Được lưu nhưng phải xác thực lại mỗi lần dùng
+            (b"cache-control", b"no-cache"),
+        ]
+        last_modified = validator.last_modified_header()
+        if last_modified:
+            headers.append((b"last-modified", last_modified.encode("latin-1")))
+
+        request_headers = {name: value.decode("latin-1") for name, value in scope["headers"]
+                           if name in (b"if-none-match", b"if-modified-since")}
+        if is_not_modified(
+            etag,
+            validator.last_modified,
+            request_headers.get(b"if-none-match"),
+            request_headers.get(b"if-modified-since"),
+        ):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message = {**message, "headers": [*message.get("headers", []), *headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
@@ -0,0 +1,105 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+from fastapi import HTTPException, status
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.responses import ErrorResponse
+
+logger = logging.getLogger(__name__)
+
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+def too_large(max_bytes: int) -> str:
+    return f"File size too large. Maximum size is {max_bytes // (1024 * 1024)}MB"
+
+class UploadLimitMiddleware:
+    """
+    Pure ASGI middleware capping the request body of upload endpoints.
+
+    Starlette spools a whole multipart file to disk before the endpoint
+    runs, so the endpoint's own size check comes too late. Routes marked
+    with @upload_endpoint are compiled once from the app routes; a request
+    announcing a larger Content-Length gets 413 without its body being
+    read, and a chunked body is cut off with 413 as soon as it passes the
+    limit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Iterable[BaseRoute],
+        upload_endpoints: Dict[str, int],
+        overhead_bytes: int,
+    ) -> None:
+        self.app = app
+        # Body multipart gồm cả boundary, header của part và các field khác
+        self.overhead_bytes = overhead_bytes
+        self._static: Dict[str, int] = {}
+        # Route có tham số theo đúng thứ tự router: (regex, giới hạn file hoặc None)
+        self._dynamic: Tuple[Tuple[Pattern, Optional[int]], ...] = ()
+        self._compile(routes, upload_endpoints)
+
+    def _compile(self, routes: Iterable[BaseRoute], upload_endpoints: Dict[str, int]) -> None:
+        dynamic: List[Tuple[Pattern, Optional[int]]] = []
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            methods = getattr(route, "methods", None) or ()
+            if endpoint is None or not any(method in methods for method in BODY_METHODS):
+                continue
+            max_bytes = upload_endpoints.get(f"{endpoint.__module__}.{endpoint.__name__}")
+            if getattr(route, "param_convertors", None):
+                dynamic.append((route.path_regex, max_bytes))
+            elif max_bytes is not None:
+                self._static[route.path] = max_bytes
+
+        # Không có route upload nào có tham số thì không cần duyệt regex
+        if any(max_bytes is not None for _, max_bytes in dynamic):
+            self._dynamic = tuple(dynamic)
+        logger.info(f"Upload routes compiled: {len(self._static)} static, {len(self._dynamic)} parametrised")
+
+    def max_bytes(self, path: str) -> Optional[int]:
+        """File size limit of the upload route serving `path`, None if it is not one"""
+        max_bytes = self._static.get(path)
+        if max_bytes is not None:
+            return max_bytes
+        for regex, max_bytes in self._dynamic:
+            if regex.match(path):
+                return max_bytes
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_bytes = None
+        if scope["type"] == "http" and scope["method"] in BODY_METHODS:
+            max_bytes = self.max_bytes(scope["path"])
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_bytes + self.overhead_bytes
+
+        content_length = next((value for name, value in scope["headers"] if name == b"content-length"), None)
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = ErrorResponse(
+                message=too_large(max_bytes),
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                error_type="Payload Too Large"
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Được route handler của FastAPI để nguyên, exception handler trả 413
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=too_large(max_bytes)
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
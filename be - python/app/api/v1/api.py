@@ -1,5 +1,7 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, clinic, specialty, doctor, schedules, users, admin, patient
+from app.api.deps import public_endpoint
+from app.core.security import password_service
+from app.api.v1.endpoints import auth, clinic, specialty, doctor, schedules, users, admin, patient, export, home, media
 
 api_router = APIRouter()
 
@@ -11,6 +13,10 @@ api_router.include_router(schedules.router, prefix="/schedules", tags=["schedule
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 api_router.include_router(patient.router, prefix="/patient", tags=["patient"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(home.router, prefix="/home", tags=["home"])
+api_router.include_router(media.router, prefix="/media", tags=["media"])
 @api_router.get("/health-check")
+@public_endpoint
 async def health_check():
-    return {"status": "ok"} 
\ No newline at end of file
+    return {"status": "ok", "passwordPool": password_service.stats()} 
\ No newline at end of file
@@ -4,10 +4,11 @@ from sqlalchemy.future import select
 from sqlalchemy import func
 from app.db.database import get_db
 from app.models.user import User
+from app.core.principal import Principal
 from app.models.patient_schedule import PatientSchedule
 from app.models.specialization import Specialization
 from app.core.responses import SuccessResponse
-from app.api.deps import get_current_user
+from app.api.deps import get_claims_principal
 from app.schemas.admin import DashboardResponse
 
 router = APIRouter()
@@ -15,7 +16,7 @@ router = APIRouter()
 @router.get("/dashboard", response_model=DashboardResponse)
 async def get_dashboard(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_claims_principal)
 ):
     """Get dashboard statistics"""
     try:
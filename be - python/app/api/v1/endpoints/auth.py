@@ -3,7 +3,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from jose import JWTError, jwt
-from app.core.security import create_access_token, create_refresh_token, verify_password, get_password_hash
+from app.core.security import create_access_token, create_refresh_token, password_service
 from app.schemas.auth import (
     UserLoginResponse, 
     LoginResponseData, 
@@ -11,7 +11,10 @@ from app.schemas.auth import (
     ChangePasswordDto,
 )
 from app.db.database import get_db
+from app.db.loaders import loader_profile
 from app.models.user import User
+from app.core.principal import Principal, invalidate_principal
+from app.core.token_revocation import token_revocations
 from app.core.config import settings
 from app.api.deps import get_current_user, get_refresh_token, public_endpoint
 from fastapi.encoders import jsonable_encoder
@@ -19,7 +22,7 @@ from app.core.responses import SuccessResponse
 import random
 import string
 import logging
-from app.core.email import send_forgot_password_email
+from app.core.email import queue_forgot_password_email
 
 # Thêm logger
 logger = logging.getLogger(__name__)
@@ -36,7 +39,9 @@ async def login(
     try:
         # 1. Kiểm tra user tồn tại
         result = await db.execute(
-            select(User).where(User.email == form_data.username)
+            select(User)
+            .where(User.email == form_data.username)
+            .options(*loader_profile("principal"))
         )
         user = result.scalar_one_or_none()
         
@@ -48,12 +53,18 @@ async def login(
             )
 
         # 2. Kiểm tra mật khẩu
-        if not verify_password(form_data.password, user.password):
+        verified, new_hash = await password_service.verify_and_update(form_data.password, user.password)
+        if not verified:
             raise HTTPException(    
                 status_code=status.HTTP_401_UNAUTHORIZED, 
                 detail="Email hoặc mật khẩu không chính xác",
             )
 
+        # Hash cũ ($2a$ / $2y$ / rounds khác) thì hash lại theo chuẩn hiện tại
+        if new_hash:
+            user.password = new_hash
+            await db.commit()
+
         # Prepare user data
         user_data = UserLoginResponse(
             id=str(user.id),
@@ -106,7 +117,7 @@ async def login(
 @router.post("/logout")
 async def logout(
     response: Response,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         response.delete_cookie(
@@ -187,7 +198,7 @@ async def logout(
 #     )
 
 @router.get("/account")
-async def get_account(current_user: User = Depends(get_current_user)):
+async def get_account(current_user: Principal = Depends(get_current_user)):
     try:
         # Convert UUID to string explicitly
         user_id = str(current_user.id) if current_user.id else None
@@ -228,7 +239,9 @@ async def forgot_password(
     try:
         # Find user by email
         result = await db.execute(
-            select(User).where(User.email == forgot_password_dto.email.lower())
+            select(User)
+            .where(User.email == forgot_password_dto.email.lower())
+            .options(*loader_profile("principal"))
         )
         user = result.scalar_one_or_none()
         
@@ -243,21 +256,24 @@ async def forgot_password(
             string.ascii_letters + string.digits, k=8))
         
         # Hash the new password
-        hashed_password = get_password_hash(new_password)
+        hashed_password = await password_service.hash(new_password)
         
         # Update user's password
         user.password = hashed_password
-        await db.commit()
-        await db.refresh(user)
+        not_before = token_revocations.revoke(db, user.id)
         
-        # Send email with new password using template
-        await send_forgot_password_email(
+        # Queue email with new password in the same transaction as the update
+        queue_forgot_password_email(
+            db,
             user.email,
             {
                 "name": user.name,
                 "new_password": new_password
             }
         )
+        await db.commit()
+        token_revocations.apply(user.id, not_before)
+        invalidate_principal(user.id)
         
         return SuccessResponse(
             content=None,
@@ -277,28 +293,45 @@ async def forgot_password(
 @router.post("/change-password")
 async def change_password(
     change_password_dto: ChangePasswordDto,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Handle change password request"""
     try:
+        result = await db.execute(
+            select(User)
+            .where(User.id == current_user.id)
+            .options(*loader_profile("principal"))
+        )
+        user = result.scalar_one_or_none()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+
         # Verify old password
-        if not verify_password(change_password_dto.oldPassword, current_user.password):
+        if not await password_service.verify(change_password_dto.oldPassword, user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Mật khẩu cũ không đúng"
             )
         
         # Hash new password
-        hashed_password = get_password_hash(change_password_dto.newPassword)
+        hashed_password = await password_service.hash(change_password_dto.newPassword)
         
         # Update user's password
-        current_user.password = hashed_password
+        user.password = hashed_password
+        not_before = token_revocations.revoke(db, user.id)
         await db.commit()
-        await db.refresh(current_user)
+        token_revocations.apply(user.id, not_before)
+        invalidate_principal(user.id)
+
+        # Token đang dùng đã bị thu hồi: trả token mới để phiên hiện tại không bị 401
+        access_token = create_access_token(user, not_before=not_before)
         
         return SuccessResponse(
-            content=None,
+            content=jsonable_encoder({"access_token": access_token}),
             message="Đổi mật khẩu thành công",
             status_code=status.HTTP_200_OK
         )
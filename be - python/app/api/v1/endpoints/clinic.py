@@ -5,46 +5,40 @@ from app.db.database import get_db
 from app.models.clinic import Clinic
 from app.models.doctor_user import DoctorUser
 from app.schemas.clinic import ClinicResponse, CreateClinicDto, UpdateClinicDto
+from app.schemas.projections import clinic_row
 from app.core.responses import SuccessResponse
-from app.api.deps import get_current_user, public_endpoint
+from app.api.deps import conditional_get, get_current_user, public_endpoint, upload_endpoint
+from app.core.cache import catalog_cache, CLINIC, DOCTOR
 from typing import List
-import shutil
-from app.models.user import User
-from pathlib import Path
-from uuid import UUID, uuid4
-import os
+from app.core.uploads import save_image_upload
+from app.core.images import ensure_variants, image_variants
+from app.core.principal import Principal
+from uuid import UUID
 from sqlalchemy import insert
 
 router = APIRouter()
 
 @router.get("", response_model=List[ClinicResponse])
 @public_endpoint
+@conditional_get(CLINIC)
 async def get_all_clinics(
     db: AsyncSession = Depends(get_db)
 ):
     """Get all clinics"""
     try:
-        result = await db.execute(select(Clinic))
-        clinics = result.scalars().all()
-        
-        if not clinics:
+        async def load_clinics():
+            result = await db.execute(select(Clinic))
+            clinics = result.scalars().all()
+
+            return [clinic_row(clinic) for clinic in clinics]
+
+        clinic_responses = await catalog_cache.get_or_load("clinics", (CLINIC,), load_clinics)
+
+        if not clinic_responses:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Không tìm thấy phòng khám"
             )
-        
-        # Convert SQLAlchemy models to Pydantic models and then to dict
-        clinic_responses = [
-            {
-                "id": str(clinic.id),  # Convert UUID to string
-                "name": clinic.name,
-                "address": clinic.address,
-                "phone": clinic.phone,
-                "description": clinic.description,
-                "image": clinic.image
-            }
-            for clinic in clinics
-        ]
             
         return SuccessResponse(
             content=clinic_responses,
@@ -60,9 +54,10 @@ async def get_all_clinics(
 
 
 @router.post("/image")
+@upload_endpoint()
 async def upload_clinic_image(
     file: UploadFile = File(..., alias="clinicImage"),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.roleId != 1:
         raise HTTPException(
@@ -80,42 +75,12 @@ async def upload_clinic_image(
             "Access-Control-Allow-Credentials": "true",
         }
         
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png"]
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File type not allowed. Only JPG, JPEG and PNG are allowed"
-            )
-            
-        # Validate file size (2MB)
-        MAX_SIZE = 2 * 1024 * 1024  # 2MB
-        file_size = 0
-        chunk_size = 1024  # 1KB
-        
-        while chunk := await file.read(chunk_size):
-            file_size += len(chunk)
-            if file_size > MAX_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="File size too large. Maximum size is 2MB"
-                )
-                
-        # Reset file pointer
-        await file.seek(0)
-
-        # Generate random filename
-        file_extension = os.path.splitext(file.filename)[1]
-        file_name = f"{uuid4()}{file_extension}"
-        
-        # Save file
-        upload_dir = Path("app/public/images/clinics")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = upload_dir / file_name
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Kiểm tra kích thước, định dạng và ghi file trong một lượt, ngoài event loop
+        upload = await save_image_upload(file, "clinics")
+        file_name = upload.file_name
+
+        # Sinh thumbnail / WebP / AVIF trong process pool (bỏ qua nếu ảnh đã có)
+        await ensure_variants("clinics", file_name)
               
         return SuccessResponse(
             content=file_name,
@@ -136,7 +101,7 @@ async def upload_clinic_image(
 async def create_new_clinic(
     create_clinic_dto: CreateClinicDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Tạo phòng khám mới (Chỉ dành cho Admin)"""
     try:
@@ -153,22 +118,17 @@ async def create_new_clinic(
             address=create_clinic_dto.address,
             phone=create_clinic_dto.phone,
             description=create_clinic_dto.description,
-            image=create_clinic_dto.image
+            image=create_clinic_dto.image,
+            imageVariants=image_variants("clinics", create_clinic_dto.image)
         )
         
         db.add(new_clinic)
         await db.commit()
         await db.refresh(new_clinic)
+        catalog_cache.invalidate(CLINIC)
 
         # Chuyển đổi sang định dạng response
-        clinic_response = {
-            "id": str(new_clinic.id),
-            "name": new_clinic.name,
-            "address": new_clinic.address,
-            "phone": new_clinic.phone,
-            "description": new_clinic.description,
-            "image": new_clinic.image
-        }
+        clinic_response = clinic_row(new_clinic)
 
         return SuccessResponse(
             content=clinic_response,
@@ -190,7 +150,7 @@ async def update_clinic(
     id: UUID,
     update_clinic_dto: UpdateClinicDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Cập nhật thông tin phòng khám (Chỉ dành cho Admin)"""
     try:
@@ -217,19 +177,15 @@ async def update_clinic(
         update_data = update_clinic_dto.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(clinic, key, value)
+        if "image" in update_data:
+            clinic.imageVariants = image_variants("clinics", clinic.image)
 
         await db.commit()
         await db.refresh(clinic)
+        catalog_cache.invalidate(CLINIC, DOCTOR)
 
         # Chuyển đổi sang định dạng response
-        clinic_response = {
-            "id": str(clinic.id),
-            "name": clinic.name,
-            "address": clinic.address,
-            "phone": clinic.phone,
-            "description": clinic.description,
-            "image": clinic.image
-        }
+        clinic_response = clinic_row(clinic)
 
         return SuccessResponse(
             content=clinic_response,
@@ -250,7 +206,7 @@ async def update_clinic(
 async def delete_clinic(
     id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Xóa phòng khám (Chỉ dành cho Admin)"""
     try:
@@ -288,6 +244,7 @@ async def delete_clinic(
         # Xóa phòng khám
         await db.delete(clinic)
         await db.commit()
+        catalog_cache.invalidate(CLINIC)
 
         return SuccessResponse(
             content="Xóa phòng khám thành công",
@@ -3,15 +3,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 from app.db.database import get_db
+from app.db.loaders import loader_profile
 from app.models.user import User
+from app.core.principal import Principal
 from app.models.doctor_user import DoctorUser
 from app.schemas.doctor import DoctorResponse, DoctorDetailResponse
+from app.schemas.projections import (
+    doctor_by_clinic_row, doctor_by_specialization_row, doctor_card_row, doctor_detail_row
+)
 from app.core.responses import SuccessResponse
-from app.api.deps import public_endpoint
+from app.api.deps import conditional_get, public_endpoint
+from app.core.cache import catalog_cache, CLINIC, DOCTOR, SPECIALTY
 from typing import List
 from uuid import UUID
 from app.schemas.bill import CreateBillDto
-from app.core.email import send_bill_email
+from app.core.email import queue_bill_email
 from app.models.patient import Patient
 from app.models.patient_schedule import PatientSchedule
 from app.models.schedule import Schedule
@@ -23,7 +29,7 @@ router = APIRouter()
 async def send_bill(
     create_bill_dto: CreateBillDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Send bill to patient"""
     try:
@@ -68,11 +74,10 @@ async def send_bill(
 
         # Update status to Done
         patient_schedule.status = Status.Done
-        await db.commit()
-        await db.refresh(patient_schedule)
 
-        # Send bill email
-        await send_bill_email(
+        # Queue bill email in the same transaction as the status change
+        queue_bill_email(
+            db,
             patient.email,
             {
                 "doctor": patient_schedule.schedule.doctor.name,
@@ -82,6 +87,8 @@ async def send_bill(
             }
         )
 
+        await db.commit()
+
         return SuccessResponse(
             content="Gửi hóa đơn thành công",
             message="Send bill successfully"
@@ -100,47 +107,30 @@ async def send_bill(
 
 @router.get("", response_model=List[DoctorResponse])
 @public_endpoint
+@conditional_get(DOCTOR, CLINIC, SPECIALTY)
 async def get_all_doctors(
     db: AsyncSession = Depends(get_db)
 ):
     """Get all doctors"""
     try:
-        # Query doctors with role_id = 2 and join related tables
-        result = await db.execute(
-            select(User)
-            .where(User.roleId == 2)
-            .options(
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.specialization),
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.clinic)
+        async def load_doctors():
+            # Query doctors with role_id = 2 and join related tables
+            result = await db.execute(
+                select(User)
+                .where(User.roleId == 2)
+                .options(*loader_profile("doctor_card"))
             )
-        )
-        doctors = result.unique().scalars().all()
-        
-        if not doctors:
+            doctors = result.unique().scalars().all()
+
+            return [doctor_card_row(doctor) for doctor in doctors]
+
+        doctor_responses = await catalog_cache.get_or_load("doctors", (DOCTOR,), load_doctors)
+
+        if not doctor_responses:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Không tìm thấy bác sĩ"
             )
-        
-
-        doctor_responses = [
-            {
-                "id": str(doctor.id),  # Convert UUID to string
-                "name": doctor.name,
-                "avatar": doctor.avatar,
-                "doctor_user": {
-                    "specialization":{
-                        "name": doctor.doctor_user.specialization.name,
-                    },
-                    "clinic": {
-                        "name": doctor.doctor_user.clinic.name,
-                    }
-                }
-            }
-            for doctor in doctors
-        ]
             
         return SuccessResponse(
             content=doctor_responses,
@@ -156,6 +146,7 @@ async def get_all_doctors(
 
 @router.get("/spec/{id}", response_model=List[DoctorResponse])
 @public_endpoint
+@conditional_get(DOCTOR, CLINIC, SPECIALTY)
 async def get_doctors_by_specialization(
     id: UUID,
     db: AsyncSession = Depends(get_db)
@@ -170,12 +161,7 @@ async def get_doctors_by_specialization(
                 User.roleId == 2,
                 DoctorUser.specializationId == id
             )
-            .options(
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.specialization),
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.clinic)
-            )
+            .options(*loader_profile("doctor_card"))
         )
         doctors = result.unique().scalars().all()
         
@@ -185,27 +171,7 @@ async def get_doctors_by_specialization(
                 detail="Không tìm thấy bác sĩ"
             )
 
-        doctor_responses = [
-            {
-                "doctor": {
-                    "id": str(doctor.id),
-                    "name": doctor.name,
-                    "email": doctor.email,
-                    "address": doctor.address,
-                    "phone": doctor.phone,
-                    "avatar": doctor.avatar,
-                    "gender": doctor.gender,
-                    "description": doctor.description,
-                },
-                    "specialization": {
-                        "name": doctor.doctor_user.specialization.name,
-                    },
-                    "clinic": {
-                        "name": doctor.doctor_user.clinic.name,
-                    }
-            }
-            for doctor in doctors
-        ]
+        doctor_responses = [doctor_by_specialization_row(doctor) for doctor in doctors]
             
         return SuccessResponse(
             content=doctor_responses,
@@ -221,6 +187,7 @@ async def get_doctors_by_specialization(
 
 @router.get("/clinic/{id}", response_model=List[DoctorResponse])
 @public_endpoint
+@conditional_get(DOCTOR, CLINIC, SPECIALTY)
 async def get_doctors_by_clinic(
     id: UUID,
     db: AsyncSession = Depends(get_db)
@@ -235,12 +202,7 @@ async def get_doctors_by_clinic(
                 User.roleId == 2,
                 DoctorUser.clinicId == id
             )
-            .options(
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.specialization),
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.clinic)
-            )
+            .options(*loader_profile("doctor_card"))
         )
         doctors = result.unique().scalars().all()
         
@@ -250,25 +212,7 @@ async def get_doctors_by_clinic(
                 detail="Không tìm thấy bác sĩ"
             )
 
-        doctor_responses = [
-            {
-                "doctor": {
-                    "id": str(doctor.id),
-                    "name": doctor.name,
-                    "avatar": doctor.avatar,
-                },
-                "clinic": {
-                    "name": doctor.doctor_user.clinic.name,
-                    "address": doctor.doctor_user.clinic.address,
-                    "image": doctor.doctor_user.clinic.image,
-                    "description": doctor.doctor_user.clinic.description,
-                },
-                "specialization": {
-                    "name": doctor.doctor_user.specialization.name,
-                }
-            }
-            for doctor in doctors
-        ]
+        doctor_responses = [doctor_by_clinic_row(doctor) for doctor in doctors]
             
         return SuccessResponse(
             content=doctor_responses,
@@ -284,6 +228,7 @@ async def get_doctors_by_clinic(
 
 @router.get("/{id}", response_model=DoctorDetailResponse)
 @public_endpoint
+@conditional_get(DOCTOR, CLINIC, SPECIALTY)
 async def get_doctor_by_id(
     id: UUID,
     db: AsyncSession = Depends(get_db)
@@ -297,12 +242,7 @@ async def get_doctor_by_id(
                 User.id == id,
                 User.roleId == 2
             )
-            .options(
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.specialization),
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.clinic)
-            )
+            .options(*loader_profile("doctor_detail"))
         )
         doctor = result.unique().scalar_one_or_none()
         
@@ -312,26 +252,7 @@ async def get_doctor_by_id(
                 detail="Không tìm thấy bác sĩ"
             )
 
-        doctor_response = {
-            "id": str(doctor.id),
-            "name": doctor.name,
-            "avatar": doctor.avatar,
-            "address": doctor.address,
-            "phone": doctor.phone,
-            "gender": doctor.gender,
-            "description": doctor.description,
-            "doctor_user": {
-                "specialization": {
-                    "name": doctor.doctor_user.specialization.name,
-                    "description": doctor.doctor_user.specialization.description,
-                },
-                "clinic": {
-                    "name": doctor.doctor_user.clinic.name,
-                    "address": doctor.doctor_user.clinic.address,
-                    "description": doctor.doctor_user.clinic.description,
-                }
-            }
-        }
+        doctor_response = doctor_detail_row(doctor)
             
         return SuccessResponse(
             content=doctor_response,
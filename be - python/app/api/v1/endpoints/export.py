@@ -0,0 +1,145 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.future import select
+from app.api.deps import get_claims_principal
+from app.api.v1.endpoints.users import filter_users
+from app.core.export import ExportFormat, export_response, stream_rows
+from app.core.principal import Principal
+from app.models.clinic import Clinic
+from app.models.doctor_user import DoctorUser
+from app.models.patient import Patient
+from app.models.patient_schedule import PatientSchedule, Status
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import User
+
+router = APIRouter()
+
+BOOKING_HEADER = [
+    "Bệnh nhân", "Email", "Số điện thoại", "Giới tính", "Địa chỉ",
+    "Bắt đầu", "Kết thúc", "Giá", "Trạng thái", "Bác sĩ", "Phòng khám",
+]
+
+USER_HEADER = [
+    "Tên", "Email", "Số điện thoại", "Giới tính", "Địa chỉ",
+    "Vai trò", "Chuyên khoa", "Phòng khám", "Ngày tạo",
+]
+
+@router.get("/bookings")
+async def export_bookings(
+    format: ExportFormat = ExportFormat.csv,
+    dateFrom: Optional[date] = None,
+    dateTo: Optional[date] = None,
+    status_filter: Optional[Status] = Query(None, alias="status"),
+    doctorId: Optional[UUID] = None,
+    clinicId: Optional[UUID] = None,
+    current_user: Principal = Depends(get_claims_principal)
+):
+    """Stream bookings (patient_schedule) as CSV/XLSX, filtered by date range, status, doctor and clinic"""
+    # Admin và hỗ trợ viên được xuất danh sách đặt lịch
+    if current_user.roleId not in (1, 3):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin or supporters can access this endpoint"
+        )
+
+    if dateFrom and dateTo and dateFrom > dateTo:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="dateFrom phải trước dateTo"
+        )
+
+    stmt = (
+        select(
+            Patient.name,
+            Patient.email,
+            Patient.phone,
+            Patient.gender,
+            Patient.address,
+            Schedule.startTime,
+            Schedule.endTime,
+            Schedule.price,
+            PatientSchedule.status,
+            User.name,
+            Clinic.name,
+        )
+        .select_from(PatientSchedule)
+        .join(Patient, Patient.id == PatientSchedule.patientId)
+        .join(Schedule, Schedule.id == PatientSchedule.scheduleId)
+        .join(User, User.id == Schedule.doctorId)
+        .outerjoin(DoctorUser, DoctorUser.doctorId == User.id)
+        .outerjoin(Clinic, Clinic.id == DoctorUser.clinicId)
+        .order_by(Schedule.startTime, PatientSchedule.scheduleId, PatientSchedule.patientId)
+    )
+
+    # dateTo tính cả ngày cuối
+    if dateFrom:
+        stmt = stmt.where(Schedule.startTime >= datetime.combine(dateFrom, time.min))
+    if dateTo:
+        stmt = stmt.where(Schedule.startTime < datetime.combine(dateTo + timedelta(days=1), time.min))
+    if status_filter:
+        stmt = stmt.where(PatientSchedule.status == status_filter)
+    if doctorId:
+        stmt = stmt.where(Schedule.doctorId == doctorId)
+    if clinicId:
+        stmt = stmt.where(DoctorUser.clinicId == clinicId)
+
+    return export_response(
+        format,
+        filename="bookings",
+        header=BOOKING_HEADER,
+        rows=stream_rows(stmt),
+        sheet_title="Lịch hẹn",
+    )
+
+@router.get("/users")
+async def export_users(
+    format: ExportFormat = ExportFormat.csv,
+    roleId: Optional[int] = None,
+    clinicId: Optional[UUID] = None,
+    specializationId: Optional[UUID] = None,
+    q: Optional[str] = None,
+    current_user: Principal = Depends(get_claims_principal)
+):
+    """Stream users as CSV/XLSX with the same filters as the admin user list"""
+    if current_user.roleId != 1:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin can access this endpoint"
+        )
+
+    if roleId is not None and roleId not in (1, 2, 3):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="roleId không hợp lệ"
+        )
+
+    stmt = (
+        select(
+            User.name,
+            User.email,
+            User.phone,
+            User.gender,
+            User.address,
+            User.roleId,
+            Specialization.name,
+            Clinic.name,
+            User.createdAt,
+        )
+        .select_from(User)
+        .outerjoin(DoctorUser, DoctorUser.doctorId == User.id)
+        .outerjoin(Specialization, Specialization.id == DoctorUser.specializationId)
+        .outerjoin(Clinic, Clinic.id == DoctorUser.clinicId)
+        .order_by(User.createdAt.desc(), User.id.desc())
+    )
+    stmt = filter_users(stmt, roleId, clinicId, specializationId, q)
+
+    return export_response(
+        format,
+        filename="users",
+        header=USER_HEADER,
+        rows=stream_rows(stmt),
+        sheet_title="Người dùng",
+    )
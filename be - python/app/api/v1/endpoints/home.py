@@ -0,0 +1,86 @@
+import hashlib
+from typing import NamedTuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.api.deps import public_endpoint
+from app.core.cache import catalog_cache, CLINIC, DOCTOR, SPECIALTY
+from app.core.conditional import is_not_modified
+from app.core.responses import SuccessResponse
+from app.db.database import get_db
+from app.models.clinic import Clinic
+from app.models.specialization import Specialization
+from app.models.user import User
+
+router = APIRouter()
+
+class HomeSnapshot(NamedTuple):
+    body: bytes
+    etag: str
+
+async def build_home_snapshot(db: AsyncSession) -> HomeSnapshot:
+    """Render the landing page payload once; it is reused until a catalog write"""
+    specialties = await db.execute(
+        select(Specialization.id, Specialization.name, Specialization.image)
+        .order_by(Specialization.name, Specialization.id)
+    )
+    clinics = await db.execute(
+        select(Clinic.id, Clinic.name, Clinic.image)
+        .order_by(Clinic.name, Clinic.id)
+    )
+    doctors = await db.execute(
+        select(User.id, User.name, User.avatar)
+        .where(User.roleId == 2)
+        .order_by(User.name, User.id)
+    )
+
+    response = SuccessResponse(
+        content={
+            "specialties": [
+                {"id": row.id, "name": row.name, "image": row.image}
+                for row in specialties
+            ],
+            "clinics": [
+                {"id": row.id, "name": row.name, "image": row.image}
+                for row in clinics
+            ],
+            "doctors": [
+                {"id": row.id, "name": row.name, "avatar": row.avatar}
+                for row in doctors
+            ],
+        },
+        message="Get home page data successfully"
+    )
+    # ETag mạnh theo nội dung: giống nhau giữa các worker khi dữ liệu giống nhau
+    etag = '"' + hashlib.sha256(response.body).hexdigest()[:32] + '"'
+    return HomeSnapshot(body=response.body, etag=etag)
+
+@router.get("")
+@public_endpoint
+async def get_home(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Specialties, clinics and doctors for the landing page in one cached response"""
+    try:
+        # Gắn với cả ba namespace: ghi từ worker khác tới đây qua NOTIFY catalog_events
+        snapshot = await catalog_cache.get_or_load(
+            "home",
+            (CLINIC, SPECIALTY, DOCTOR),
+            lambda: build_home_snapshot(db)
+        )
+
+        # no-cache: trình duyệt được lưu nhưng phải hỏi lại bằng If-None-Match
+        headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+        if is_not_modified(snapshot.etag, None, request.headers.get("if-none-match"), None):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
@@ -0,0 +1,56 @@
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
+from app.api.deps import public_endpoint
+from app.core.config import settings
+from app.core.images import ImageSize, image_processor, image_variants, select_image
+from app.core.static_files import offload
+from app.core.storage import image_storage
+
+router = APIRouter()
+
+# Thư mục ảnh được phép phục vụ qua endpoint này
+MEDIA_DIRECTORIES = {"clinics", "specializations", "users"}
+
+@router.get("/{directory}/{file_name}")
+@public_endpoint
+async def get_media(
+    directory: str,
+    file_name: str,
+    request: Request,
+    size: ImageSize = Query(ImageSize.card)
+):
+    """Serve an uploaded image at the requested size, as AVIF/WebP when the client accepts it"""
+    if directory not in MEDIA_DIRECTORIES or Path(file_name).name != file_name:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Không tìm thấy hình ảnh"
+        )
+
+    # Backend S3: kéo ảnh gốc về bộ đệm local nếu chưa có
+    await image_storage.fetch(f"{directory}/{file_name}")
+    path = select_image(directory, file_name, size, request.headers.get("accept", ""))
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Không tìm thấy hình ảnh"
+        )
+
+    # Tên file là SHA-256 của nội dung (ảnh cũ: uuid) nên nội dung không bao giờ đổi.
+    # Riêng ảnh cũ chưa có variant: đang phục vụ ảnh gốc thay cho cỡ được yêu cầu,
+    # job backfill sẽ tạo variant sau nên chỉ cho cache ngắn.
+    waiting_for_variants = (
+        path.name == file_name
+        and size != ImageSize.original
+        and image_processor.enabled
+        and image_variants(directory, file_name) is None
+    )
+    response = FileResponse(
+        path,
+        headers={
+            "Cache-Control": "public, max-age=300" if waiting_for_variants else "public, max-age=31536000, immutable",
+            "Vary": "Accept",
+        }
+    )
+    response.chunk_size = settings.STATIC_CHUNK_BYTES
+    return offload(response)
@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update
 from app.db.database import get_db
 from app.models.patient import Patient
 from app.models.patient_schedule import PatientSchedule
 from app.models.schedule import Schedule
+from app.models.user import User
 from app.schemas.patient import CreatePatientDto
 from app.core.responses import SuccessResponse
 from app.api.deps import public_endpoint
 from app.schemas.schedule import Status
-from app.core.email import send_booking_new_email
-from uuid import UUID
-from sqlalchemy.orm import joinedload
+from app.core.email import queue_booking_new_email
+from uuid import UUID, uuid4
 
 router = APIRouter()
 
@@ -23,13 +24,13 @@ async def create_patient(
 ):
     """Create new patient and book schedule"""
     try:
-        # Check if schedule exists and has available slots
+        # Đọc thông tin lịch khám (không khóa) cho email và để phân biệt không tồn tại với đã đầy
         schedule_result = await db.execute(
-            select(Schedule)
-            .options(joinedload(Schedule.doctor))
+            select(Schedule.startTime, Schedule.endTime, User.name)
+            .join(User, User.id == Schedule.doctorId)
             .where(Schedule.id == create_patient_dto.scheduleId)
         )
-        schedule = schedule_result.unique().scalar_one_or_none()
+        schedule = schedule_result.one_or_none()
 
         if not schedule:
             raise HTTPException(
@@ -37,14 +38,9 @@ async def create_patient(
                 detail="Không tìm thấy lịch khám"
             )
 
-        if schedule.sumBooking >= schedule.maxBooking:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Lịch khám đã đầy"
-            )
-
-        # Create new patient
+        # Create new patient (id sinh phía app, không cần flush riêng)
         new_patient = Patient(
+            id=uuid4(),
             name=create_patient_dto.name,
             email=create_patient_dto.email,
             phone=create_patient_dto.phone,
@@ -53,29 +49,20 @@ async def create_patient(
             gender=create_patient_dto.gender
         )
         db.add(new_patient)
-        await db.flush()  # Flush to get the new patient's ID
 
         # Create patient schedule
-        new_patient_schedule = PatientSchedule(
+        db.add(PatientSchedule(
             patientId=new_patient.id,
-            scheduleId=schedule.id,
+            scheduleId=create_patient_dto.scheduleId,
             status=Status.Pending
-        )
-        db.add(new_patient_schedule)
-
-        # Update schedule sumBooking
-        schedule.sumBooking += 1
-
-        await db.commit()
-        await db.refresh(new_patient)
-        await db.refresh(new_patient_schedule)
-        await db.refresh(schedule)
+        ))
 
-        # Send confirmation email
-        await send_booking_new_email(
+        # Queue confirmation email in the same transaction as the booking
+        queue_booking_new_email(
+            db,
             create_patient_dto.email,
             {
-                "doctor": schedule.doctor.name,
+                "doctor": schedule.name,
                 "startTime": schedule.startTime,
                 "endTime": schedule.endTime,
                 "name": create_patient_dto.name,
@@ -85,6 +72,28 @@ async def create_patient(
                 "description": create_patient_dto.description or ""
             }
         )
+        await db.flush()
+
+        # Giữ chỗ bằng một câu UPDATE có điều kiện, tránh đặt quá số lượng khi có nhiều request đồng thời.
+        # Đây là câu lệnh cuối trước commit để row lịch khám bị khóa trong thời gian ngắn nhất.
+        reserve_result = await db.execute(
+            update(Schedule)
+            .where(
+                Schedule.id == create_patient_dto.scheduleId,
+                Schedule.sumBooking < Schedule.maxBooking
+            )
+            .values(sumBooking=Schedule.sumBooking + 1)
+            .returning(Schedule.id)
+            .execution_options(synchronize_session=False)
+        )
+        if reserve_result.scalar_one_or_none() is None:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Lịch khám đã đầy"
+            )
+
+        await db.commit()
 
         return SuccessResponse(
             content="Đặt lịch khám thành công",
@@ -1,28 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, time, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import orjson
+from app.core.availability import availability_index
+from app.core.booking_events import booking_events
+from app.core.config import settings
 from app.db.database import get_db
-from app.models.schedule import Schedule
-from app.api.deps import public_endpoint, get_current_user
-from app.core.responses import SuccessResponse
+from app.models.schedule import SCHEDULE_OVERLAP_CONSTRAINT, Schedule
+from app.db.errors import is_exclusion_violation
+from sqlalchemy.exc import IntegrityError
+from app.api.deps import public_endpoint, get_current_user, get_claims_principal
+from app.core.responses import ErrorResponse, SuccessResponse
 from uuid import UUID
 from app.schemas.schedules import ScheduleListResponse, ScheduleResponse
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import joinedload
-from app.models.user import User
+from app.schemas.projections import (
+    available_slot_row, doctor_schedule_row, doctor_slot_row, schedule_row, supporter_queue_item, supporter_queue_row
+)
+from app.db.pagination import decode_cursor, encode_cursor, escape_like, page_size
+from app.models.patient import Patient
+from sqlalchemy.orm import contains_eager, joinedload
+from app.core.principal import Principal
 from app.models.patient_schedule import Status, PatientSchedule
 from app.core.email import (
-    send_booking_success_email,
-    send_booking_failed_email
+    queue_booking_success_email,
+    queue_booking_failed_email
 )
 from app.schemas.schedule import (
-    ChangeStateDto, CreateScheduleDto, UpdateScheduleDto, Status
+    ChangeStateDto, CreateScheduleDto, CreateScheduleTemplateDto, UpdateScheduleDto, Status
 )
-from sqlalchemy import or_
+from sqlalchemy import DateTime, Integer, and_, column, func, insert, or_, tuple_, update, values
 
 router = APIRouter()
 
+SCHEDULE_OVERLAP_MESSAGE = "Lịch khám bị trùng với lịch khám khác"
+
+# Lịch khám bác sĩ xem được bệnh nhân: đã nhận hoặc đã khám xong
+ACCEPTED_STATUSES = (Status.Accept, Status.Done)
+
 # Thêm hàm helper để chuyển đổi timezone
 def convert_to_vietnam_time(dt: datetime) -> datetime:
     """Convert datetime to Vietnam timezone (UTC+7)"""
@@ -32,10 +50,37 @@ def convert_to_vietnam_time(dt: datetime) -> datetime:
     vietnam_tz = timezone(timedelta(hours=7))
     return dt.astimezone(vietnam_tz).replace(tzinfo=None)
 
+def vietnam_time_of_day(value: time) -> time:
+    """Naive Vietnam wall-clock time of a template time"""
+    # Giờ không kèm offset đã là giờ Việt Nam; giờ có offset được đổi như create_schedule
+    if value.tzinfo is None:
+        return value
+    return convert_to_vietnam_time(datetime.combine(date(2000, 1, 1), value)).time()
+
+def expand_template(template: CreateScheduleTemplateDto, limit: int) -> List[Tuple[datetime, datetime]]:
+    """(startTime, endTime) of each slot of a recurring template, stops after `limit` slots"""
+    step = timedelta(minutes=template.slotMinutes)
+    weekdays = set(template.weekdays)
+    # Lưu dạng naive giờ Việt Nam như create_schedule
+    day_start = vietnam_time_of_day(template.startTime)
+    day_end = vietnam_time_of_day(template.endTime)
+
+    slots: List[Tuple[datetime, datetime]] = []
+    day = template.dateFrom
+    while day <= template.dateTo and len(slots) < limit:
+        if day.isoweekday() in weekdays:
+            start = datetime.combine(day, day_start)
+            end_of_day = datetime.combine(day, day_end)
+            while start + step <= end_of_day and len(slots) < limit:
+                slots.append((start, start + step))
+                start += step
+        day += timedelta(days=1)
+    return slots
+
 @router.get("/patient-accept", response_model=ScheduleListResponse)
 async def get_patient_accept_schedule(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_claims_principal)
 ):
     """Get schedules with accepted/done patients for a doctor"""
     try:
@@ -70,30 +115,9 @@ async def get_patient_accept_schedule(
 
         # Convert to response model with patient information
         schedule_responses = [
-            {
-                "id": str(schedule.id),
-                "startTime": schedule.startTime.isoformat(),
-                "endTime": schedule.endTime.isoformat(),
-                "price": schedule.price,
-                "Patient_Schedule": [
-                    {
-                        "status": ps.status,
-                        "patient": {
-                            "id": str(ps.patient.id),
-                            "name": ps.patient.name,
-                            "phone": ps.patient.phone,
-                            "email": ps.patient.email,
-                            "gender": ps.patient.gender,
-                            "address": ps.patient.address,
-                            "description": ps.patient.description,
-                        }
-                    }
-                    for ps in schedule.patient_schedules
-                    if ps.status in [Status.Accept, Status.Done]
-                ]   
-            }
+            doctor_schedule_row(schedule, ACCEPTED_STATUSES)
             for schedule in schedules
-            if any(ps.status in [Status.Accept, Status.Done] for ps in schedule.patient_schedules)
+            if any(ps.status in ACCEPTED_STATUSES for ps in schedule.patient_schedules)
         ]
 
         return SuccessResponse(
@@ -113,7 +137,7 @@ async def get_patient_accept_schedule(
 @router.get("", response_model=ScheduleListResponse)
 async def get_schedules_for_doctor(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_claims_principal)
 ):
     """Get all schedules by doctor id for doctor"""
     try:
@@ -156,32 +180,7 @@ async def get_schedules_for_doctor(
             )
 
         # Convert to response model with patient information
-        schedule_responses = [
-            {
-                "id": str(schedule.id),
-                "startTime": schedule.startTime.isoformat(),
-                "endTime": schedule.endTime.isoformat(),
-                "price": schedule.price,
-                "maxBooking": schedule.maxBooking,
-                "Patient_Schedule": [
-                    {
-                        "status": ps.status,
-                        "patient": {
-                            "id": str(ps.patient.id),
-                            "name": ps.patient.name,
-                            "phone": ps.patient.phone,
-                            "email": ps.patient.email,
-                            "gender": ps.patient.gender,
-                            "address": ps.patient.address,
-                            "description": ps.patient.description,
-                        }
-                    }
-                    for ps in schedule.patient_schedules
-                    if ps.status == Status.Accept or ps.status == Status.Done 
-                ]   
-            }
-            for schedule in schedules
-        ]
+        schedule_responses = [doctor_schedule_row(schedule, ACCEPTED_STATUSES) for schedule in schedules]
 
         return SuccessResponse(
             content=schedule_responses,
@@ -201,7 +200,7 @@ async def get_schedules_for_doctor(
 @router.get("/supporter", response_model=dict)
 async def get_all_schedules_for_supporter(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_claims_principal)
 ):
     """Get all schedules for supporter and group by patient status"""
     try:
@@ -238,26 +237,9 @@ async def get_all_schedules_for_supporter(
                 if status_key not in transformed_data:
                     transformed_data[status_key] = {"patients": []}
 
-                transformed_data[status_key]["patients"].append({
-                    "patient": {
-                        "id": str(ps.patient.id),
-                        "name": ps.patient.name,
-                        "phone": ps.patient.phone,
-                        "email": ps.patient.email,
-                        "gender": ps.patient.gender,
-                        "address": ps.patient.address,
-                        "description": ps.patient.description
-                    },
-                    "scheduleId": str(schedule.id),
-                    "startTime": schedule.startTime.isoformat(),
-                    "endTime": schedule.endTime.isoformat(),
-                    "price": schedule.price,
-                    "maxBooking": schedule.maxBooking,
-                    "doctor": {
-                        "name": schedule.doctor.name,
-                        "phone": schedule.doctor.phone
-                    }
-                })
+                transformed_data[status_key]["patients"].append(
+                    supporter_queue_item(schedule, ps)
+                )
 
         return SuccessResponse(
             content=transformed_data,
@@ -272,7 +254,232 @@ async def get_all_schedules_for_supporter(
             detail=str(e)
         )
 
+@router.get("/supporter/queue", response_model=dict)
+async def get_supporter_queue(
+    status_filter: Optional[Status] = Query(None, alias="status"),
+    dateFrom: Optional[date] = None,
+    dateTo: Optional[date] = None,
+    doctorId: Optional[UUID] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_claims_principal)
+):
+    """
+    Supporter booking queue: per-status counts plus one page of bookings
+    ordered by start time. dateFrom defaults to today (Vietnam time);
+    pass `nextCursor` from the previous page as `cursor`.
+    """
+    try:
+        # Check if user is a supporter (roleId = 3)
+        if current_user.roleId != 3:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only supporters can access this endpoint"
+            )
+
+        if dateFrom is None:
+            dateFrom = convert_to_vietnam_time(datetime.now(timezone.utc)).date()
+        if dateTo and dateFrom > dateTo:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="dateFrom phải trước dateTo"
+            )
+
+        # Điều kiện chung cho cả phần đếm và phần danh sách (dateTo tính cả ngày cuối)
+        conditions = [Schedule.startTime >= datetime.combine(dateFrom, time.min)]
+        if dateTo:
+            conditions.append(Schedule.startTime < datetime.combine(dateTo + timedelta(days=1), time.min))
+        if doctorId:
+            conditions.append(Schedule.doctorId == doctorId)
+        if q and q.strip():
+            prefix = escape_like(q.strip().lower()) + "%"
+            conditions.append(or_(
+                func.lower(Patient.name).like(prefix, escape="\\"),
+                Patient.phone.like(prefix, escape="\\"),
+            ))
+
+        # Số lượng theo từng trạng thái, group trong SQL (không áp dụng filter status)
+        count_result = await db.execute(
+            select(PatientSchedule.status, func.count())
+            .join(Schedule, Schedule.id == PatientSchedule.scheduleId)
+            .join(Patient, Patient.id == PatientSchedule.patientId)
+            .where(*conditions)
+            .group_by(PatientSchedule.status)
+        )
+        counts = {item.value: 0 for item in Status}
+        for status_key, count in count_result:
+            counts[status_key.value] = count
+
+        # Một trang, keyset trên (startTime, scheduleId, patientId)
+        size = page_size(limit)
+        stmt = (
+            select(PatientSchedule)
+            .join(PatientSchedule.schedule)
+            .join(Schedule.doctor)
+            .join(PatientSchedule.patient)
+            .where(*conditions)
+            .options(
+                contains_eager(PatientSchedule.schedule).contains_eager(Schedule.doctor),
+                contains_eager(PatientSchedule.patient)
+            )
+            .order_by(Schedule.startTime, PatientSchedule.scheduleId, PatientSchedule.patientId)
+            .limit(size + 1)
+        )
+        if status_filter:
+            stmt = stmt.where(PatientSchedule.status == status_filter)
+        if cursor:
+            try:
+                key = decode_cursor(cursor, datetime, UUID, UUID)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor không hợp lệ"
+                )
+            stmt = stmt.where(
+                tuple_(Schedule.startTime, PatientSchedule.scheduleId, PatientSchedule.patientId) > tuple_(*key)
+            )
+
+        result = await db.execute(stmt)
+        bookings = result.scalars().all()
+
+        next_cursor = None
+        if len(bookings) > size:
+            bookings = bookings[:size]
+            last = bookings[-1]
+            next_cursor = encode_cursor(last.schedule.startTime, last.scheduleId, last.patientId)
+
+        return SuccessResponse(
+            content={
+                "counts": counts,
+                "items": [supporter_queue_row(ps) for ps in bookings],
+                "nextCursor": next_cursor,
+            },
+            message="Get supporter queue successfully"
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/supporter/events")
+async def stream_supporter_events(
+    request: Request,
+    current_user: Principal = Depends(get_claims_principal)
+):
+    """
+    Server-Sent Events for the supporter queue: booking_created,
+    status_changed, booking_deleted and resync (reload the list).
+    No DB session is held while the stream is open.
+    """
+    # Check if user is a supporter (roleId = 3)
+    if current_user.roleId != 3:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only supporters can access this endpoint"
+        )
+
+    async def event_stream():
+        queue = booking_events.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Giữ kết nối qua proxy
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {orjson.dumps(event).decode()}\n\n"
+        finally:
+            booking_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/availability", response_model=dict)
+@public_endpoint
+async def get_availability(
+    doctorIds: List[str] = Query(...),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Free slots of several doctors at once, grouped by doctor id.
+
+    doctorIds may be repeated or comma-separated; from/to are inclusive
+    days (Vietnam time), from defaults to today and is never earlier;
+    limit caps the slots returned per doctor.
+    """
+    try:
+        try:
+            doctor_ids = list(dict.fromkeys(
+                UUID(value) for item in doctorIds for value in item.split(",") if value.strip()
+            ))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="doctorIds không hợp lệ"
+            )
+        if len(doctor_ids) > settings.AVAILABILITY_MAX_DOCTORS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tối đa {settings.AVAILABILITY_MAX_DOCTORS} bác sĩ mỗi request"
+            )
+
+        today = convert_to_vietnam_time(datetime.now(timezone.utc)).date()
+        start = datetime.combine(max(date_from or today, today), time.min)
+        end = datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None
 
+        if availability_index.ready:
+            slots = availability_index.next_slots(doctor_ids, start, end, limit)
+        else:
+            # Một query IN cho tất cả bác sĩ thay vì một query mỗi bác sĩ
+            conditions = [
+                Schedule.doctorId.in_(doctor_ids),
+                Schedule.startTime >= start,
+                Schedule.sumBooking < Schedule.maxBooking
+            ]
+            if end is not None:
+                conditions.append(Schedule.startTime < end)
+            result = await db.execute(
+                select(Schedule)
+                .where(*conditions)
+                .order_by(Schedule.doctorId, Schedule.startTime)
+            )
+            slots = {doctor_id: [] for doctor_id in doctor_ids}
+            for schedule in result.scalars():
+                doctor_slots = slots[schedule.doctorId]
+                if limit is None or len(doctor_slots) < limit:
+                    doctor_slots.append(schedule)
+
+        return SuccessResponse(
+            content={
+                str(doctor_id): [available_slot_row(slot) for slot in doctor_slots]
+                for doctor_id, doctor_slots in slots.items()
+            },
+            message="Get availability successfully"
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
 
 @router.get("/{id}", response_model=ScheduleListResponse)
 @public_endpoint
@@ -287,17 +494,21 @@ async def get_schedules_by_doctor_id(
             datetime.now(timezone.utc)
         ).replace(hour=0, minute=0, second=0, microsecond=0)
 
-        # Query schedules with conditions
-        result = await db.execute(
-            select(Schedule)
-            .where(
-                Schedule.doctorId == id,
-                Schedule.startTime >= current_date,  # Compare with start of day
-                Schedule.sumBooking < Schedule.maxBooking  # Available slots check
-            )
-            .order_by(Schedule.startTime)  # Order by start time
-        )
-        schedules = result.scalars().all()
+        if availability_index.ready:
+            # Lịch trống lấy từ chỉ mục trong bộ nhớ, không query DB
+            schedules = availability_index.next_slots([id], current_date)[id]
+        else:
+            # Query schedules with conditions
+            result = await db.execute(
+                select(Schedule)
+                .where(
+                    Schedule.doctorId == id,
+                    Schedule.startTime >= current_date,  # Compare with start of day
+                    Schedule.sumBooking < Schedule.maxBooking  # Available slots check
+                )
+                .order_by(Schedule.startTime)  # Order by start time
+            )
+            schedules = result.scalars().all()
         
         if not schedules:
             return SuccessResponse(
@@ -305,19 +516,7 @@ async def get_schedules_by_doctor_id(
                 message="No available schedules found"
             )
         
-        # Convert to response model and then to dict with proper serialization
-        schedule_responses = [
-            {
-                "id": str(schedule.id),  # Convert UUID to string
-                "doctorId": str(schedule.doctorId),  # Convert UUID to string
-                "startTime": schedule.startTime.isoformat(),
-                "endTime": schedule.endTime.isoformat(),
-                "price": schedule.price,
-                "maxBooking": schedule.maxBooking,
-                "sumBooking": schedule.sumBooking
-            }
-            for schedule in schedules
-        ]
+        schedule_responses = [doctor_slot_row(schedule) for schedule in schedules]
             
         return SuccessResponse(
             content=schedule_responses,
@@ -334,7 +533,7 @@ async def get_schedules_by_doctor_id(
 async def change_schedule_status(
     change_state_dto: ChangeStateDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Change schedule status (Supporter only)"""
     try:
@@ -365,12 +564,11 @@ async def change_schedule_status(
             )
 
         patient_schedule.status = change_state_dto.status
-        await db.commit()
-        await db.refresh(patient_schedule)
 
-        # Send email notification
+        # Queue email notification in the same transaction as the status change
         if change_state_dto.status == Status.Accept:
-            await send_booking_success_email(
+            queue_booking_success_email(
+                db,
                 patient_schedule.patient.email,
                 {
                     "doctor": patient_schedule.schedule.doctor.name,
@@ -379,7 +577,8 @@ async def change_schedule_status(
                 }
             )
         else:
-            await send_booking_failed_email(
+            queue_booking_failed_email(
+                db,
                 patient_schedule.patient.email,
                 {
                     "doctor": patient_schedule.schedule.doctor.name,
@@ -388,6 +587,8 @@ async def change_schedule_status(
                 }
             )
 
+        await db.commit()
+
         return SuccessResponse(
             content={"status": change_state_dto.status},
             message="Thay đổi trạng thái lịch khám thành công"
@@ -406,7 +607,7 @@ async def delete_patient_schedule(
     patientId: UUID,
     scheduleId: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete patient schedule (Supporter only)"""
     try:
@@ -434,13 +635,13 @@ async def delete_patient_schedule(
 
         await db.delete(patient_schedule)
 
-        # Update sumBooking
-        result = await db.execute(
-            select(Schedule).where(Schedule.id == scheduleId)
+        # Update sumBooking (atomic, không đọc rồi ghi)
+        await db.execute(
+            update(Schedule)
+            .where(Schedule.id == scheduleId, Schedule.sumBooking > 0)
+            .values(sumBooking=Schedule.sumBooking - 1)
+            .execution_options(synchronize_session=False)
         )
-        schedule = result.scalar_one_or_none()
-        if schedule:
-            schedule.sumBooking -= 1
 
         await db.commit()
 
@@ -461,7 +662,7 @@ async def delete_patient_schedule(
 async def create_schedule(
     create_schedule_dto: CreateScheduleDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create schedule (Doctor only)"""
     try:
@@ -492,24 +693,7 @@ async def create_schedule(
                 detail="Thời gian kết thúc phải sau thời gian bắt đầu"
             )
 
-        # Check for overlapping schedules
-        result = await db.execute(
-            select(Schedule)
-            .where(
-                Schedule.doctorId == current_user.id,
-                Schedule.startTime <= end_time,
-                Schedule.endTime >= start_time,
-                Schedule.isDeleted == False
-            )
-        )
-        overlapping_schedules = result.scalars().all()
-        if overlapping_schedules:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Lịch khám bị trùng với lịch khám khác"
-            )
-
-        # Create schedule with Vietnam time
+        # Create schedule with Vietnam time (trùng lịch do exclusion constraint chặn)
         new_schedule = Schedule(
             doctorId=current_user.id,
             startTime=start_time,
@@ -519,23 +703,184 @@ async def create_schedule(
             sumBooking=0
         )
         
+        # id do uuid4 sinh phía client và session không expire khi commit:
+        # trả về từ giá trị đang có, không SELECT lại row vừa INSERT
         db.add(new_schedule)
         await db.commit()
-        await db.refresh(new_schedule)
+
+        return SuccessResponse(
+            content=schedule_row(new_schedule),
+            message="Tạo lịch khám thành công"
+        )
+
+    except HTTPException as e:
+        raise e
+    except IntegrityError as e:
+        if is_exclusion_violation(e, SCHEDULE_OVERLAP_CONSTRAINT):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=SCHEDULE_OVERLAP_MESSAGE
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.post("/template")
+async def create_schedules_from_template(
+    template: CreateScheduleTemplateDto,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Expand a recurring template into schedules (Doctor only).
+
+    All generated slots are checked against the doctor's schedules in one
+    query. On conflict nothing is created and the conflicts are returned
+    with 409, unless skipConflicts is set: then the free slots are created
+    and the conflicting ones reported.
+    """
+    try:
+        if current_user.roleId != 2:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Chỉ bác sĩ mới có thể tạo lịch khám"
+            )
+
+        current_date = convert_to_vietnam_time(datetime.now(timezone.utc)).date()
+        if template.dateFrom < current_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Thời gian bắt đầu không hợp lệ"
+            )
+        if template.dateFrom > template.dateTo:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="dateFrom phải trước dateTo"
+            )
+        if not template.weekdays or any(day < 1 or day > 7 for day in template.weekdays):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ngày trong tuần không hợp lệ"
+            )
+        if vietnam_time_of_day(template.endTime) <= vietnam_time_of_day(template.startTime):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Thời gian kết thúc phải sau thời gian bắt đầu"
+            )
+        if template.slotMinutes < 5:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Độ dài mỗi lịch khám tối thiểu 5 phút"
+            )
+        if template.price <= 0 or template.maxBooking < 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Giá khám và số lượng bệnh nhân tối đa phải lớn hơn 0"
+            )
+
+        slots = expand_template(template, settings.SCHEDULE_TEMPLATE_MAX_SLOTS + 1)
+        if not slots:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Template không tạo ra lịch khám nào"
+            )
+        if len(slots) > settings.SCHEDULE_TEMPLATE_MAX_SLOTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tối đa {settings.SCHEDULE_TEMPLATE_MAX_SLOTS} lịch khám mỗi lần"
+            )
+
+        # Kiểm tra trùng cho mọi slot trong một query: VALUES join schedules qua index GiST của "timeRange"
+        candidates = values(
+            column("slot", Integer),
+            column("startTime", DateTime),
+            column("endTime", DateTime),
+            name="candidates"
+        ).data([(index, start, end) for index, (start, end) in enumerate(slots)])
+        result = await db.execute(
+            select(candidates.c.slot, Schedule.id, Schedule.startTime, Schedule.endTime)
+            .select_from(candidates)
+            .join(
+                Schedule,
+                and_(
+                    Schedule.doctorId == current_user.id,
+                    Schedule.isDeleted == False,
+                    Schedule.timeRange.op("&&")(
+                        func.tsrange(candidates.c.startTime, candidates.c.endTime, "[)")
+                    )
+                )
+            )
+            .order_by(candidates.c.slot, Schedule.startTime)
+        )
+        conflicts: Dict[int, List[dict]] = {}
+        for row in result:
+            conflicts.setdefault(row.slot, []).append({
+                "id": row.id,
+                "startTime": row.startTime,
+                "endTime": row.endTime
+            })
+        conflict_rows = [
+            {
+                "startTime": slots[index][0],
+                "endTime": slots[index][1],
+                "conflictsWith": existing
+            }
+            for index, existing in conflicts.items()
+        ]
+
+        if conflicts and not template.skipConflicts:
+            return ErrorResponse(
+                message=SCHEDULE_OVERLAP_MESSAGE,
+                status_code=status.HTTP_409_CONFLICT,
+                error_type="Conflict",
+                errors=conflict_rows
+            )
+
+        new_schedules = [
+            {
+                "doctorId": current_user.id,
+                "startTime": start,
+                "endTime": end,
+                "price": template.price,
+                "maxBooking": template.maxBooking,
+                "sumBooking": 0
+            }
+            for index, (start, end) in enumerate(slots)
+            if index not in conflicts
+        ]
+        if new_schedules:
+            # Một lệnh executemany cho tất cả lịch khám, một lần commit
+            await db.execute(insert(Schedule), new_schedules)
+            await db.commit()
 
         return SuccessResponse(
             content={
-                "id": str(new_schedule.id),
-                "startTime": new_schedule.startTime.isoformat(),
-                "endTime": new_schedule.endTime.isoformat(),
-                "price": new_schedule.price,
-                "maxBooking": new_schedule.maxBooking
+                "created": len(new_schedules),
+                "conflicts": conflict_rows
             },
-            message="Tạo lịch khám thành công"
+            message="Tạo lịch khám theo template thành công",
+            status_code=status.HTTP_201_CREATED
         )
 
     except HTTPException as e:
         raise e
+    except IntegrityError as e:
+        # Lịch được tạo đồng thời sau khi kiểm tra: constraint chặn, không tạo lịch nào
+        if is_exclusion_violation(e, SCHEDULE_OVERLAP_CONSTRAINT):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=SCHEDULE_OVERLAP_MESSAGE
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -546,7 +891,7 @@ async def create_schedule(
 async def update_schedule(
     update_schedule_dto: UpdateScheduleDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update schedule (Doctor only)"""
     try:
@@ -593,25 +938,7 @@ async def update_schedule(
                 detail="Không tìm thấy lịch khám hoặc không có quyền cập nhật"
             )
 
-        # Check for overlapping schedules
-        result = await db.execute(
-            select(Schedule)
-            .where(
-                Schedule.doctorId == current_user.id,
-                Schedule.id != update_schedule_dto.id,
-                Schedule.startTime <= end_time,
-                Schedule.endTime >= start_time,
-                Schedule.isDeleted == False
-            )
-        )
-        overlapping_schedules = result.scalars().all()
-        if overlapping_schedules:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Lịch khám bị trùng với lịch khám khác"
-            )
-
-        # Update schedule with Vietnam time
+        # Update schedule with Vietnam time (trùng lịch do exclusion constraint chặn)
         schedule.startTime = start_time
         schedule.endTime = end_time
         schedule.price = update_schedule_dto.price
@@ -621,18 +948,22 @@ async def update_schedule(
         await db.refresh(schedule)
 
         return SuccessResponse(
-            content={
-                "id": str(schedule.id),
-                "startTime": schedule.startTime.isoformat(),
-                "endTime": schedule.endTime.isoformat(),
-                "price": schedule.price,
-                "maxBooking": schedule.maxBooking
-            },
+            content=schedule_row(schedule),
             message="Cập nhật lịch khám thành công"
         )
 
     except HTTPException as e:
         raise e
+    except IntegrityError as e:
+        if is_exclusion_violation(e, SCHEDULE_OVERLAP_CONSTRAINT):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=SCHEDULE_OVERLAP_MESSAGE
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -643,7 +974,7 @@ async def update_schedule(
 async def delete_schedule(
     id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete schedule (Doctor only)"""
     try:
@@ -4,43 +4,39 @@ from sqlalchemy.future import select
 from app.db.database import get_db
 from app.models.specialization import Specialization
 from app.schemas.specialty import SpecialtyResponse, CreateSpecialtyDto, UpdateSpecialtyDto
+from app.schemas.projections import specialty_row
 from app.core.responses import SuccessResponse
-from app.api.deps import get_current_user, public_endpoint
+from app.api.deps import conditional_get, get_current_user, public_endpoint, upload_endpoint
+from app.core.cache import catalog_cache, SPECIALTY, DOCTOR
 from typing import List
-import shutil
-from pathlib import Path
-from uuid import uuid4, UUID
-import os
-from app.models.user import User
+from app.core.uploads import save_image_upload
+from app.core.images import ensure_variants, image_variants
+from uuid import UUID
+from app.core.principal import Principal
 from app.models.doctor_user import DoctorUser
 router = APIRouter()
 
 @router.get("", response_model=List[SpecialtyResponse])
 @public_endpoint
+@conditional_get(SPECIALTY)
 async def get_all_specialties(
     db: AsyncSession = Depends(get_db)
 ):
     """Get all specialties"""
     try:
-        result = await db.execute(select(Specialization))
-        specialties = result.scalars().all()
-        
-        if not specialties:
+        async def load_specialties():
+            result = await db.execute(select(Specialization))
+            specialties = result.scalars().all()
+
+            return [specialty_row(specialty) for specialty in specialties]
+
+        specialty_responses = await catalog_cache.get_or_load("specialties", (SPECIALTY,), load_specialties)
+
+        if not specialty_responses:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Không tìm thấy chuyên ngành"
             )
-        
-        # Convert SQLAlchemy models to Pydantic models and then to dict
-        specialty_responses = [
-            {
-                "id": str(specialty.id),  # Convert UUID to string
-                "name": specialty.name,
-                "description": specialty.description,
-                "image": specialty.image
-            }
-            for specialty in specialties
-        ]
             
         return SuccessResponse(
             content=specialty_responses,
@@ -56,9 +52,10 @@ async def get_all_specialties(
 
 
 @router.post("/image")
+@upload_endpoint()
 async def upload_clinic_image(
     file: UploadFile = File(..., alias="specImage"),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.roleId != 1:
         raise HTTPException(
@@ -77,42 +74,12 @@ async def upload_clinic_image(
             "Access-Control-Allow-Credentials": "true",
         }
         
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png"]
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File type not allowed. Only JPG, JPEG and PNG are allowed"
-            )
-            
-        # Validate file size (2MB)
-        MAX_SIZE = 2 * 1024 * 1024  # 2MB
-        file_size = 0
-        chunk_size = 1024  # 1KB
-        
-        while chunk := await file.read(chunk_size):
-            file_size += len(chunk)
-            if file_size > MAX_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="File size too large. Maximum size is 2MB"
-                )
-                
-        # Reset file pointer
-        await file.seek(0)
+        # Kiểm tra kích thước, định dạng và ghi file trong một lượt, ngoài event loop
+        upload = await save_image_upload(file, "specializations")
+        file_name = upload.file_name
 
-        # Generate random filename
-        file_extension = os.path.splitext(file.filename)[1]
-        file_name = f"{uuid4()}{file_extension}"
-        
-        # Save file
-        upload_dir = Path("app/public/images/specializations")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = upload_dir / file_name
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Sinh thumbnail / WebP / AVIF trong process pool (bỏ qua nếu ảnh đã có)
+        await ensure_variants("specializations", file_name)
               
         return SuccessResponse(
             content=file_name,
@@ -132,7 +99,7 @@ async def upload_clinic_image(
 async def create_specialty(
     create_specialty_dto: CreateSpecialtyDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Tạo chuyên ngành mới (Chỉ dành cho Admin)"""
     try:
@@ -147,20 +114,17 @@ async def create_specialty(
         new_specialty = Specialization(
             name=create_specialty_dto.name,
             description=create_specialty_dto.description,
-            image=create_specialty_dto.image
+            image=create_specialty_dto.image,
+            imageVariants=image_variants("specializations", create_specialty_dto.image)
         )
         
         db.add(new_specialty)
         await db.commit()
         await db.refresh(new_specialty)
+        catalog_cache.invalidate(SPECIALTY)
 
         # Chuyển đổi sang định dạng response
-        specialty_response = {
-            "id": str(new_specialty.id),
-            "name": new_specialty.name,
-            "description": new_specialty.description,
-            "image": new_specialty.image
-        }
+        specialty_response = specialty_row(new_specialty)
 
         return SuccessResponse(
             content=specialty_response,
@@ -181,7 +145,7 @@ async def update_specialty(
     id: UUID,
     update_specialty_dto: UpdateSpecialtyDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Cập nhật thông tin chuyên ngành (Chỉ dành cho Admin)"""
     try:
@@ -208,17 +172,15 @@ async def update_specialty(
         update_data = update_specialty_dto.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(specialty, key, value)
+        if "image" in update_data:
+            specialty.imageVariants = image_variants("specializations", specialty.image)
 
         await db.commit()
         await db.refresh(specialty)
+        catalog_cache.invalidate(SPECIALTY, DOCTOR)
 
         # Chuyển đổi sang định dạng response
-        specialty_response = {
-            "id": str(specialty.id),
-            "name": specialty.name,
-            "description": specialty.description,
-            "image": specialty.image
-        }
+        specialty_response = specialty_row(specialty)
 
         return SuccessResponse(
             content=specialty_response,
@@ -238,7 +200,7 @@ async def update_specialty(
 async def delete_specialty(
     id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Xóa chuyên ngành (Chỉ dành cho Admin)"""
     try:
@@ -276,6 +238,7 @@ async def delete_specialty(
         # Xóa chuyên ngành
         await db.delete(specialty)
         await db.commit()
+        catalog_cache.invalidate(SPECIALTY)
 
         return SuccessResponse(
             content="Xóa chuyên ngành thành công",
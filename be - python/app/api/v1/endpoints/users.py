@@ -1,21 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 from app.db.database import get_db
+from app.db.loaders import loader_profile
 from app.models.doctor_user import DoctorUser
 from app.models.user import User
+from app.core.principal import Principal, invalidate_principal
+from app.core.token_revocation import token_revocations
 from app.core.responses import SuccessResponse
-from app.api.deps import get_current_user
-from typing import List
-from app.schemas.users import UserResponse
-from fastapi.encoders import jsonable_encoder
-import shutil
-from pathlib import Path
-from uuid import uuid4,UUID
-import os
-from sqlalchemy import update, delete
-from app.core.security import get_password_hash
+from app.api.deps import get_current_user, upload_endpoint
+from app.core.cache import catalog_cache, DOCTOR
+from app.db.pagination import decode_cursor, encode_cursor, escape_like, estimate_count, page_size
+from typing import Optional
+from app.schemas.users import UserPageResponse
+from app.schemas.projections import admin_user_row
+from app.core.uploads import save_image_upload
+from app.core.images import ensure_variants
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import update, delete, func, or_, tuple_
+from app.core.security import password_service
 from app.schemas.user import RegisterUserDto, UpdateUserDto
 from app.models.doctor_user import DoctorUser
 from sqlalchemy import update, delete
@@ -23,12 +27,51 @@ from app.models.schedule import Schedule
 
 router = APIRouter()
 
-@router.get("", response_model=List[UserResponse])
+def filter_users(
+    stmt,
+    roleId: Optional[int] = None,
+    clinicId: Optional[UUID] = None,
+    specializationId: Optional[UUID] = None,
+    q: Optional[str] = None,
+):
+    """Apply the admin user list filters to a select over User"""
+    stmt = stmt.where(User.roleId.in_([roleId] if roleId else [1, 2, 3]))
+
+    # Lọc theo phòng khám/chuyên khoa chỉ áp dụng cho bác sĩ.
+    # Dùng subquery thay vì join để caller (vd: export) có thể tự outer join doctor_user.
+    if clinicId or specializationId:
+        doctors = select(DoctorUser.doctorId)
+        if clinicId:
+            doctors = doctors.where(DoctorUser.clinicId == clinicId)
+        if specializationId:
+            doctors = doctors.where(DoctorUser.specializationId == specializationId)
+        stmt = stmt.where(User.id.in_(doctors))
+
+    # Tìm theo tiền tố tên hoặc email (dùng index lower(...) text_pattern_ops)
+    if q and q.strip():
+        prefix = escape_like(q.strip().lower()) + "%"
+        stmt = stmt.where(or_(
+            func.lower(User.name).like(prefix, escape="\\"),
+            func.lower(User.email).like(prefix, escape="\\"),
+        ))
+
+    return stmt
+
+@router.get("", response_model=UserPageResponse)
 async def get_all_users(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    roleId: Optional[int] = None,
+    clinicId: Optional[UUID] = None,
+    specializationId: Optional[UUID] = None,
+    q: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all users with roles 1, 2, 3 and include specialty, clinic for role 2"""
+    """
+    Page through users with roles 1, 2, 3 (newest first), including specialty
+    and clinic for role 2. Pass `nextCursor` from the previous page as `cursor`.
+    """
     try:
         # Check if current user has admin role (roleId = 1)
         if current_user.roleId != 1:
@@ -37,77 +80,44 @@ async def get_all_users(
                 detail="Only admin can access this endpoint"
             )
 
-        # Query users with role_id in [1,2,3] and join related tables for doctors
-        result = await db.execute(
-            select(User)
-            .where(User.roleId.in_([1, 2, 3]))
-            .options(
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.specialization),
-                joinedload(User.doctor_user)
-                .joinedload(DoctorUser.clinic)
-            )
-        )
-        users = result.unique().scalars().all()
-        
-        if not users:
+        if roleId is not None and roleId not in (1, 2, 3):
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Không tìm thấy người dùng nào"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="roleId không hợp lệ"
             )
 
-        # Convert users to response format
-        users_response = []
-        for user in users:
-            user_dict = {
-                "id": str(user.id),
-                "name": user.name,
-                "email": user.email,
-                "phone": user.phone,
-                "gender": user.gender,
-                "description": user.description,
-                "address": user.address,
-                "avatar": user.avatar,
-                "roleId": user.roleId,
-                "createdAt": user.createdAt,
-                "updatedAt": user.updatedAt,
-                "isDeleted": user.isDeleted
-            }
-
-            # Add doctor_user info if user is a doctor
-            if user.roleId == 2 and user.doctor_user:
-                user_dict["doctor_user"] = {
-                    "doctorId": user.doctor_user.doctorId,
-                    "clinicId": user.doctor_user.clinicId,
-                    "specializationId": user.doctor_user.specializationId,
-                    "clinic": {
-                        "id": str(user.doctor_user.clinic.id),
-                        "name": user.doctor_user.clinic.name,
-                        "address": user.doctor_user.clinic.address,
-                        "phone": user.doctor_user.clinic.phone,
-                        "description": user.doctor_user.clinic.description,
-                        "image": user.doctor_user.clinic.image,
-                        "createdAt": user.doctor_user.clinic.createdAt,
-                        "updatedAt": user.doctor_user.clinic.updatedAt,
-                        "isDeleted": user.doctor_user.clinic.isDeleted
-                    },
-                    "specialization": {
-                        "id": str(user.doctor_user.specialization.id),
-                        "name": user.doctor_user.specialization.name,
-                        "description": user.doctor_user.specialization.description,
-                        "image": user.doctor_user.specialization.image,
-                        "createdAt": user.doctor_user.specialization.createdAt,
-                        "updatedAt": user.doctor_user.specialization.updatedAt,
-                        "isDeleted": user.doctor_user.specialization.isDeleted
-                    }
-                }
-            else:
-                user_dict["doctor_user"] = None
-
-            users_response.append(user_dict)
+        size = page_size(limit)
+        base = filter_users(select(User), roleId, clinicId, specializationId, q)
+
+        # Keyset trên ("createdAt", id) giảm dần: không dùng OFFSET
+        stmt = base.order_by(User.createdAt.desc(), User.id.desc()).limit(size + 1)
+        if cursor:
+            try:
+                created_at, last_id = decode_cursor(cursor, datetime, UUID)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor không hợp lệ"
+                )
+            stmt = stmt.where(tuple_(User.createdAt, User.id) < tuple_(created_at, last_id))
+
+        result = await db.execute(stmt.options(*loader_profile("admin_row")))
+        users = result.unique().scalars().all()
+
+        next_cursor = None
+        if len(users) > size:
+            users = users[:size]
+            next_cursor = encode_cursor(users[-1].createdAt, users[-1].id)
+
+        total, total_is_estimate = await estimate_count(db, base)
 
         return SuccessResponse(
-            content=jsonable_encoder(users_response),
+            content={
+                "items": [admin_user_row(user) for user in users],
+                "nextCursor": next_cursor,
+                "total": total,
+                "totalIsEstimate": total_is_estimate,
+            },
             message="Get all users successfully"
         )
 
@@ -120,9 +130,10 @@ async def get_all_users(
         )
 
 @router.post("/avatar", response_model=str)
+@upload_endpoint()
 async def upload_avatar(
     file: UploadFile = File(..., alias="avatar"),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Upload and update user avatar"""
@@ -135,50 +146,23 @@ async def upload_avatar(
             "Access-Control-Allow-Credentials": "true",
         }
         
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png"]
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File type not allowed. Only JPG, JPEG and PNG are allowed"
-            )
-            
-        # Validate file size (2MB)
-        MAX_SIZE = 2 * 1024 * 1024  # 2MB
-        file_size = 0
-        chunk_size = 1024  # 1KB
-        
-        while chunk := await file.read(chunk_size):
-            file_size += len(chunk)
-            if file_size > MAX_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="File size too large. Maximum size is 2MB"
-                )
-                
-        # Reset file pointer
-        await file.seek(0)
-        
-        # Generate random filename
-        file_extension = os.path.splitext(file.filename)[1]
-        file_name = f"{uuid4()}{file_extension}"
-        
-        # Save file
-        upload_dir = Path("app/public/images/users")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = upload_dir / file_name
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Kiểm tra kích thước, định dạng và ghi file trong một lượt, ngoài event loop
+        upload = await save_image_upload(file, "users")
+        file_name = upload.file_name
+
+        # Sinh thumbnail / WebP / AVIF trong process pool (bỏ qua nếu ảnh đã có)
+        variants = await ensure_variants("users", file_name)
             
         # Update user avatar in database
         await db.execute(
             update(User)
             .where(User.id == current_user.id)
-            .values(avatar=file_name)
+            .values(avatar=file_name, avatarVariants=variants)
         )
         await db.commit()
+        invalidate_principal(current_user.id)
+        if current_user.roleId == 2:
+            catalog_cache.invalidate(DOCTOR)
             
         return SuccessResponse(
             content=file_name,
@@ -198,7 +182,7 @@ async def upload_avatar(
 async def create_user(
     user: RegisterUserDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create new user (Admin only)"""
     try:
@@ -220,7 +204,7 @@ async def create_user(
             )
 
         # Create new user
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await password_service.hash(user.password)
         new_user = User(
             email=user.email.lower(),
             password=hashed_password,
@@ -246,6 +230,7 @@ async def create_user(
             )
             db.add(doctor_user)
             await db.commit()
+            catalog_cache.invalidate(DOCTOR)
 
         return SuccessResponse(
             content={"id": str(new_user.id)},
@@ -264,7 +249,7 @@ async def create_user(
 async def update_user(
     user: UpdateUserDto,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update user (Admin only)"""
     try:
@@ -338,6 +323,11 @@ async def update_user(
                     )
                     db.add(new_doctor_user)
 
+        # Đổi role thì token cũ (chứa roleId cũ) không còn hợp lệ
+        not_before = None
+        if existing_user.roleId != user.roleId:
+            not_before = token_revocations.revoke(db, existing_user.id)
+
         # Update user
         await db.execute(
             update(User)
@@ -353,6 +343,11 @@ async def update_user(
             )
         )
         await db.commit()
+        if not_before is not None:
+            token_revocations.apply(existing_user.id, not_before)
+        invalidate_principal(user.id)
+        if existing_user.roleId == 2 or user.roleId == 2:
+            catalog_cache.invalidate(DOCTOR)
 
         return SuccessResponse(
             content={"id": str(user.id)},
@@ -371,7 +366,7 @@ async def update_user(
 async def delete_user(
     id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete user (Admin only)"""
     try:
@@ -404,11 +399,17 @@ async def delete_user(
                 delete(DoctorUser).where(DoctorUser.doctorId == str(id))
             )
             
+        not_before = token_revocations.revoke(db, id)
+
         # Finally delete user
         await db.execute(
             delete(User).where(User.id == id)
         )
         await db.commit()
+        token_revocations.apply(id, not_before)
+        invalidate_principal(id)
+        if user.roleId == 2:
+            catalog_cache.invalidate(DOCTOR)
 
         return SuccessResponse(
             content="Xóa người dùng thành công",
@@ -0,0 +1,202 @@
+"""
+In-memory index of free schedule slots, per doctor.
+
+Each worker loads the future schedules that still have room (startTime >=
+today, sumBooking < maxBooking) and keeps them current from the NOTIFY
+trigger on schedules (migration 7). The trigger fires on create / update /
+delete and on every sumBooking change made by bookings and cancellations.
+Slots are kept sorted by start time, so "next N free slots of doctors X,
+Y, Z" is one bisect per doctor instead of a scan.
+
+The index is authoritative only while the LISTEN connection is up and a
+snapshot has been loaded; callers fall back to the DB when `ready` is False.
+"""
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+from app.db.database import AsyncSessionLocal
+from app.models.schedule import Schedule
+
+logger = logging.getLogger(__name__)
+
+# Kênh NOTIFY do trigger trên schedules phát (migration 7)
+CHANNEL = "schedule_events"
+
+VIETNAM_TZ = timezone(timedelta(hours=7))
+
+class Slot(NamedTuple):
+    id: UUID
+    doctorId: UUID
+    startTime: datetime
+    endTime: datetime
+    price: int
+    maxBooking: int
+    sumBooking: int
+
+start_time = attrgetter("startTime")
+
+class AvailabilityIndex:
+    def __init__(self) -> None:
+        self._slots: Dict[UUID, List[Slot]] = {}
+        self._by_id: Dict[UUID, Slot] = {}
+        self._connected = False
+        self._ready = False
+        # Event nhận được trong lúc đang load snapshot, áp dụng lại sau khi load xong
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self._reload_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def next_slots(
+        self,
+        doctor_ids: Iterable[UUID],
+        start: datetime,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[UUID, List[Slot]]:
+        """Free slots starting in [start, end) for each doctor, earliest first"""
+        result: Dict[UUID, List[Slot]] = {}
+        for doctor_id in doctor_ids:
+            slots = self._slots.get(doctor_id, [])
+            picked: List[Slot] = []
+            for i in range(bisect_left(slots, start, key=start_time), len(slots)):
+                slot = slots[i]
+                if (end is not None and slot.startTime >= end) or (limit is not None and len(picked) >= limit):
+                    break
+                picked.append(slot)
+            result[doctor_id] = picked
+        return result
+
+    def _remove(self, schedule_id: UUID) -> None:
+        slot = self._by_id.pop(schedule_id, None)
+        if slot is None:
+            return
+        slots = self._slots[slot.doctorId]
+        slots.remove(slot)
+        if not slots:
+            del self._slots[slot.doctorId]
+
+    def _apply(self, data: Dict[str, Any]) -> None:
+        # Payload là toàn bộ trạng thái của row, áp dụng lại nhiều lần vẫn cho cùng kết quả
+        schedule_id = UUID(data["id"])
+        self._remove(schedule_id)
+        if data["op"] == "DELETE" or data["sumBooking"] >= data["maxBooking"]:
+            return
+        slot = Slot(
+            id=schedule_id,
+            doctorId=UUID(data["doctorId"]),
+            startTime=datetime.fromisoformat(data["startTime"]),
+            endTime=datetime.fromisoformat(data["endTime"]),
+            price=data["price"],
+            maxBooking=data["maxBooking"],
+            sumBooking=data["sumBooking"],
+        )
+        self._by_id[schedule_id] = slot
+        insort(self._slots.setdefault(slot.doctorId, []), slot, key=start_time)
+
+    def on_notify(self, data: Dict[str, Any]) -> None:
+        if self._pending is not None:
+            self._pending.append(data)
+        elif self._ready:
+            self._apply(data)
+
+    def on_connect(self) -> None:
+        self._connected = True
+        self._reload_requested.set()
+
+    def on_disconnect(self) -> None:
+        # Có thể đã mất event: không trả lời từ index cho tới khi load lại
+        self._connected = False
+        self._ready = False
+
+    async def reload(self) -> None:
+        """Replace the index with a fresh snapshot, then replay events received meanwhile"""
+        today = datetime.now(VIETNAM_TZ).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+        self._pending = []
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(
+                        Schedule.id,
+                        Schedule.doctorId,
+                        Schedule.startTime,
+                        Schedule.endTime,
+                        Schedule.price,
+                        Schedule.maxBooking,
+                        Schedule.sumBooking,
+                    )
+                    .where(
+                        Schedule.startTime >= today,
+                        Schedule.sumBooking < Schedule.maxBooking
+                    )
+                    .order_by(Schedule.doctorId, Schedule.startTime)
+                )
+                rows = result.all()
+
+            slots: Dict[UUID, List[Slot]] = {}
+            by_id: Dict[UUID, Slot] = {}
+            for row in rows:
+                slot = Slot(*row)
+                by_id[slot.id] = slot
+                slots.setdefault(slot.doctorId, []).append(slot)
+            self._slots, self._by_id = slots, by_id
+
+            for data in self._pending:
+                self._apply(data)
+            self._ready = self._connected
+            logger.info(f"Availability index loaded: {len(by_id)} free slots")
+        finally:
+            self._pending = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="availability-index")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            # Load lại khi (re)connect, và định kỳ để bỏ slot đã qua ngày
+            try:
+                await asyncio.wait_for(
+                    self._reload_requested.wait(),
+                    timeout=settings.AVAILABILITY_RELOAD_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._reload_requested.clear()
+            if not self._connected:
+                continue
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Loading availability index failed: {str(e)}")
+                self._ready = False
+                await asyncio.sleep(settings.PG_LISTEN_RECONNECT_SECONDS)
+                self._reload_requested.set()
+
+availability_index = AvailabilityIndex()
+pg_listener.listen(
+    CHANNEL,
+    availability_index.on_notify,
+    on_connect=availability_index.on_connect,
+    on_disconnect=availability_index.on_disconnect,
+)
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Dict, Set
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+
+# Kênh NOTIFY do trigger trên patient_schedule phát (migration 4)
+CHANNEL = "patient_schedule_events"
+
+EVENT_TYPES = {
+    "INSERT": "booking_created",
+    "UPDATE": "status_changed",
+    "DELETE": "booking_deleted",
+}
+
+# Gửi cho client khi có thể đã mất event (mất kết nối LISTEN, client đọc chậm)
+RESYNC_EVENT: Dict[str, Any] = {"type": "resync"}
+
+class BookingEventHub:
+    """
+    Fan-out of patient_schedule NOTIFY events to SSE subscribers.
+
+    Events arrive through the worker's shared LISTEN connection
+    (app/core/pg_listener.py) and are pushed into the bounded queue of each
+    subscriber. A subscriber that falls behind gets a "resync" event
+    instead of an unbounded backlog.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.BOOKING_EVENTS_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Bỏ backlog cũ, client chỉ cần tải lại danh sách
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+
+    def on_notify(self, data: Dict[str, Any]) -> None:
+        event_type = EVENT_TYPES.get(data.pop("op", None))
+        if event_type is None:
+            return
+        self.publish({"type": event_type, **data})
+
+booking_events = BookingEventHub()
+# Event phát trong lúc chưa/mất kết nối LISTEN đã bị mất: client tải lại danh sách
+pg_listener.listen(CHANNEL, booking_events.on_notify, on_connect=lambda: booking_events.publish(RESYNC_EVENT))
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+
+# Kênh NOTIFY khi dữ liệu catalog thay đổi, payload: {"namespaces": [...]}
+CHANNEL = "catalog_events"
+
+# Namespaces của catalog, mỗi namespace có version riêng
+CLINIC = "clinic"
+SPECIALTY = "specialty"
+DOCTOR = "doctor"
+
+
+class TTLCache:
+    """Small in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class CatalogCache:
+    """
+    Versioned cache for public catalog data (clinics, specialties, doctors).
+
+    Each entry is stamped with the versions of the namespaces it was built
+    from. Write handlers call `invalidate()` after commit, which bumps the
+    versions, so an entry built before the change (even one still loading
+    while the write happened) is never served afterwards.
+
+    Writes made by other workers arrive as NOTIFY on CHANNEL (statement
+    triggers on the catalog tables, see migration 9). While the LISTEN
+    connection is down those notifications would be lost, so the cache is
+    bypassed until it reconnects, and everything cached before is dropped.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256) -> None:
+        self._entries = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._synced = False
+
+    def version(self, namespaces: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(self._versions[ns] for ns in namespaces)
+
+    def get(self, key: Hashable, namespaces: Sequence[str]) -> Any:
+        if not self._synced:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stamp, value = entry
+        if stamp != self.version(namespaces):
+            self._entries.pop(key)
+            return None
+        return value
+
+    def set(self, key: Hashable, stamp: Tuple[int, ...], value: Any) -> None:
+        self._entries.set(key, (stamp, value))
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        namespaces: Sequence[str],
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return cached value, loading it once if missing (single-flight per key)"""
+        if not self._synced:
+            return await loader()
+
+        value = self.get(key, namespaces)
+        if value is not None:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                value = self.get(key, namespaces)
+                if value is not None:
+                    return value
+                # Lấy version trước khi query để không lưu dữ liệu cũ nếu có thay đổi trong lúc load
+                stamp = self.version(namespaces)
+                value = await loader()
+                self.set(key, stamp, value)
+                return value
+        finally:
+            # Request đang chờ vẫn giữ tham chiếu tới lock, dict chỉ cần trong lúc đang load
+            if not lock.locked() and self._locks.get(key) is lock:
+                del self._locks[key]
+
+    def invalidate(self, *namespaces: str) -> None:
+        for ns in namespaces:
+            self._versions[ns] += 1
+
+    def on_notify(self, data: Dict[str, Any]) -> None:
+        self.invalidate(*data.get("namespaces", ()))
+
+    def on_connect(self) -> None:
+        # Có thể đã bỏ lỡ NOTIFY trước khi kết nối: không tin entry nào được cache trước đó
+        self._entries.clear()
+        self.invalidate(CLINIC, SPECIALTY, DOCTOR)
+        self._synced = True
+
+    def on_disconnect(self) -> None:
+        self._synced = False
+
+
+catalog_cache = CatalogCache(ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+pg_listener.listen(
+    CHANNEL,
+    catalog_cache.on_notify,
+    on_connect=catalog_cache.on_connect,
+    on_disconnect=catalog_cache.on_disconnect,
+)
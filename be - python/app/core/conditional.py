@@ -0,0 +1,101 @@
+"""
+Validators (ETag / Last-Modified) for public catalog GETs.
+
+A validator is derived from max("updatedAt") and row count of every table
+behind a catalog namespace: updates and inserts move max("updatedAt"),
+hard deletes change the count. It is cached in catalog_cache under the
+same namespace versions as the data itself, so a conditional request is
+answered without touching the DB until a catalog write bumps the version.
+Writes from any worker reach every worker through the catalog_events
+NOTIFY, and while that listener is down the cache is bypassed, so all
+workers hand out the same validators for the same data.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Type
+from sqlalchemy import func, literal, union_all
+from sqlalchemy.future import select
+from app.core.cache import catalog_cache, CLINIC, DOCTOR, SPECIALTY
+from app.db.database import AsyncSessionLocal
+from app.models.base_model import BaseModel
+from app.models.clinic import Clinic
+from app.models.doctor_user import DoctorUser
+from app.models.specialization import Specialization
+from app.models.user import User
+
+# Bảng dữ liệu đứng sau mỗi namespace của catalog
+NAMESPACE_TABLES: Dict[str, List[Type[BaseModel]]] = {
+    CLINIC: [Clinic],
+    SPECIALTY: [Specialization],
+    DOCTOR: [User, DoctorUser],
+}
+
+class CatalogValidator(NamedTuple):
+    seed: str
+    last_modified: Optional[datetime]
+
+    def etag(self, resource: str) -> str:
+        # Weak ETag: đại diện cho trạng thái dữ liệu, không phải từng byte của body
+        digest = hashlib.sha256(f"{self.seed}|{resource}".encode()).hexdigest()[:32]
+        return f'W/"{digest}"'
+
+    def last_modified_header(self) -> Optional[str]:
+        if self.last_modified is None:
+            return None
+        return format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+async def _load_validator(namespaces: Sequence[str]) -> CatalogValidator:
+    tables = sorted(
+        {table for ns in namespaces for table in NAMESPACE_TABLES[ns]},
+        key=lambda table: table.__tablename__,
+    )
+    stmt = union_all(*(
+        select(literal(table.__tablename__), func.max(table.updatedAt), func.count())
+        .select_from(table)
+        for table in tables
+    ))
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(stmt)).all()
+
+    rows.sort(key=lambda row: row[0])
+    seed = ";".join(
+        f"{name}:{updated_at.isoformat() if updated_at else '-'}:{count}"
+        for name, updated_at, count in rows
+    )
+    updated = [updated_at for _, updated_at, _ in rows if updated_at is not None]
+    # HTTP date chỉ chính xác tới giây
+    last_modified = max(updated).replace(microsecond=0) if updated else None
+    return CatalogValidator(seed=seed, last_modified=last_modified)
+
+async def catalog_validator(namespaces: Sequence[str]) -> CatalogValidator:
+    namespaces = tuple(sorted(namespaces))
+    return await catalog_cache.get_or_load(
+        ("validator", namespaces),
+        namespaces,
+        lambda: _load_validator(namespaces),
+    )
+
+def is_not_modified(
+    etag: str,
+    last_modified: Optional[datetime],
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> bool:
+    """RFC 9110: If-None-Match (weak comparison) takes precedence over If-Modified-Since"""
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        weak = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == weak for tag in if_none_match.split(","))
+
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return last_modified <= since
+
+    return False
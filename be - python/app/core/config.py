@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Project"
@@ -19,16 +19,88 @@ class Settings(BaseSettings):
     # Database pool settings
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Log mọi câu SQL (chỉ dùng khi debug)
+    DB_ECHO: bool = False
+
+    # Keyset pagination
+    PAGINATION_DEFAULT_LIMIT: int = 20
+    PAGINATION_MAX_LIMIT: int = 100
+    # Dưới ngưỡng này thì đếm chính xác bằng COUNT, trên thì dùng ước lượng của planner
+    PAGINATION_EXACT_COUNT_THRESHOLD: int = 1000
+
+    # Streaming export (CSV/XLSX)
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    # Live supporter queue (SSE + LISTEN/NOTIFY)
+    BOOKING_EVENTS_QUEUE_SIZE: int = 100
+    PG_LISTEN_RECONNECT_SECONDS: float = 3.0
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+
+    # Chỉ mục lịch trống trong bộ nhớ (app/core/availability.py)
+    AVAILABILITY_RELOAD_SECONDS: float = 3600.0
+    AVAILABILITY_MAX_DOCTORS: int = 100
+
+    # Số lịch khám tối đa sinh ra từ một template
+    SCHEDULE_TEMPLATE_MAX_SLOTS: int = 2000
+
+    # Upload ảnh (app/core/uploads.py)
+    UPLOAD_MAX_BYTES: int = 2 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    # Phần body multipart ngoài file (boundary, header, field khác) được cho phép thêm trước khi trả 413
+    UPLOAD_MULTIPART_OVERHEAD_BYTES: int = 64 * 1024
+
+    # Ảnh thu nhỏ / WebP / AVIF (cần Pillow)
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_FAILED_RETRY_SECONDS: float = 3600.0
+    # Tạo variant cho ảnh cũ (app/core/image_backfill.py)
+    IMAGE_BACKFILL_INTERVAL_SECONDS: float = 3600.0
+    IMAGE_BACKFILL_BATCH_SIZE: int = 50
+    # Khi tắt app: chỉ chờ ảnh đang render trong process pool, không chờ hết batch
+    IMAGE_BACKFILL_STOP_TIMEOUT_SECONDS: float = 10.0
+
+    # Static files (app/core/static_files.py)
+    STATIC_MAX_AGE_SECONDS: int = 86400
+    STATIC_CHUNK_BYTES: int = 256 * 1024
+    # Zero-copy qua reverse proxy: "X-Accel-Redirect" (nginx) hoặc "X-Sendfile" (Apache / lighttpd).
+    # Để trống thì app tự stream file theo STATIC_CHUNK_BYTES (uvicorn không có sendfile).
+    STATIC_SENDFILE_HEADER: Optional[str] = None
+    # nginx: location internal trỏ vào app/public, vd. location /_public/ { internal; alias /srv/app/public/; }
+    STATIC_ACCEL_PREFIX: str = "/_public"
+
+    # Kho ảnh gốc đặt tên theo SHA-256 (app/core/storage.py)
+    IMAGE_STORAGE_BACKEND: str = "local"  # "local" hoặc "s3"
+    S3_ENDPOINT_URL: Optional[str] = None  # vd. MinIO chạy local: http://localhost:9000
+    S3_BUCKET: str = "doctorcare-images"
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY: Optional[str] = None
+    S3_SECRET_KEY: Optional[str] = None
+    IMAGE_GC_INTERVAL_SECONDS: float = 3600.0
+    IMAGE_GC_GRACE_SECONDS: float = 24 * 3600.0
+    IMAGE_GC_BATCH_SIZE: int = 100
+    # Chờ GC xong batch đang xóa khi tắt app (mỗi file là một lệnh xóa local / S3)
+    IMAGE_GC_STOP_TIMEOUT_SECONDS: float = 30.0
+
+    # Cache settings
+    CATALOG_CACHE_TTL_SECONDS: int = 300
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAXSIZE: int = 10000
     
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    # Password hashing (bcrypt) thread pool
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     # JWT Settings
     SECRET_KEY: str = "your-secret-key-here"  # Thay đổi trong production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60*24
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5.0
     
     # Cookie settings
     COOKIE_SECURE: bool = False  # Set True in production
@@ -66,6 +138,9 @@ class Settings(BaseSettings):
     CORS_CREDENTIALS: bool = True
     
     PORT: int = 8001
+
+    # Log toàn bộ request/response headers (chỉ dùng khi debug)
+    DEBUG_HEADERS: bool = False
     
     # Email Settings
     MAIL_USERNAME: str = "learningfjd@gmail.com"
@@ -79,6 +154,13 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     MAIL_TIMEOUT: int = 60
 
+    # Email outbox worker
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BASE_BACKOFF_SECONDS: float = 30.0
+    EMAIL_OUTBOX_MAX_BACKOFF_SECONDS: float = 3600.0
+
     # Template Settings
     EMAIL_TEMPLATES_DIR: str = "app/templates/email"
 
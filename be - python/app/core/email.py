@@ -1,6 +1,7 @@
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from pathlib import Path
+from app.models.email_outbox import EmailOutbox
 from jinja2 import Environment, select_autoescape, FileSystemLoader
 
 # Configure FastMail
@@ -10,9 +11,11 @@ conf = ConnectionConfig(
     MAIL_FROM=settings.MAIL_FROM,
     MAIL_PORT=settings.MAIL_PORT,
     MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True
+    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
+    MAIL_STARTTLS=settings.MAIL_STARTTLS,
+    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
+    USE_CREDENTIALS=settings.USE_CREDENTIALS,
+    TIMEOUT=settings.MAIL_TIMEOUT
 )
 
 # Initialize FastMail
@@ -20,71 +23,46 @@ fastmail = FastMail(conf)
 
 # Configure Jinja2 for email templates
 env = Environment(
-    loader=FileSystemLoader("app/templates/email"),
+    loader=FileSystemLoader(settings.EMAIL_TEMPLATES_DIR),
     autoescape=select_autoescape(['html', 'xml'])
 )
 
-async def send_booking_success_email(email_to: str, data: dict):
-    template = env.get_template("booking_success.html")
-    html = template.render(**data)
-    
-    message = MessageSchema(
-        subject="Xác nhận lịch khám tại DoctorCare",
-        recipients=[email_to],
-        body=html,
-        subtype="html"
+def queue_email(db: AsyncSession, email_to: str, subject: str, template_name: str, data: dict) -> EmailOutbox:
+    """
+    Render the email and add it to the outbox in the caller's transaction.
+    Nothing is sent until the transaction commits and the outbox worker picks it up.
+    """
+    template = env.get_template(template_name)
+    message = EmailOutbox(
+        recipient=email_to,
+        subject=subject,
+        body=template.render(**data)
     )
-    
-    await fastmail.send_message(message)
+    db.add(message)
+    return message
 
-async def send_booking_failed_email(email_to: str, data: dict):
-    template = env.get_template("booking_failed.html")
-    html = template.render(**data)
-    
-    message = MessageSchema(
-        subject="Thông báo hủy lịch khám tại DoctorCare",
-        recipients=[email_to],
-        body=html,
-        subtype="html"
+async def send_outbox_message(message: EmailOutbox):
+    """Deliver one outbox row over SMTP (used by the outbox worker)"""
+    await fastmail.send_message(
+        MessageSchema(
+            subject=message.subject,
+            recipients=[message.recipient],
+            body=message.body,
+            subtype="html"
+        )
     )
-    
-    await fastmail.send_message(message)
 
-async def send_booking_new_email(email_to: str, data: dict):
-    template = env.get_template("booking_new.html")
-    html = template.render(**data)
-    
-    message = MessageSchema(
-        subject="Thông báo đặt lịch khám tại DoctorCare",
-        recipients=[email_to],
-        body=html,
-        subtype="html"
-    )
-    
-    await fastmail.send_message(message)
+def queue_booking_success_email(db: AsyncSession, email_to: str, data: dict):
+    return queue_email(db, email_to, "Xác nhận lịch khám tại DoctorCare", "booking_success.html", data)
 
-async def send_bill_email(email_to: str, data: dict):
-    template = env.get_template("bill.html")
-    html = template.render(**data)
-    
-    message = MessageSchema(
-        subject="Hóa đơn khám bệnh từ DoctorCare",
-        recipients=[email_to],
-        body=html,
-        subtype="html"
-    )
-    
-    await fastmail.send_message(message)
+def queue_booking_failed_email(db: AsyncSession, email_to: str, data: dict):
+    return queue_email(db, email_to, "Thông báo hủy lịch khám tại DoctorCare", "booking_failed.html", data)
 
-async def send_forgot_password_email(email_to: str, data: dict):
-    template = env.get_template("forgot_password.html")
-    html = template.render(**data)
-    
-    message = MessageSchema(
-        subject="Mật khẩu mới từ DoctorCare",
-        recipients=[email_to],
-        body=html,
-        subtype="html"
-    )
-    
-    await fastmail.send_message(message) 
\ No newline at end of file
+def queue_booking_new_email(db: AsyncSession, email_to: str, data: dict):
+    return queue_email(db, email_to, "Thông báo đặt lịch khám tại DoctorCare", "booking_new.html", data)
+
+def queue_bill_email(db: AsyncSession, email_to: str, data: dict):
+    return queue_email(db, email_to, "Hóa đơn khám bệnh từ DoctorCare", "bill.html", data)
+
+def queue_forgot_password_email(db: AsyncSession, email_to: str, data: dict):
+    return queue_email(db, email_to, "Mật khẩu mới từ DoctorCare", "forgot_password.html", data)
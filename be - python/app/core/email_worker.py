@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Row, and_, or_, update
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.email import send_outbox_message
+from app.db.database import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter, capped at EMAIL_OUTBOX_MAX_BACKOFF_SECONDS"""
+    delay = min(
+        settings.EMAIL_OUTBOX_BASE_BACKOFF_SECONDS * (2 ** (attempts - 1)),
+        settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS
+    )
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+class EmailOutboxWorker:
+    """Background task that drains the email outbox with retries and backoff"""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="email-outbox-worker")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=settings.MAIL_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self) -> None:
+        logger.info("Email outbox worker started")
+        while not self._stopping.is_set():
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Email outbox drain failed: {str(e)}")
+                processed = 0
+
+            # Còn việc thì chạy tiếp ngay, hết việc thì chờ tới lần poll sau
+            if processed < settings.EMAIL_OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(),
+                        timeout=settings.EMAIL_OUTBOX_POLL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        logger.info("Email outbox worker stopped")
+
+    async def claim_batch(self) -> Tuple[List[Row], datetime]:
+        """
+        Lease one batch of due messages and commit, so no row lock or pooled
+        connection is held while talking to SMTP.
+        """
+        now = datetime.utcnow()
+        # Đủ cho cả batch gửi tuần tự, mỗi message tối đa MAIL_TIMEOUT giây
+        locked_until = now + timedelta(seconds=settings.MAIL_TIMEOUT * settings.EMAIL_OUTBOX_BATCH_SIZE)
+        due = (
+            select(EmailOutbox.id)
+            .where(or_(
+                and_(EmailOutbox.status == OutboxStatus.Pending, EmailOutbox.nextAttemptAt <= now),
+                # Lease hết hạn: worker trước đã dừng giữa chừng
+                and_(EmailOutbox.status == OutboxStatus.Sending, EmailOutbox.lockedUntil <= now),
+            ))
+            .order_by(EmailOutbox.nextAttemptAt)
+            .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+            # SKIP LOCKED để nhiều worker/process có thể nhận việc song song mà không gửi trùng
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due.scalar_subquery()))
+                .values(status=OutboxStatus.Sending, lockedUntil=locked_until)
+                .returning(
+                    EmailOutbox.id,
+                    EmailOutbox.recipient,
+                    EmailOutbox.subject,
+                    EmailOutbox.body,
+                    EmailOutbox.attempts
+                )
+                .execution_options(synchronize_session=False)
+            )
+            messages = result.all()
+            await session.commit()
+        return messages, locked_until
+
+    async def finish(self, message_id: UUID, locked_until: datetime, **values: Any) -> None:
+        """Record the outcome, unless the lease expired and another worker took the row over"""
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(EmailOutbox)
+                .where(
+                    EmailOutbox.id == message_id,
+                    EmailOutbox.status == OutboxStatus.Sending,
+                    EmailOutbox.lockedUntil == locked_until
+                )
+                .values(lockedUntil=None, **values)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    async def drain_once(self) -> int:
+        """Send one batch of due messages, returns the number of rows processed"""
+        messages, locked_until = await self.claim_batch()
+
+        for message in messages:
+            try:
+                await send_outbox_message(message)
+            except Exception as e:
+                attempts = message.attempts + 1
+                if attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    logger.error(f"Email {message.id} to {message.recipient} failed permanently: {str(e)}")
+                    # Không giữ lại nội dung (có thể chứa mật khẩu mới) khi đã bỏ cuộc
+                    await self.finish(
+                        message.id, locked_until,
+                        status=OutboxStatus.Failed, attempts=attempts, lastError=str(e)[:1000], body=""
+                    )
+                else:
+                    logger.warning(f"Email {message.id} failed (attempt {attempts}), retrying: {str(e)}")
+                    await self.finish(
+                        message.id, locked_until,
+                        status=OutboxStatus.Pending, attempts=attempts, lastError=str(e)[:1000],
+                        nextAttemptAt=datetime.utcnow() + retry_delay(attempts)
+                    )
+                continue
+
+            # Không giữ lại nội dung (có thể chứa mật khẩu mới) sau khi đã gửi
+            await self.finish(
+                message.id, locked_until,
+                status=OutboxStatus.Sent, sentAt=datetime.utcnow(), lastError=None, body=""
+            )
+
+        return len(messages)
+
+email_outbox_worker = EmailOutboxWorker()
@@ -0,0 +1,124 @@
+"""
+Streaming CSV / XLSX exports.
+
+Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+and written out in chunks, so neither the worker nor the browser has to
+hold the whole dataset.
+"""
+import csv
+import io
+import tempfile
+from enum import Enum
+from typing import Any, AsyncIterator, Optional, Sequence
+from urllib.parse import quote
+from uuid import UUID
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX là tùy chọn, CSV luôn có sẵn
+    Workbook = None
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    xlsx = "xlsx"
+
+async def stream_rows(stmt: Select) -> AsyncIterator[Sequence[Any]]:
+    """
+    Yield rows of `stmt` from a server-side cursor.
+
+    Uses its own session: the response body is produced after the request's
+    get_db session has been closed.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for row in result:
+            yield row
+
+# Ký tự mở đầu mà Excel/LibreOffice hiểu là công thức (CSV/formula injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Dấu ' buộc ô được đọc như chuỗi, kể cả khi người dùng nhập "=HYPERLINK(...)"
+        return "'" + value
+    return value
+
+async def _csv_chunks(header: Sequence[str], rows: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM để Excel đọc đúng UTF-8 (tiếng Việt)
+    buffer.write("\ufeff")
+    writer.writerow(header)
+
+    async for row in rows:
+        writer.writerow([_cell(value) for value in row])
+        if buffer.tell() >= settings.EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+async def _xlsx_chunks(
+    sheet_title: str,
+    header: Sequence[str],
+    rows: AsyncIterator[Sequence[Any]],
+) -> AsyncIterator[bytes]:
+    # write_only: openpyxl ghi từng row ra file tạm thay vì giữ trong bộ nhớ
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(list(header))
+    async for row in rows:
+        sheet.append([_cell(value) for value in row])
+
+    # File xlsx là zip nên chỉ đóng gói được khi đã có đủ row
+    with tempfile.TemporaryFile() as output:
+        await run_in_threadpool(workbook.save, output)
+        output.seek(0)
+        while chunk := await run_in_threadpool(output.read, settings.EXPORT_CHUNK_BYTES):
+            yield chunk
+
+def export_response(
+    export_format: ExportFormat,
+    filename: str,
+    header: Sequence[str],
+    rows: AsyncIterator[Sequence[Any]],
+    sheet_title: Optional[str] = None,
+) -> StreamingResponse:
+    if export_format == ExportFormat.xlsx:
+        if Workbook is None:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Xuất file XLSX cần cài đặt openpyxl, hãy dùng format=csv"
+            )
+        body = _xlsx_chunks(sheet_title or filename, header, rows)
+        media_type = XLSX_MEDIA_TYPE
+    else:
+        body = _csv_chunks(header, rows)
+        media_type = CSV_MEDIA_TYPE
+
+    filename = f"{filename}.{export_format.value}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+            "Cache-Control": "no-store",
+        },
+    )
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from typing import Optional, Tuple
+from sqlalchemy import func, or_, update
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.images import IMAGE_ROOT, ensure_variants, image_processor
+from app.core.storage import image_storage
+from app.db.database import AsyncSessionLocal
+from app.models.clinic import Clinic
+from app.models.specialization import Specialization
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# (thư mục ảnh, cột tên file, cột variants)
+IMAGE_COLUMNS = (
+    ("clinics", Clinic.image, Clinic.imageVariants),
+    ("specializations", Specialization.image, Specialization.imageVariants),
+    ("users", User.avatar, User.avatarVariants),
+)
+
+def _missing(variants_column):
+    # None gán qua ORM được lưu thành JSON 'null', không phải SQL NULL
+    return or_(variants_column.is_(None), func.jsonb_typeof(variants_column) == "null")
+
+class ImageVariantBackfill:
+    """
+    Background task generating variants for images uploaded before the
+    pipeline existed, so public GETs never start image processing.
+    """
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        # Không có Pillow thì không có gì để tạo
+        if self._task is None and image_processor.enabled:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="image-variant-backfill")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=settings.IMAGE_BACKFILL_STOP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self) -> None:
+        logger.info("Image variant backfill started")
+        while not self._stopping.is_set():
+            try:
+                await self.backfill_once()
+            except Exception as e:
+                logger.error(f"Image variant backfill failed: {str(e)}")
+
+            try:
+                await asyncio.wait_for(
+                    self._stopping.wait(),
+                    timeout=settings.IMAGE_BACKFILL_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Image variant backfill stopped")
+
+    async def backfill_once(self) -> int:
+        """One pass over every image column, returns the number of images that got variants"""
+        done = 0
+        for directory, image_column, variants_column in IMAGE_COLUMNS:
+            last = ""
+            while not self._stopping.is_set():
+                names = await self._next_batch(image_column, variants_column, last)
+                if not names:
+                    break
+                for name in names:
+                    if self._stopping.is_set():
+                        break
+                    if await self._backfill(directory, name, image_column, variants_column):
+                        done += 1
+                last = names[-1]
+
+        if done:
+            logger.info(f"Image variant backfill generated variants for {done} images")
+        return done
+
+    async def _next_batch(self, image_column, variants_column, after: str) -> Tuple[str, ...]:
+        # Keyset theo tên file: ảnh lỗi không chặn các ảnh phía sau
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(image_column)
+                .where(image_column.is_not(None), image_column > after, _missing(variants_column))
+                .distinct()
+                .order_by(image_column)
+                .limit(settings.IMAGE_BACKFILL_BATCH_SIZE)
+            )
+            return tuple(result.scalars().all())
+
+    async def _backfill(self, directory: str, name: str, image_column, variants_column) -> bool:
+        await image_storage.fetch(f"{directory}/{name}")
+        if not (IMAGE_ROOT / directory / name).is_file():
+            return False
+
+        variants = await ensure_variants(directory, name)
+        if variants is None:
+            return False
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(variants_column.class_)
+                .where(image_column == name, _missing(variants_column))
+                .values({variants_column.key: variants})
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return True
+
+image_variant_backfill = ImageVariantBackfill()
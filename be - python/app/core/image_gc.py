@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.core.storage import image_storage
+from app.db.database import AsyncSessionLocal
+from app.models.image_blob import ImageBlob
+
+logger = logging.getLogger(__name__)
+
+class ImageGarbageCollector:
+    """Background task removing image blobs no clinic, specialty or user references"""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="image-gc")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=settings.IMAGE_GC_STOP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self) -> None:
+        logger.info("Image GC started")
+        while not self._stopping.is_set():
+            try:
+                removed = await self.collect_once()
+            except Exception as e:
+                logger.error(f"Image GC failed: {str(e)}")
+                removed = 0
+
+            if removed < settings.IMAGE_GC_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(),
+                        timeout=settings.IMAGE_GC_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        logger.info("Image GC stopped")
+
+    async def collect_once(self) -> int:
+        """Delete one batch of unreferenced blobs, returns the number of rows processed"""
+        # Thời gian chờ: ảnh vừa upload chưa kịp gắn vào phòng khám / user có refCount = 0
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.IMAGE_GC_GRACE_SECONDS)
+        async with AsyncSessionLocal() as session:
+            # Giữ row lock tới khi xóa xong file: upload cùng nội dung sẽ chờ (app/core/uploads.py)
+            result = await session.execute(
+                select(ImageBlob)
+                .where(ImageBlob.refCount <= 0, ImageBlob.updatedAt < cutoff)
+                .order_by(ImageBlob.updatedAt)
+                .limit(settings.IMAGE_GC_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            blobs = result.scalars().all()
+
+            for blob in blobs:
+                try:
+                    await image_storage.delete(f"{blob.directory}/{blob.name}")
+                except Exception as e:
+                    logger.error(f"Deleting image {blob.directory}/{blob.name} failed: {str(e)}")
+                    continue
+                await session.delete(blob)
+
+            await session.commit()
+            if blobs:
+                logger.info(f"Image GC removed {len(blobs)} unreferenced images")
+            return len(blobs)
+
+image_gc = ImageGarbageCollector()
@@ -0,0 +1,183 @@
+"""
+Image derivatives for uploaded clinic, specialty and avatar images.
+
+Every original gets fixed-width variants (IMAGE_SIZES) in WebP, and in
+AVIF when the installed Pillow can write it. They are generated in a
+process pool so resizing never blocks the event loop. Variant files live
+next to the original as <stem>_<size>.<format>. Images uploaded before the
+pipeline existed get theirs from the background backfill
+(app/core/image_backfill.py), never from a public GET. Pillow is optional:
+without it only the original is stored and served.
+"""
+import asyncio
+import logging
+import mimetypes
+import os
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+IMAGE_ROOT = Path("app/public/images")
+
+# Chiều rộng tối đa của từng cỡ, giữ nguyên tỉ lệ ảnh
+IMAGE_SIZES: Dict[str, int] = {
+    "thumb": 160,
+    "card": 480,
+    "large": 1200,
+}
+
+# Thứ tự ưu tiên khi trình duyệt hỗ trợ nhiều định dạng
+VARIANT_FORMATS = ("avif", "webp")
+
+SAVE_OPTIONS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 6},
+}
+
+class ImageSize(str, Enum):
+    thumb = "thumb"
+    card = "card"
+    large = "large"
+    original = "original"
+
+def variant_name(file_name: str, size: str, fmt: str) -> str:
+    return f"{Path(file_name).stem}_{size}.{fmt}"
+
+def _writable_formats():
+    Image.init()
+    return tuple(fmt for fmt in VARIANT_FORMATS if fmt.upper() in Image.SAVE)
+
+def _generate_variants(path: str) -> Dict[str, Dict[str, str]]:
+    """Resize one original into every size/format (runs in a worker process)"""
+    source = Path(path)
+    formats = _writable_formats()
+    variants: Dict[str, Dict[str, str]] = {}
+
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        if image.mode in ("P", "LA", "PA") or "transparency" in image.info:
+            image = image.convert("RGBA")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+
+        for size, width in IMAGE_SIZES.items():
+            resized = image.copy()
+            # thumbnail() không phóng to ảnh nhỏ hơn kích thước đích
+            resized.thumbnail((width, width * 4))
+            for fmt in formats:
+                name = variant_name(source.name, size, fmt)
+                # Ghi file tạm rồi rename để request khác không đọc phải file dở
+                temp = source.with_name(f".{name}.{os.getpid()}.tmp")
+                resized.save(temp, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+                temp.replace(source.with_name(name))
+                variants.setdefault(size, {})[fmt] = name
+
+    return variants
+
+class ImageProcessor:
+    """Process pool for image derivatives, created on first use"""
+
+    def __init__(self, workers: int) -> None:
+        self._workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Ảnh không đọc được: không thử lại trong IMAGE_FAILED_RETRY_SECONDS
+        self._failed = TTLCache(ttl=settings.IMAGE_FAILED_RETRY_SECONDS, maxsize=1024)
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None
+
+    async def generate(self, path: Path) -> Optional[Dict[str, Dict[str, str]]]:
+        """Generate all variants of `path`; returns None if Pillow is missing or the image is unreadable"""
+        if not self.enabled:
+            return None
+
+        key = str(path)
+        if self._failed.get(key):
+            return None
+        # Single-flight: nhiều request cùng lúc cho một ảnh chỉ xử lý một lần
+        pending = self._pending.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except Exception:
+                return None
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, _generate_variants, key)
+        self._pending[key] = future
+        try:
+            return await future
+        except Exception as e:
+            logger.error(f"Generating image variants for {path} failed: {str(e)}")
+            self._failed.set(key, True)
+            return None
+        finally:
+            self._pending.pop(key, None)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+image_processor = ImageProcessor(workers=settings.IMAGE_PROCESS_WORKERS)
+
+def image_variants(directory: str, file_name: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """Variants present on disk for an original, as stored in the *Variants columns"""
+    if not file_name:
+        return None
+    folder = IMAGE_ROOT / directory
+    file_name = Path(file_name).name
+    variants: Dict[str, Dict[str, str]] = {}
+    for size in IMAGE_SIZES:
+        for fmt in VARIANT_FORMATS:
+            name = variant_name(file_name, size, fmt)
+            if (folder / name).is_file():
+                variants.setdefault(size, {})[fmt] = name
+    return variants or None
+
+async def ensure_variants(directory: str, file_name: str) -> Optional[Dict[str, Dict[str, str]]]:
+    """Variants of an original, generated only if the same content was not processed before"""
+    variants = image_variants(directory, file_name)
+    if variants is None:
+        await image_processor.generate(IMAGE_ROOT / directory / file_name)
+        variants = image_variants(directory, file_name)
+    return variants
+
+def select_image(directory: str, file_name: str, size: ImageSize, accept: str) -> Optional[Path]:
+    """
+    Pick the file to serve: the best variant format the client accepts,
+    falling back to the original when it has no variants (yet).
+    """
+    folder = IMAGE_ROOT / directory
+    original = folder / file_name
+    if not original.is_file():
+        return None
+    if size == ImageSize.original:
+        return original
+
+    accepted = [fmt for fmt in VARIANT_FORMATS if f"image/{fmt}" in accept]
+    if not accepted:
+        return original
+
+    for fmt in accepted:
+        candidate = folder / variant_name(file_name, size.value, fmt)
+        if candidate.is_file():
+            return candidate
+    return original
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+import asyncpg
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class PgListener:
+    """
+    A single dedicated LISTEN connection per worker, shared by every channel.
+
+    The connection lives outside the SQLAlchemy pool and reconnects on loss.
+    NOTIFY sent while disconnected is lost, so `on_connect` callbacks run on
+    every (re)connect to let consumers resynchronise, and `on_disconnect`
+    callbacks run when the connection drops.
+    """
+
+    def __init__(self) -> None:
+        self._channels: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._on_connect: List[Callable[[], None]] = []
+        self._on_disconnect: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def listen(
+        self,
+        channel: str,
+        callback: Callable[[Dict[str, Any]], None],
+        on_connect: Optional[Callable[[], None]] = None,
+        on_disconnect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Register `callback` for JSON payloads on `channel` (before start())"""
+        self._channels[channel] = callback
+        if on_connect is not None:
+            self._on_connect.append(on_connect)
+        if on_disconnect is not None:
+            self._on_disconnect.append(on_disconnect)
+
+    def _dispatch(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.error(f"Invalid payload on {channel}: {payload}")
+            return
+        try:
+            self._channels[channel](data)
+        except Exception as e:
+            logger.error(f"Handling notification on {channel} failed: {str(e)}")
+
+    @staticmethod
+    def _notify_all(callbacks: List[Callable[[], None]]) -> None:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"LISTEN connection callback failed: {str(e)}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pg-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        # asyncpg dùng DSN thuần, không có "+asyncpg" của SQLAlchemy
+        dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                for channel in self._channels:
+                    await connection.add_listener(channel, self._dispatch)
+                logger.info(f"Listening on {', '.join(self._channels)}")
+                self._notify_all(self._on_connect)
+                await closed.wait()
+                logger.error("LISTEN connection closed, reconnecting")
+            except asyncio.CancelledError:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+                raise
+            except Exception as e:
+                logger.error(f"LISTEN connection failed: {str(e)}")
+            self._notify_all(self._on_disconnect)
+            await asyncio.sleep(settings.PG_LISTEN_RECONNECT_SECONDS)
+
+pg_listener = PgListener()
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Union
+from uuid import UUID
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+
+# Kênh NOTIFY khi một user thay đổi, payload: {"id": ...} hoặc {} (xóa toàn bộ)
+CHANNEL = "principal_events"
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Slim, immutable view of the authenticated user (no ORM state, no relationships)"""
+    id: UUID
+    email: str
+    name: str
+    roleId: int
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    gender: Optional[str] = None
+    avatar: Optional[str] = None
+    description: Optional[str] = None
+
+# Principal columns loaded by get_current_user, in Principal field order
+PRINCIPAL_COLUMNS = (
+    "id", "email", "name", "roleId", "phone",
+    "address", "gender", "avatar", "description",
+)
+
+class PrincipalCache(TTLCache):
+    """
+    user id -> (token iat, Principal), kept coherent across workers.
+
+    A row trigger on users publishes every change on CHANNEL (see migration
+    12). Like CatalogCache, the cache is bypassed while the LISTEN
+    connection is down, so a change made by another worker is never served
+    stale for up to the TTL.
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        super().__init__(ttl=ttl, maxsize=maxsize)
+        # Tăng mỗi lần invalidate: principal load trước thay đổi không được lưu vào cache
+        self.version = 0
+        self._synced = False
+
+    def get(self, key: Hashable) -> Any:
+        if not self._synced:
+            return None
+        return super().get(key)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, version: Optional[int] = None) -> None:
+        if not self._synced or (version is not None and version != self.version):
+            return
+        super().set(key, value, ttl)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry (or all of them when `key` is None)"""
+        self.version += 1
+        if key is None:
+            self.clear()
+        else:
+            self.pop(key)
+
+    def on_notify(self, data: Dict[str, Any]) -> None:
+        self.invalidate(str(data["id"]) if "id" in data else None)
+
+    def on_connect(self) -> None:
+        # Có thể đã bỏ lỡ NOTIFY trước khi kết nối: không tin entry nào được cache trước đó
+        self.invalidate()
+        self._synced = True
+
+    def on_disconnect(self) -> None:
+        self._synced = False
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE
+)
+pg_listener.listen(
+    CHANNEL,
+    principal_cache.on_notify,
+    on_connect=principal_cache.on_connect,
+    on_disconnect=principal_cache.on_disconnect,
+)
+
+def get_cached_principal(user_id: str, iat: Optional[int]) -> Optional[Principal]:
+    entry = principal_cache.get(user_id)
+    if entry is None:
+        return None
+    cached_iat, principal = entry
+    # Token khác (đăng nhập lại) thì load lại từ DB
+    if cached_iat != iat:
+        return None
+    return principal
+
+def cache_principal(user_id: str, iat: Optional[int], principal: Principal, version: int) -> None:
+    """Cache a principal loaded from the DB; `version` is principal_cache.version read before the query"""
+    principal_cache.set(user_id, (iat, principal), version=version)
+
+def invalidate_principal(user_id: Union[str, UUID]) -> None:
+    """Drop the cached principal right away; other workers drop theirs on the users NOTIFY"""
+    principal_cache.invalidate(str(user_id))
@@ -1,7 +1,22 @@
 from typing import Any, Dict, Optional
+from uuid import UUID
+import orjson
 from fastapi.responses import JSONResponse
 
-class SuccessResponse(JSONResponse):
+def json_default(value: Any) -> Any:
+    # orjson chỉ nhận đúng kiểu uuid.UUID, asyncpg trả về subclass riêng (asyncpg.pgproto.UUID)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (UUID, datetime and enums are serialized natively)"""
+
+    def render(self, content: Any) -> bytes:
+        # OPT_NON_STR_KEYS: cho phép key là Enum (vd: group theo Status)
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+class SuccessResponse(FastJSONResponse):
     def __init__(
         self,
         content: Any,
@@ -20,7 +35,7 @@ class SuccessResponse(JSONResponse):
             headers=headers,
         )
 
-class ErrorResponse(JSONResponse):
+class ErrorResponse(FastJSONResponse):
     def __init__(
         self,
         message: str,
@@ -36,9 +51,9 @@ class ErrorResponse(JSONResponse):
         }
         if errors is not None:
             error_content["errors"] = errors
-            
+
         super().__init__(
             content=error_content,
             status_code=status_code,
             headers=headers,
-        ) 
\ No newline at end of file
+        )
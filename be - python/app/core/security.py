@@ -1,21 +1,21 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, status
 from jose import jwt
 import bcrypt
-from passlib.context import CryptContext
 from app.core.config import settings
 from app.models.user import User
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12
-)
+BCRYPT_ROUNDS = 12
 
-def create_token(user: User, expires_delta: timedelta) -> str:
+def create_token(user: User, expires_delta: timedelta, not_before: Optional[datetime] = None) -> str:
     """Create JWT token with user information"""
-    # Get current timestamp
+    # Get current timestamp (không sớm hơn mốc thu hồi, xem TokenRevocationList.revoke)
     now = datetime.utcnow()
+    if not_before is not None and now < not_before:
+        now = not_before
     
     # Create JWT payload with user info
     payload = {
@@ -41,11 +41,12 @@ def create_token(user: User, expires_delta: timedelta) -> str:
     
     return encoded_jwt
 
-def create_access_token(user: User) -> str:
+def create_access_token(user: User, not_before: Optional[datetime] = None) -> str:
     """Create access token"""
     return create_token(
         user=user,
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        not_before=not_before
     )
 
 def create_refresh_token(user: User) -> str:
@@ -63,13 +64,90 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     
     try:
         return bcrypt.checkpw(plain_password, hashed_password)
-    except Exception:
-        return pwd_context.verify(plain_password.decode('utf-8'), hashed_password.decode('utf-8'))
+    except ValueError:
+        # Không phải hash bcrypt
+        return False
 
 def get_password_hash(password: str) -> str:
     if isinstance(password, str):
         password = password.encode('utf-8')
     
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password, salt)
-    return hashed.decode('utf-8') 
\ No newline at end of file
+    return hashed.decode('utf-8')
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Hash không phải bcrypt $2b$ với số rounds hiện tại (vd: $2a$ / $2y$ từ hệ thống cũ)"""
+    return not hashed_password.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify the password and return a new hash when the stored one is a legacy format"""
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if needs_rehash(hashed_password):
+        return True, get_password_hash(plain_password)
+    return True, None
+
+class PasswordService:
+    """
+    Runs bcrypt in a dedicated, size-limited thread pool so hashing never
+    blocks the event loop. When too many calls are pending, new ones are
+    rejected with 503 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        # Chỉ thay đổi trên event loop thread nên không cần lock
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "inFlight": min(self._pending, self.workers),
+            "queued": max(self._pending - self.workers, 0),
+            "maxPending": self.max_pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+        }
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Hệ thống đang bận, vui lòng thử lại sau",
+                headers={"Retry-After": "1"}
+            )
+        self._pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except BaseException:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+        self._completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+password_service = PasswordService(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+) 
\ No newline at end of file
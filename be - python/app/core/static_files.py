@@ -0,0 +1,146 @@
+"""
+StaticFiles with cache headers for uploaded images and other public assets.
+
+Fingerprinted files (content-addressed <sha256> names, legacy random uuid
+names and their _<size> variants) never change under the same URL and are
+served as immutable; so is a URL whose ?v= equals the file's current ETag
+(a stale or made-up ?v= gets the normal policy). Everything else may be
+cached for STATIC_MAX_AGE_SECONDS. SVG/CSS/JS requests are
+answered from a .br / .gz sibling when the client accepts it.
+
+Starlette's FileResponse always streams the file through Python. With
+STATIC_SENDFILE_HEADER set, responses carry only headers plus
+X-Accel-Redirect / X-Sendfile and the front proxy sends the file itself
+(sendfile, zero-copy).
+"""
+import hashlib
+import os
+import re
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+from app.core.config import settings
+from app.core.images import IMAGE_ROOT
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Gốc của location internal STATIC_ACCEL_PREFIX phía nginx
+STATIC_ROOT = IMAGE_ROOT.parent
+
+# <sha256> (app/core/uploads.py) hoặc uuid4 (ảnh upload trước đó), kèm hậu tố variant _<size>
+FINGERPRINTED_STEM = re.compile(
+    r"^(?:[0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?:_[a-z]+)?$"
+)
+
+# Định dạng text nén tốt; ảnh raster đã được nén sẵn
+PRECOMPRESSED_SUFFIXES = {".svg", ".css", ".js"}
+
+# Thứ tự ưu tiên khi client chấp nhận cả hai
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+def is_fingerprinted(path: Path) -> bool:
+    return bool(FINGERPRINTED_STEM.match(path.stem))
+
+def file_version(stat_result: os.stat_result) -> str:
+    # Cùng công thức với ETag của FileResponse (không có dấu ")
+    return hashlib.md5(f"{stat_result.st_mtime}-{stat_result.st_size}".encode(), usedforsecurity=False).hexdigest()
+
+def version_matches(scope: Scope, stat_result: os.stat_result) -> bool:
+    """?v= pins the URL to one version only if it is the file's current version"""
+    version = QueryParams(scope.get("query_string", b"")).get("v")
+    return version is not None and version == file_version(stat_result)
+
+def offload(response: FileResponse) -> Response:
+    """Hand the file to the front proxy (STATIC_SENDFILE_HEADER) instead of streaming it"""
+    header = settings.STATIC_SENDFILE_HEADER
+    if not header:
+        return response
+
+    path = Path(response.path).resolve()
+    if header.lower() == "x-accel-redirect":
+        relative = path.relative_to(STATIC_ROOT.resolve()).as_posix()
+        target = f"{settings.STATIC_ACCEL_PREFIX.rstrip('/')}/{quote(relative)}"
+    else:
+        target = str(path)
+
+    # Proxy tự gửi nội dung (và Content-Length / Range) từ file
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    headers[header] = target
+    return Response(status_code=response.status_code, headers=headers)
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+class CachedStaticFiles(StaticFiles):
+    def __init__(self, *args, fingerprinted_only: bool = False, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Chỉ phục vụ file có tên fingerprint, mọi file khác trả 404
+        self.fingerprinted_only = fingerprinted_only
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if self.fingerprinted_only and not is_fingerprinted(Path(path)):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def precompressed(self, path: Path, accept_encoding: str) -> Optional[Tuple[str, str, os.stat_result]]:
+        """(path, encoding, stat) of the best .br/.gz sibling the client accepts"""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            candidate = f"{path}{suffix}"
+            try:
+                return candidate, encoding, os.stat(candidate)
+            except OSError:
+                continue
+        return None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = Path(full_path)
+        # Phiên bản tính theo file gốc, không theo bản .br/.gz được gửi
+        immutable = is_fingerprinted(path) or version_matches(scope, stat_result)
+        headers: Dict[str, str] = {
+            "Cache-Control": IMMUTABLE if immutable else f"public, max-age={settings.STATIC_MAX_AGE_SECONDS}",
+        }
+        media_type = None
+
+        if path.suffix in PRECOMPRESSED_SUFFIXES:
+            headers["Vary"] = "Accept-Encoding"
+            encoded = self.precompressed(path, request_headers.get("accept-encoding", ""))
+            if encoded is not None:
+                full_path, encoding, stat_result = encoded
+                headers["Content-Encoding"] = encoding
+                # Content-Type theo file gốc, không phải .br/.gz
+                media_type = guess_type(path.name)[0]
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        response.chunk_size = settings.STATIC_CHUNK_BYTES
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return offload(response)
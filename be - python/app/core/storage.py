@@ -0,0 +1,107 @@
+"""
+Storage backends for uploaded image originals.
+
+Objects are keyed "<directory>/<sha256><ext>". The local directory under
+IMAGE_ROOT is always the serving copy (StaticFiles, /media and the variant
+pipeline read from disk); the S3 backend additionally keeps the durable
+copy in an S3-compatible bucket (MinIO locally) and pulls missing originals
+back on demand.
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.images import IMAGE_ROOT, IMAGE_SIZES, VARIANT_FORMATS, variant_name
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # chỉ cần khi IMAGE_STORAGE_BACKEND=s3 (requirements-s3.txt)
+    boto3 = None
+
+def _remove_local(path: Path) -> None:
+    path.unlink(missing_ok=True)
+    # Variant sinh từ ảnh gốc (app/core/images.py)
+    for size in IMAGE_SIZES:
+        for fmt in VARIANT_FORMATS:
+            path.with_name(variant_name(path.name, size, fmt)).unlink(missing_ok=True)
+
+class LocalImageStorage:
+    """Originals on local disk under `root`"""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+
+    async def put(self, key: str, temp_path: Path) -> Path:
+        """Move a fully written temp file into place; same key means same bytes"""
+        path = self.local_path(key)
+        await run_in_threadpool(os.replace, temp_path, path)
+        return path
+
+    async def fetch(self, key: str) -> Optional[Path]:
+        """Local path of `key`, or None if it is not stored"""
+        path = self.local_path(key)
+        return path if path.is_file() else None
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(_remove_local, self.local_path(key))
+
+class S3ImageStorage(LocalImageStorage):
+    """S3-compatible bucket as the source of truth, local disk as a read-through cache"""
+
+    def __init__(self, root: Path) -> None:
+        if boto3 is None:
+            raise RuntimeError("IMAGE_STORAGE_BACKEND=s3 requires boto3 (pip install -r requirements-s3.txt)")
+        super().__init__(root)
+        self._bucket = settings.S3_BUCKET
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY,
+            aws_secret_access_key=settings.S3_SECRET_KEY,
+        )
+
+    async def put(self, key: str, temp_path: Path) -> Path:
+        await run_in_threadpool(self._client.upload_file, str(temp_path), self._bucket, key)
+        return await super().put(key, temp_path)
+
+    async def fetch(self, key: str) -> Optional[Path]:
+        path = await super().fetch(key)
+        if path is not None:
+            return path
+        return await run_in_threadpool(self._download, key)
+
+    def _download(self, key: str) -> Optional[Path]:
+        path = self.local_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".download-", suffix=".tmp")
+        os.close(fd)
+        try:
+            self._client.download_file(self._bucket, key, temp_name)
+        except ClientError as e:
+            Path(temp_name).unlink(missing_ok=True)
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+        os.replace(temp_name, path)
+        return path
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self._client.delete_object, Bucket=self._bucket, Key=key)
+        await super().delete(key)
+
+def create_image_storage() -> LocalImageStorage:
+    backend = settings.IMAGE_STORAGE_BACKEND.lower()
+    if backend == "local":
+        return LocalImageStorage(IMAGE_ROOT)
+    if backend == "s3":
+        return S3ImageStorage(IMAGE_ROOT)
+    raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND: {settings.IMAGE_STORAGE_BACKEND}")
+
+image_storage = create_image_storage()
@@ -0,0 +1,116 @@
+import asyncio
+import calendar
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Union
+from uuid import UUID
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.token_revocation import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+# Đọc lùi một khoảng để không bỏ sót row commit muộn hoặc lệch giờ giữa các worker
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+def _timestamp(dt: datetime) -> int:
+    # Thời gian lưu trong DB là UTC naive, giống "iat" trong JWT
+    return calendar.timegm(dt.utctimetuple())
+
+def _ceil_second(dt: datetime) -> datetime:
+    # "iat" chỉ chính xác tới giây: làm tròn lên để token cấp trong cùng giây trước khi thu hồi cũng bị chặn
+    if dt.microsecond:
+        return dt.replace(microsecond=0) + timedelta(seconds=1)
+    return dt
+
+class TokenRevocationList:
+    """
+    In-memory denylist: user id -> "not before" timestamp.
+
+    Checked in O(1) per request. Every worker refreshes it incrementally
+    from the token_revocations table (only rows newer than the last seen
+    createdAt), so revocations made by other workers are picked up within
+    TOKEN_REVOCATION_REFRESH_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self._not_before: Dict[str, int] = {}
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, user_id: str, iat: Optional[int]) -> bool:
+        not_before = self._not_before.get(user_id)
+        if not_before is None:
+            return False
+        return iat is None or iat < not_before
+
+    def apply(self, user_id: Union[str, UUID], not_before: datetime) -> None:
+        """Enforce a revocation in this worker; call once its row is committed"""
+        key = str(user_id)
+        timestamp = _timestamp(not_before)
+        if timestamp > self._not_before.get(key, 0):
+            self._not_before[key] = timestamp
+
+    def revoke(self, db: AsyncSession, user_id: Union[str, UUID]) -> datetime:
+        """
+        Revoke every token issued to the user so far (row is written in the
+        caller's transaction). Returns the "not before" time: a replacement
+        token must be issued at or after it to be accepted.
+
+        Nothing changes in memory until the caller commits and passes the
+        result to `apply()`, so a rolled back request revokes nothing.
+        """
+        not_before = _ceil_second(datetime.utcnow())
+        db.add(TokenRevocation(userId=user_id, notBefore=not_before))
+        return not_before
+
+    async def refresh(self) -> None:
+        # Token cũ hơn thời hạn access token đã hết hạn, không cần giữ lại
+        horizon = datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        since = self._watermark - REFRESH_OVERLAP if self._watermark else horizon
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(TokenRevocation.userId, TokenRevocation.notBefore, TokenRevocation.createdAt)
+                .where(TokenRevocation.createdAt > since)
+                .order_by(TokenRevocation.createdAt)
+            )
+            for user_id, not_before, created_at in result:
+                self.apply(user_id, not_before)
+                self._watermark = created_at
+
+            await session.execute(
+                delete(TokenRevocation).where(TokenRevocation.createdAt < horizon)
+            )
+            await session.commit()
+
+        cutoff = _timestamp(horizon)
+        for key in [key for key, value in self._not_before.items() if value < cutoff]:
+            del self._not_before[key]
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="token-revocation-refresh")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Token revocation refresh failed: {str(e)}")
+            await asyncio.sleep(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+token_revocations = TokenRevocationList()
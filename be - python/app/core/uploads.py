@@ -0,0 +1,113 @@
+"""
+Image upload ingestion shared by the clinic, specialty and avatar endpoints.
+
+The multipart body is read once, in large chunks, inside a worker thread:
+size limit, magic-byte check, SHA-256 and the write to a temp file happen
+in the same pass. The file is then stored content-addressed as
+<sha256><ext> through image_storage, so re-uploading the same image reuses
+the existing blob instead of adding a copy.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Tuple
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.images import IMAGE_ROOT
+from app.core.storage import image_storage
+from app.db.database import AsyncSessionLocal
+from app.models.image_blob import ImageBlob
+
+# Chữ ký đầu file -> phần mở rộng lưu trên đĩa (không tin Content-Type / tên file của client)
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+)
+SIGNATURE_LENGTH = max(len(signature) for signature, _ in IMAGE_SIGNATURES)
+
+class StoredUpload(NamedTuple):
+    file_name: str
+    path: Path
+    size: int
+    sha256: str
+
+def _detect_extension(head: bytes) -> str:
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="File type not allowed. Only JPG, JPEG and PNG are allowed"
+    )
+
+def _ingest(source: BinaryIO, directory: Path, max_bytes: int) -> Tuple[Path, int, str, str]:
+    """Copy `source` to a temp file in `directory` in one pass (runs in a worker thread)"""
+    directory.mkdir(parents=True, exist_ok=True)
+    source.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    extension = None
+
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while chunk := source.read(settings.UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size too large. Maximum size is {max_bytes // (1024 * 1024)}MB"
+                    )
+                if extension is None:
+                    head += chunk[:SIGNATURE_LENGTH - len(head)]
+                    if len(head) >= SIGNATURE_LENGTH:
+                        extension = _detect_extension(head)
+                digest.update(chunk)
+                target.write(chunk)
+
+        if extension is None:
+            # File ngắn hơn chữ ký dài nhất
+            extension = _detect_extension(head)
+        return Path(temp_name), size, digest.hexdigest(), extension
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+async def register_blob(directory: str, name: str, size: int) -> None:
+    """
+    Record the blob, or refresh updatedAt if it already exists.
+
+    Runs before the file is put in place: the GC deletes a blob while holding
+    its row lock, so an upload of the same content either waits for that
+    delete and re-creates the row, or resets the grace period first.
+    """
+    stmt = insert(ImageBlob).values(directory=directory, name=name, size=size)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ImageBlob.directory, ImageBlob.name],
+        set_={"updatedAt": func.timezone("utc", func.now())}
+    )
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+async def save_image_upload(
+    file: UploadFile,
+    directory: str,
+    max_bytes: int = settings.UPLOAD_MAX_BYTES,
+) -> StoredUpload:
+    """Validate and store an uploaded JPG/PNG under IMAGE_ROOT/<directory>/<sha256><ext>"""
+    temp_path, size, sha256, extension = await run_in_threadpool(
+        _ingest, file.file, IMAGE_ROOT / directory, max_bytes
+    )
+    file_name = f"{sha256}{extension}"
+    try:
+        await register_blob(directory, file_name, size)
+        path = await image_storage.put(f"{directory}/{file_name}", temp_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return StoredUpload(file_name=file_name, path=path, size=size, sha256=sha256)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from sqlalchemy import text
 from app.db.base_class import Base
+from app.db.migrations import run_migrations
 import importlib
 import logging
 from sqlalchemy.orm import configure_mappers
@@ -19,6 +20,9 @@ def import_models():
     importlib.import_module('app.models.patient_schedule')
     importlib.import_module('app.models.schedule')
     importlib.import_module('app.models.specialization')
+    importlib.import_module('app.models.email_outbox')
+    importlib.import_module('app.models.token_revocation')
+    importlib.import_module('app.models.image_blob')
 
 # Import models trước khi tạo metadata
 import_models()
@@ -27,13 +31,17 @@ import_models()
 configure_mappers()
 
 # Create async engine cho PostgreSQL
+# search_path được gửi trong startup packet của mỗi connection (asyncpg server_settings),
+# nên session không cần chạy thêm `SET search_path` cho mỗi request.
+# pool_recycle thay cho pool_pre_ping để checkout không tốn thêm một round trip.
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,
+    echo=settings.DB_ECHO,
     future=True,
-    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
     pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    connect_args={"server_settings": {"search_path": settings.POSTGRES_SCHEMA}}
 )
 
 # Tạo async session với eager loading
@@ -48,7 +56,6 @@ AsyncSessionLocal = sessionmaker(
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
-            await session.execute(text(f'SET search_path TO {settings.POSTGRES_SCHEMA}'))
             yield session
             await session.commit()
         except Exception as e:
@@ -65,16 +72,16 @@ async def init_db():
             logger.info(f"Creating schema {settings.POSTGRES_SCHEMA} if not exists...")
             await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS {settings.POSTGRES_SCHEMA}'))
             
-            # Set search_path
-            logger.info(f"Setting search_path to {settings.POSTGRES_SCHEMA}...")
-            await conn.execute(text(f'SET search_path TO {settings.POSTGRES_SCHEMA}'))
-            
             # Tạo các bảng
             logger.info("Creating all tables...")
             # Đảm bảo metadata được set schema trước khi tạo bảng
             for table in Base.metadata.tables.values():
                 table.schema = settings.POSTGRES_SCHEMA
             await conn.run_sync(Base.metadata.create_all)
+
+            # Áp dụng các migration còn thiếu (index, cột mới cho bảng đã tồn tại)
+            logger.info("Running schema migrations...")
+            await run_migrations(conn, settings.POSTGRES_SCHEMA)
             
             logger.info("Database initialization completed successfully")
     except Exception as e:
@@ -0,0 +1,19 @@
+from typing import Optional
+from sqlalchemy.exc import DBAPIError
+
+# SQLSTATE của PostgreSQL
+EXCLUSION_VIOLATION = "23P01"
+
+def _driver_error(error: DBAPIError):
+    # asyncpg: SQLAlchemy bọc lỗi gốc, lỗi của driver nằm ở __cause__
+    return getattr(error.orig, "__cause__", None) or error.orig
+
+def sqlstate(error: DBAPIError) -> Optional[str]:
+    return getattr(error.orig, "sqlstate", None) or getattr(_driver_error(error), "sqlstate", None)
+
+def is_exclusion_violation(error: DBAPIError, constraint: str) -> bool:
+    """True if `error` was raised by the exclusion constraint `constraint`"""
+    if sqlstate(error) != EXCLUSION_VIOLATION:
+        return False
+    name = getattr(_driver_error(error), "constraint_name", None)
+    return name is None or name == constraint
@@ -0,0 +1,46 @@
+from typing import Dict, Tuple
+from sqlalchemy.orm import joinedload, raiseload
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.models.user import User
+from app.models.doctor_user import DoctorUser
+from app.models.clinic import Clinic
+from app.models.specialization import Specialization
+
+# Relationships trên User mặc định là lazy="raise": mỗi endpoint phải chọn rõ
+# profile cần load, truy cập relationship ngoài profile sẽ báo lỗi thay vì âm thầm query thêm.
+LOADER_PROFILES: Dict[str, Tuple[LoaderOption, ...]] = {
+    # Chỉ các cột của user (login, đổi mật khẩu, ...)
+    "principal": (
+        raiseload("*"),
+    ),
+    # Thẻ bác sĩ trên trang danh sách
+    "doctor_card": (
+        joinedload(User.doctor_user)
+        .joinedload(DoctorUser.specialization)
+        .load_only(Specialization.name),
+        joinedload(User.doctor_user)
+        .joinedload(DoctorUser.clinic)
+        .load_only(Clinic.name, Clinic.address, Clinic.image, Clinic.description),
+        raiseload("*"),
+    ),
+    # Trang chi tiết bác sĩ
+    "doctor_detail": (
+        joinedload(User.doctor_user)
+        .joinedload(DoctorUser.specialization)
+        .load_only(Specialization.name, Specialization.description),
+        joinedload(User.doctor_user)
+        .joinedload(DoctorUser.clinic)
+        .load_only(Clinic.name, Clinic.address, Clinic.description),
+        raiseload("*"),
+    ),
+    # Một dòng trong bảng quản lý user của admin
+    "admin_row": (
+        joinedload(User.doctor_user).joinedload(DoctorUser.specialization),
+        joinedload(User.doctor_user).joinedload(DoctorUser.clinic),
+        raiseload("*"),
+    ),
+}
+
+def loader_profile(name: str) -> Tuple[LoaderOption, ...]:
+    """Return the loader options for a named profile, e.g. select(User).options(*loader_profile("doctor_card"))"""
+    return LOADER_PROFILES[name]
@@ -0,0 +1,371 @@
+import logging
+from typing import List, NamedTuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# Khóa advisory để nhiều worker khởi động cùng lúc không chạy migration song song
+MIGRATION_LOCK_ID = 7302190
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    # Câu lệnh SQL, "{schema}" sẽ được thay bằng POSTGRES_SCHEMA
+    statements: List[str]
+
+# create_all chỉ tạo bảng mới, không thêm index/cột vào bảng đã tồn tại.
+# Mọi thay đổi schema cho database đang chạy phải thêm một Migration mới vào cuối danh sách.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="Secondary indexes for schedule, booking and doctor lookups",
+        statements=[
+            'CREATE INDEX IF NOT EXISTS "ix_schedules_doctorId_startTime" '
+            'ON "{schema}".schedules ("doctorId", "startTime")',
+            'CREATE INDEX IF NOT EXISTS "ix_schedules_active_doctorId_startTime_endTime" '
+            'ON "{schema}".schedules ("doctorId", "startTime", "endTime") WHERE NOT "isDeleted"',
+            'CREATE INDEX IF NOT EXISTS "ix_schedules_available_doctorId_startTime" '
+            'ON "{schema}".schedules ("doctorId", "startTime") WHERE "sumBooking" < "maxBooking"',
+            'CREATE INDEX IF NOT EXISTS "ix_patient_schedule_scheduleId" '
+            'ON "{schema}".patient_schedule ("scheduleId")',
+            'CREATE INDEX IF NOT EXISTS "ix_patient_schedule_status" '
+            'ON "{schema}".patient_schedule (status)',
+            'CREATE INDEX IF NOT EXISTS "ix_doctor_user_clinicId" '
+            'ON "{schema}".doctor_user ("clinicId")',
+            'CREATE INDEX IF NOT EXISTS "ix_doctor_user_specializationId" '
+            'ON "{schema}".doctor_user ("specializationId")',
+            'CREATE INDEX IF NOT EXISTS "ix_users_roleId" '
+            'ON "{schema}".users ("roleId")',
+            'ANALYZE "{schema}".schedules',
+            'ANALYZE "{schema}".patient_schedule',
+            'ANALYZE "{schema}".doctor_user',
+            'ANALYZE "{schema}".users',
+        ],
+    ),
+    Migration(
+        version=2,
+        description="Keyset pagination and prefix search indexes for users",
+        statements=[
+            'CREATE INDEX IF NOT EXISTS "ix_users_createdAt_id" '
+            'ON "{schema}".users ("createdAt", id)',
+            # Tìm theo tiền tố tên/email không phân biệt hoa thường: lower(col) LIKE 'abc%'
+            'CREATE INDEX IF NOT EXISTS "ix_users_lower_name_prefix" '
+            'ON "{schema}".users (lower(name) text_pattern_ops)',
+            'CREATE INDEX IF NOT EXISTS "ix_users_lower_email_prefix" '
+            'ON "{schema}".users (lower(email) text_pattern_ops)',
+            'ANALYZE "{schema}".users',
+        ],
+    ),
+    Migration(
+        version=3,
+        description="Date-range index for the supporter booking queue",
+        statements=[
+            'CREATE INDEX IF NOT EXISTS "ix_schedules_startTime" '
+            'ON "{schema}".schedules ("startTime")',
+        ],
+    ),
+    Migration(
+        version=4,
+        description="NOTIFY booking changes on patient_schedule for the live supporter queue",
+        statements=[
+            # Kênh "patient_schedule_events" được lắng nghe bởi app/core/booking_events.py
+            """
+            CREATE OR REPLACE FUNCTION "{schema}".notify_patient_schedule() RETURNS trigger AS $$
+            DECLARE rec RECORD;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    rec := OLD;
+                ELSE
+                    IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+                        RETURN NULL;
+                    END IF;
+                    rec := NEW;
+                END IF;
+                PERFORM pg_notify('patient_schedule_events', json_build_object(
+                    'op', TG_OP,
+                    'scheduleId', rec."scheduleId",
+                    'patientId', rec."patientId",
+                    'status', rec.status
+                )::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            'DROP TRIGGER IF EXISTS patient_schedule_notify ON "{schema}".patient_schedule',
+            'CREATE TRIGGER patient_schedule_notify '
+            'AFTER INSERT OR UPDATE OF status OR DELETE ON "{schema}".patient_schedule '
+            'FOR EACH ROW EXECUTE FUNCTION "{schema}".notify_patient_schedule()',
+        ],
+    ),
+    Migration(
+        version=5,
+        description="Image variant columns for clinics, specializations and avatars",
+        statements=[
+            'ALTER TABLE "{schema}".clinics ADD COLUMN IF NOT EXISTS "imageVariants" JSONB',
+            'ALTER TABLE "{schema}".specializations ADD COLUMN IF NOT EXISTS "imageVariants" JSONB',
+            'ALTER TABLE "{schema}".users ADD COLUMN IF NOT EXISTS "avatarVariants" JSONB',
+        ],
+    ),
+    Migration(
+        version=6,
+        description="Reference counting of content-addressed images",
+        statements=[
+            # TG_ARGV: (cột chứa tên file, thư mục ảnh)
+            """
+            CREATE OR REPLACE FUNCTION "{schema}".image_blob_refs() RETURNS trigger AS $$
+            DECLARE
+                old_name TEXT;
+                new_name TEXT;
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    old_name := to_jsonb(OLD) ->> TG_ARGV[0];
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    new_name := to_jsonb(NEW) ->> TG_ARGV[0];
+                END IF;
+                IF old_name IS NOT DISTINCT FROM new_name THEN
+                    RETURN NULL;
+                END IF;
+                IF old_name IS NOT NULL THEN
+                    UPDATE "{schema}".image_blobs
+                    SET "refCount" = "refCount" - 1, "updatedAt" = now() at time zone 'utc'
+                    WHERE directory = TG_ARGV[1] AND name = old_name;
+                END IF;
+                IF new_name IS NOT NULL THEN
+                    UPDATE "{schema}".image_blobs
+                    SET "refCount" = "refCount" + 1, "updatedAt" = now() at time zone 'utc'
+                    WHERE directory = TG_ARGV[1] AND name = new_name;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            'DROP TRIGGER IF EXISTS clinics_image_refs ON "{schema}".clinics',
+            'CREATE TRIGGER clinics_image_refs '
+            'AFTER INSERT OR UPDATE OF image OR DELETE ON "{schema}".clinics '
+            'FOR EACH ROW EXECUTE FUNCTION "{schema}".image_blob_refs(\'image\', \'clinics\')',
+            'DROP TRIGGER IF EXISTS specializations_image_refs ON "{schema}".specializations',
+            'CREATE TRIGGER specializations_image_refs '
+            'AFTER INSERT OR UPDATE OF image OR DELETE ON "{schema}".specializations '
+            'FOR EACH ROW EXECUTE FUNCTION "{schema}".image_blob_refs(\'image\', \'specializations\')',
+            'DROP TRIGGER IF EXISTS users_avatar_refs ON "{schema}".users',
+            'CREATE TRIGGER users_avatar_refs '
+            'AFTER INSERT OR UPDATE OF avatar OR DELETE ON "{schema}".users '
+            'FOR EACH ROW EXECUTE FUNCTION "{schema}".image_blob_refs(\'avatar\', \'users\')',
+        ],
+    ),
+    Migration(
+        version=7,
+        description="NOTIFY schedule changes for the in-memory availability index",
+        statements=[
+            # Kênh "schedule_events" được lắng nghe bởi app/core/availability.py
+            """
+            CREATE OR REPLACE FUNCTION "{schema}".notify_schedule() RETURNS trigger AS $$
+            DECLARE rec RECORD;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    rec := OLD;
+                ELSE
+                    rec := NEW;
+                END IF;
+                PERFORM pg_notify('schedule_events', json_build_object(
+                    'op', TG_OP,
+                    'id', rec.id,
+                    'doctorId', rec."doctorId",
+                    'startTime', rec."startTime",
+                    'endTime', rec."endTime",
+                    'price', rec.price,
+                    'maxBooking', rec."maxBooking",
+                    'sumBooking', rec."sumBooking"
+                )::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            'DROP TRIGGER IF EXISTS schedules_notify ON "{schema}".schedules',
+            'CREATE TRIGGER schedules_notify '
+            'AFTER INSERT OR UPDATE OR DELETE ON "{schema}".schedules '
+            'FOR EACH ROW EXECUTE FUNCTION "{schema}".notify_schedule()',
+        ],
+    ),
+    Migration(
+        version=8,
+        description="Exclusion constraint against overlapping schedules of a doctor",
+        statements=[
+            # btree_gist: cho phép "doctorId" WITH = trong index GiST
+            'CREATE EXTENSION IF NOT EXISTS btree_gist',
+            'ALTER TABLE "{schema}".schedules ADD COLUMN IF NOT EXISTS "timeRange" tsrange '
+            'GENERATED ALWAYS AS (tsrange("startTime", "endTime", \'[)\')) STORED',
+            'ALTER TABLE "{schema}".schedules DROP CONSTRAINT IF EXISTS "ex_schedules_doctorId_timeRange"',
+            # Dữ liệu cũ có thể đã có lịch trùng giờ: dừng migration và liệt kê các cặp bị trùng
+            # thay vì lỗi chung chung của ADD CONSTRAINT. Không tự xóa vì lịch có thể đã có người đặt.
+            """
+            DO $$
+            DECLARE
+                total BIGINT;
+                listed TEXT;
+            BEGIN
+                SELECT count(*), array_to_string((array_agg(line ORDER BY "doctorId", "startTime"))[1:20], chr(10))
+                INTO total, listed
+                FROM (
+                    SELECT a."doctorId", a."startTime",
+                           format('doctor %s - schedule %s %s overlaps schedule %s %s',
+                                  a."doctorId", a.id, a."timeRange", b.id, b."timeRange") AS line
+                    FROM "{schema}".schedules a
+                    JOIN "{schema}".schedules b
+                      ON b."doctorId" = a."doctorId" AND b.id > a.id AND b."timeRange" && a."timeRange"
+                    WHERE NOT a."isDeleted" AND NOT b."isDeleted"
+                ) pairs;
+
+                IF total > 0 THEN
+                    RAISE EXCEPTION 'Cannot add "ex_schedules_doctorId_timeRange" - % pair(s) of active schedules overlap%',
+                        total, chr(10) || listed
+                        USING HINT = 'Soft-delete ("isDeleted" = true) or move one schedule of each pair, then restart the app.';
+                END IF;
+            END
+            $$
+            """,
+            'ALTER TABLE "{schema}".schedules ADD CONSTRAINT "ex_schedules_doctorId_timeRange" '
+            'EXCLUDE USING gist ("doctorId" WITH =, "timeRange" WITH &&) WHERE (NOT "isDeleted")',
+            # Thay thế bởi index GiST của constraint
+            'DROP INDEX IF EXISTS "{schema}"."ix_schedules_active_doctorId_startTime_endTime"',
+        ],
+    ),
+    Migration(
+        version=9,
+        description="NOTIFY catalog changes so every worker invalidates its catalog cache",
+        statements=[
+            # Kênh "catalog_events" được lắng nghe bởi app/core/cache.py, TG_ARGV: các namespace bị ảnh hưởng.
+            # Trigger theo statement và NOTIFY trùng payload trong một transaction chỉ gửi một lần.
+            """
+            CREATE OR REPLACE FUNCTION "{schema}".notify_catalog() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('catalog_events', json_build_object('namespaces', to_json(TG_ARGV))::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            'DROP TRIGGER IF EXISTS clinics_catalog_notify ON "{schema}".clinics',
+            'CREATE TRIGGER clinics_catalog_notify '
+            'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "{schema}".clinics '
+            'FOR EACH STATEMENT EXECUTE FUNCTION "{schema}".notify_catalog(\'clinic\', \'doctor\')',
+            'DROP TRIGGER IF EXISTS specializations_catalog_notify ON "{schema}".specializations',
+            'CREATE TRIGGER specializations_catalog_notify '
+            'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "{schema}".specializations '
+            'FOR EACH STATEMENT EXECUTE FUNCTION "{schema}".notify_catalog(\'specialty\', \'doctor\')',
+            'DROP TRIGGER IF EXISTS doctor_user_catalog_notify ON "{schema}".doctor_user',
+            'CREATE TRIGGER doctor_user_catalog_notify '
+            'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "{schema}".doctor_user '
+            'FOR EACH STATEMENT EXECUTE FUNCTION "{schema}".notify_catalog(\'doctor\')',
+            # Chỉ các cột hiển thị trong catalog: đổi mật khẩu / refresh token không làm mất cache
+            'DROP TRIGGER IF EXISTS users_catalog_notify ON "{schema}".users',
+            'CREATE TRIGGER users_catalog_notify '
+            'AFTER INSERT OR DELETE OR TRUNCATE OR UPDATE OF name, email, phone, gender, "roleId", '
+            'description, address, avatar, "avatarVariants", "isDeleted" ON "{schema}".users '
+            'FOR EACH STATEMENT EXECUTE FUNCTION "{schema}".notify_catalog(\'doctor\')',
+        ],
+    ),
+    Migration(
+        version=10,
+        description="Lease columns for the email outbox worker",
+        statements=[
+            'ALTER TYPE "{schema}".outboxstatus ADD VALUE IF NOT EXISTS \'Sending\' AFTER \'Pending\'',
+            'ALTER TABLE "{schema}".email_outbox ADD COLUMN IF NOT EXISTS "lockedUntil" TIMESTAMP',
+        ],
+    ),
+    Migration(
+        version=11,
+        description="Upsert image blob references so a reference racing the GC is not lost",
+        statements=[
+            # Nếu GC đang giữ lock và xóa row, UPDATE của tham chiếu mới không còn row nào để tăng:
+            # INSERT ... ON CONFLICT tạo lại row với refCount = 1 để GC không xóa ảnh đang được dùng.
+            # Chỉ áp dụng cho tên theo SHA-256; ảnh cũ (uuid, ảnh seed) không do GC quản lý.
+            """
+            CREATE OR REPLACE FUNCTION "{schema}".image_blob_refs() RETURNS trigger AS $$
+            DECLARE
+                old_name TEXT;
+                new_name TEXT;
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    old_name := to_jsonb(OLD) ->> TG_ARGV[0];
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    new_name := to_jsonb(NEW) ->> TG_ARGV[0];
+                END IF;
+                IF old_name IS NOT DISTINCT FROM new_name THEN
+                    RETURN NULL;
+                END IF;
+                IF old_name IS NOT NULL THEN
+                    UPDATE "{schema}".image_blobs
+                    SET "refCount" = "refCount" - 1, "updatedAt" = now() at time zone 'utc'
+                    WHERE directory = TG_ARGV[1] AND name = old_name;
+                END IF;
+                IF new_name ~ '^[0-9a-f]{{64}}[.][a-z]+$' THEN
+                    INSERT INTO "{schema}".image_blobs
+                        (directory, name, size, "refCount", "createdAt", "updatedAt", "isDeleted")
+                    VALUES (TG_ARGV[1], new_name, 0, 1, now() at time zone 'utc', now() at time zone 'utc', false)
+                    ON CONFLICT (directory, name) DO UPDATE
+                    SET "refCount" = image_blobs."refCount" + 1, "updatedAt" = EXCLUDED."updatedAt";
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+        ],
+    ),
+    Migration(
+        version=12,
+        description="NOTIFY user changes so every worker drops its cached principal",
+        statements=[
+            # Kênh "principal_events" được lắng nghe bởi app/core/principal.py, payload: {"id": user id}.
+            # TRUNCATE không có row: payload rỗng nghĩa là xóa toàn bộ cache.
+            """
+            CREATE OR REPLACE FUNCTION "{schema}".notify_principal() RETURNS trigger AS $$
+            BEGIN
+                IF TG_LEVEL = 'STATEMENT' THEN
+                    PERFORM pg_notify('principal_events', '{{}}');
+                ELSE
+                    PERFORM pg_notify('principal_events', json_build_object('id', OLD.id)::text);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            # Chỉ các cột của Principal: đổi mật khẩu / refresh token không làm mất cache
+            'DROP TRIGGER IF EXISTS users_principal_notify ON "{schema}".users',
+            'CREATE TRIGGER users_principal_notify '
+            'AFTER DELETE OR UPDATE OF email, name, "roleId", phone, address, gender, avatar, description '
+            'ON "{schema}".users '
+            'FOR EACH ROW EXECUTE FUNCTION "{schema}".notify_principal()',
+            'DROP TRIGGER IF EXISTS users_principal_truncate_notify ON "{schema}".users',
+            'CREATE TRIGGER users_principal_truncate_notify '
+            'AFTER TRUNCATE ON "{schema}".users '
+            'FOR EACH STATEMENT EXECUTE FUNCTION "{schema}".notify_principal()',
+        ],
+    ),
+]
+
+async def run_migrations(conn: AsyncConnection, schema: str) -> None:
+    """Apply pending migrations inside the caller's transaction"""
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+    await conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{schema}".schema_migrations ('
+        'version INTEGER PRIMARY KEY, '
+        'description VARCHAR NOT NULL, '
+        '"appliedAt" TIMESTAMP NOT NULL DEFAULT (now() at time zone \'utc\'))'
+    ))
+
+    result = await conn.execute(text(f'SELECT version FROM "{schema}".schema_migrations'))
+    applied = {row[0] for row in result}
+
+    for migration in MIGRATIONS:
+        if migration.version in applied:
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        for statement in migration.statements:
+            await conn.execute(text(statement.format(schema=schema)))
+        await conn.execute(
+            text(f'INSERT INTO "{schema}".schema_migrations (version, description) VALUES (:version, :description)'),
+            {"version": migration.version, "description": migration.description}
+        )
@@ -0,0 +1,83 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are ordered by a unique key (e.g. ("createdAt", id)) and the cursor
+is the key of the last row of the previous page, so fetching page N costs
+the same as page 1 (no OFFSET scan). Totals come from the planner estimate
+and only fall back to an exact COUNT when the estimate is small.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple, Type
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app.core.config import settings
+
+def encode_cursor(*key: Any) -> str:
+    """Encode the sort key of the last row (datetime / UUID / str / int values)"""
+    values = [value.isoformat() if isinstance(value, datetime) else str(value) for value in key]
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types: Type) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by encode_cursor, e.g.
+    decode_cursor(cursor, datetime, UUID). Raises ValueError if malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if len(values) != len(types):
+            raise ValueError("cursor length mismatch")
+        return tuple(
+            kind.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(types, values)
+        )
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally (ESCAPE '\\')"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def select_count(stmt: Select) -> Select:
+    return stmt.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, compiled with its bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    # Tham số vẫn được bind như câu query gốc: không inline giá trị của người dùng
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> Tuple[int, bool]:
+    """
+    Row count of `stmt` as (count, is_estimate).
+
+    Uses the planner's row estimate from EXPLAIN; when it is below
+    PAGINATION_EXACT_COUNT_THRESHOLD an exact COUNT is cheap enough to run.
+    """
+    plan = (await db.execute(_Explain(stmt))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+
+    if estimate > settings.PAGINATION_EXACT_COUNT_THRESHOLD:
+        return estimate, True
+
+    exact = await db.scalar(select_count(stmt))
+    return exact or 0, False
+
+def page_size(limit: Optional[int]) -> int:
+    if not limit:
+        return settings.PAGINATION_DEFAULT_LIMIT
+    return max(1, min(limit, settings.PAGINATION_MAX_LIMIT))
@@ -2,6 +2,7 @@ from uuid import UUID
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from app.models.base_model import BaseModel
 from typing import List
 from uuid import uuid4
@@ -15,5 +16,7 @@ class Clinic(BaseModel):
     phone: Mapped[str] = mapped_column(nullable=False)
     description: Mapped[str] = mapped_column(nullable=True)
     image: Mapped[str] = mapped_column(nullable=True)
+    # {size: {format: file}} do app/core/images.py sinh ra
+    imageVariants: Mapped[dict] = mapped_column(JSONB, nullable=True)
     
     doctor_users: Mapped[List["DoctorUser"]] = relationship("DoctorUser", back_populates="clinic") # type: ignore
\ No newline at end of file
@@ -1,7 +1,7 @@
 from uuid import UUID
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.base_model import BaseModel
 
@@ -11,6 +11,10 @@ from app.models.specialization import Specialization
 
 class DoctorUser(BaseModel):
     __tablename__ = "doctor_user"
+    __table_args__ = (
+        Index("ix_doctor_user_clinicId", "clinicId"),
+        Index("ix_doctor_user_specializationId", "specializationId"),
+    )
     
     doctorId: Mapped[UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
     clinicId: Mapped[UUID] = mapped_column(ForeignKey("clinics.id"), primary_key=True)
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base_model import BaseModel
+import enum
+
+class OutboxStatus(str, enum.Enum):
+    Pending = "Pending"
+    Sending = "Sending"
+    Sent = "Sent"
+    Failed = "Failed"
+
+class EmailOutbox(BaseModel):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_nextAttemptAt", "status", "nextAttemptAt"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    recipient: Mapped[str] = mapped_column(nullable=False)
+    subject: Mapped[str] = mapped_column(nullable=False)
+    body: Mapped[str] = mapped_column(nullable=False)
+    status: Mapped[OutboxStatus] = mapped_column(nullable=False, default=OutboxStatus.Pending)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    nextAttemptAt: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
+    # Hạn lease của worker đang gửi (status = Sending), hết hạn thì worker khác được nhận lại
+    lockedUntil: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    sentAt: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    lastError: Mapped[Optional[str]] = mapped_column(nullable=True)
@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base_model import BaseModel
+
+class ImageBlob(BaseModel):
+    """
+    An uploaded original stored under its SHA-256 name.
+
+    refCount is maintained by triggers on clinics.image, specializations.image
+    and users.avatar (migrations 6 and 11); blobs left at 0 are removed by the
+    GC job. A reference made while the GC deletes the blob re-creates the row.
+    """
+    __tablename__ = "image_blobs"
+    __table_args__ = (
+        Index("ix_image_blobs_refCount_updatedAt", "refCount", "updatedAt"),
+    )
+
+    directory: Mapped[str] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    refCount: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
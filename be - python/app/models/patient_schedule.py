@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.models.base_model import BaseModel
 import enum
@@ -13,6 +13,10 @@ class Status(str, enum.Enum):
 
 class PatientSchedule(BaseModel):
     __tablename__ = "patient_schedule"
+    __table_args__ = (
+        Index("ix_patient_schedule_scheduleId", "scheduleId"),
+        Index("ix_patient_schedule_status", "status"),
+    )
 
     patientId: Mapped[UUID] = mapped_column(ForeignKey("patients.id"), primary_key=True)
     scheduleId: Mapped[UUID] = mapped_column(ForeignKey("schedules.id"), primary_key=True)
@@ -1,6 +1,7 @@
 from datetime import datetime
 from uuid import UUID, uuid4
-from sqlalchemy import ForeignKey
+from sqlalchemy import Computed, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import Range, TSRANGE
 from sqlalchemy.orm import relationship
 from app.models.base_model import BaseModel
 from sqlalchemy.orm import Mapped, mapped_column
@@ -8,8 +9,24 @@ from typing import List
 from app.models.user import User
 from app.models.patient_schedule import PatientSchedule
 
+SCHEDULE_OVERLAP_CONSTRAINT = "ex_schedules_doctorId_timeRange"
+
 class Schedule(BaseModel):
     __tablename__ = "schedules"
+    __table_args__ = (
+        # Lịch của bác sĩ theo thời gian (trang bác sĩ, lịch đã nhận)
+        Index("ix_schedules_doctorId_startTime", "doctorId", "startTime"),
+        # Hàng đợi của hỗ trợ viên theo khoảng ngày, không lọc theo bác sĩ
+        Index("ix_schedules_startTime", "startTime"),
+        # Chống trùng lịch: exclusion constraint SCHEDULE_OVERLAP_CONSTRAINT trên
+        # ("doctorId", "timeRange") do migration 8 tạo (cần extension btree_gist)
+        # Lịch còn chỗ trống cho bệnh nhân
+        Index(
+            "ix_schedules_available_doctorId_startTime",
+            "doctorId", "startTime",
+            postgresql_where=text('"sumBooking" < "maxBooking"')
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, default=uuid4)
     doctorId: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -18,6 +35,12 @@ class Schedule(BaseModel):
     price: Mapped[int] = mapped_column(nullable=False)
     maxBooking: Mapped[int] = mapped_column(nullable=False)
     sumBooking: Mapped[int] = mapped_column(default=0)
+    # Khoảng [startTime, endTime) do PostgreSQL tính, lịch liền kề không bị coi là trùng
+    timeRange: Mapped[Range[datetime]] = mapped_column(
+        TSRANGE,
+        Computed('tsrange("startTime", "endTime", \'[)\')', persisted=True),
+        deferred=True
+    )
     
     doctor: Mapped[User] = relationship("User", back_populates="schedule")
     patient_schedules: Mapped[List[PatientSchedule]] = relationship("PatientSchedule", back_populates="schedule")
\ No newline at end of file
@@ -1,5 +1,6 @@
 from uuid import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
 from app.models.base_model import BaseModel
 from typing import List
 from uuid import uuid4
@@ -9,6 +10,8 @@ class Specialization(BaseModel):
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True,default=uuid4)
     description: Mapped[str] = mapped_column(nullable=True)
     image: Mapped[str] = mapped_column(nullable=True)
+    # {size: {format: file}} do app/core/images.py sinh ra
+    imageVariants: Mapped[dict] = mapped_column(JSONB, nullable=True)
     name: Mapped[str] = mapped_column(nullable=False)
     
     doctor_users: Mapped[List["DoctorUser"]] = relationship("DoctorUser", back_populates="specialization") # type: ignore
\ No newline at end of file
@@ -0,0 +1,17 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base_model import BaseModel
+
+class TokenRevocation(BaseModel):
+    """Tokens of `userId` issued before `notBefore` are no longer accepted"""
+    __tablename__ = "token_revocations"
+    __table_args__ = (
+        Index("ix_token_revocations_createdAt", "createdAt"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    # Không dùng FK: user có thể đã bị xóa
+    userId: Mapped[UUID] = mapped_column(nullable=False)
+    notBefore: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
@@ -1,7 +1,8 @@
 from typing import List, TYPE_CHECKING
 from uuid import UUID, uuid4
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
 from app.models.base_model import BaseModel
 import enum
 
@@ -16,6 +17,11 @@ class Gender(str, enum.Enum):
 
 class User(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_roleId", "roleId"),
+        # Keyset pagination cho danh sách user (app/db/pagination.py)
+        Index("ix_users_createdAt_id", "createdAt", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, default=uuid4)
     name: Mapped[str] = mapped_column(nullable=False)
@@ -27,25 +33,26 @@ class User(BaseModel):
     description: Mapped[str] = mapped_column(nullable=True)
     address: Mapped[str] = mapped_column(nullable=False)
     avatar: Mapped[str] = mapped_column(nullable=True)
+    avatarVariants: Mapped[dict] = mapped_column(JSONB, nullable=True)
     refresh_token: Mapped[str] = mapped_column(nullable=True)
     
-    # Configure relationships with eager loading
+    # Relationships không tự load: mỗi query chọn loader profile trong app/db/loaders.py
     role: Mapped["Role"] = relationship(
         "Role", 
         back_populates="users",
-        lazy="selectin"
+        lazy="raise"
     )
     
     doctor_user: Mapped["DoctorUser"] = relationship(
         "DoctorUser", 
         back_populates="doctor",
-        lazy="selectin"
+        lazy="raise"
     )
     
     schedule: Mapped[List["Schedule"]] = relationship(
         "Schedule", 
         back_populates="doctor",
-        lazy="selectin"
+        lazy="raise"
     )
 
 
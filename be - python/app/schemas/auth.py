@@ -28,6 +28,7 @@ class CustomResponse(BaseModel):
 class TokenPayload(BaseModel):
     sub: str  # user id
     exp: int  # expiration time
+    iat: int | None = None  # issued at
 
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,376 @@
+"""
+Typed row -> dict projections for response payloads.
+
+Values are left as UUID / datetime / Enum: FastJSONResponse (orjson)
+serializes them natively, so handlers don't need str(), .isoformat()
+or jsonable_encoder.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, TypedDict, Union
+from uuid import UUID
+from app.core.availability import Slot
+from app.models.clinic import Clinic
+from app.models.patient import Patient
+from app.models.patient_schedule import PatientSchedule, Status
+from app.models.schedule import Schedule
+from app.models.specialization import Specialization
+from app.models.user import Gender, User
+
+class ClinicRow(TypedDict):
+    id: UUID
+    name: str
+    address: str
+    phone: str
+    description: Optional[str]
+    image: Optional[str]
+    imageVariants: Optional[Dict[str, Dict[str, str]]]
+
+class SpecialtyRow(TypedDict):
+    id: UUID
+    name: str
+    description: Optional[str]
+    image: Optional[str]
+    imageVariants: Optional[Dict[str, Dict[str, str]]]
+
+class ClinicAdminRow(ClinicRow):
+    createdAt: datetime
+    updatedAt: datetime
+    isDeleted: bool
+
+class SpecialtyAdminRow(SpecialtyRow):
+    createdAt: datetime
+    updatedAt: datetime
+    isDeleted: bool
+
+class DoctorUserAdminRow(TypedDict):
+    doctorId: UUID
+    clinicId: UUID
+    specializationId: UUID
+    clinic: ClinicAdminRow
+    specialization: SpecialtyAdminRow
+
+class AdminUserRow(TypedDict):
+    id: UUID
+    name: str
+    email: str
+    phone: str
+    gender: Gender
+    description: Optional[str]
+    address: str
+    avatar: Optional[str]
+    roleId: int
+    createdAt: datetime
+    updatedAt: datetime
+    isDeleted: bool
+    doctor_user: Optional[DoctorUserAdminRow]
+
+class PatientRow(TypedDict):
+    id: UUID
+    name: str
+    phone: str
+    email: str
+    gender: Gender
+    address: str
+    description: Optional[str]
+
+class DoctorContactRow(TypedDict):
+    name: str
+    phone: str
+
+class SupporterQueueItem(TypedDict):
+    patient: PatientRow
+    scheduleId: UUID
+    startTime: datetime
+    endTime: datetime
+    price: int
+    maxBooking: int
+    doctor: DoctorContactRow
+
+class SupporterQueueRow(SupporterQueueItem):
+    status: Status
+
+class AvailableSlotRow(TypedDict):
+    id: UUID
+    startTime: datetime
+    endTime: datetime
+    price: int
+    maxBooking: int
+    sumBooking: int
+
+class PatientScheduleRow(TypedDict):
+    status: Status
+    patient: PatientRow
+
+class ScheduleRow(TypedDict):
+    id: UUID
+    startTime: datetime
+    endTime: datetime
+    price: int
+    maxBooking: int
+
+class DoctorScheduleRow(ScheduleRow):
+    Patient_Schedule: List[PatientScheduleRow]
+
+class DoctorSlotRow(AvailableSlotRow):
+    doctorId: UUID
+
+class NameRow(TypedDict):
+    name: str
+
+class DoctorCardUserRow(TypedDict):
+    specialization: NameRow
+    clinic: NameRow
+
+class DoctorCardRow(TypedDict):
+    id: UUID
+    name: str
+    avatar: Optional[str]
+    doctor_user: DoctorCardUserRow
+
+class DoctorProfileRow(TypedDict):
+    id: UUID
+    name: str
+    email: str
+    address: str
+    phone: str
+    avatar: Optional[str]
+    gender: Gender
+    description: Optional[str]
+
+class DoctorBySpecializationRow(TypedDict):
+    doctor: DoctorProfileRow
+    specialization: NameRow
+    clinic: NameRow
+
+class DoctorSummaryRow(TypedDict):
+    id: UUID
+    name: str
+    avatar: Optional[str]
+
+class ClinicSummaryRow(TypedDict):
+    name: str
+    address: str
+    image: Optional[str]
+    description: Optional[str]
+
+class DoctorByClinicRow(TypedDict):
+    doctor: DoctorSummaryRow
+    clinic: ClinicSummaryRow
+    specialization: NameRow
+
+class SpecialtyDetailRow(TypedDict):
+    name: str
+    description: Optional[str]
+
+class ClinicDetailRow(TypedDict):
+    name: str
+    address: str
+    description: Optional[str]
+
+class DoctorDetailUserRow(TypedDict):
+    specialization: SpecialtyDetailRow
+    clinic: ClinicDetailRow
+
+class DoctorDetailRow(TypedDict):
+    id: UUID
+    name: str
+    avatar: Optional[str]
+    address: str
+    phone: str
+    gender: Gender
+    description: Optional[str]
+    doctor_user: DoctorDetailUserRow
+
+def clinic_row(clinic: Clinic) -> ClinicRow:
+    return {
+        "id": clinic.id,
+        "name": clinic.name,
+        "address": clinic.address,
+        "phone": clinic.phone,
+        "description": clinic.description,
+        "image": clinic.image,
+        "imageVariants": clinic.imageVariants,
+    }
+
+def specialty_row(specialty: Specialization) -> SpecialtyRow:
+    return {
+        "id": specialty.id,
+        "name": specialty.name,
+        "description": specialty.description,
+        "image": specialty.image,
+        "imageVariants": specialty.imageVariants,
+    }
+
+def admin_user_row(user: User) -> AdminUserRow:
+    """Needs the "admin_row" loader profile"""
+    doctor_user = user.doctor_user if user.roleId == 2 else None
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "phone": user.phone,
+        "gender": user.gender,
+        "description": user.description,
+        "address": user.address,
+        "avatar": user.avatar,
+        "roleId": user.roleId,
+        "createdAt": user.createdAt,
+        "updatedAt": user.updatedAt,
+        "isDeleted": user.isDeleted,
+        "doctor_user": {
+            "doctorId": doctor_user.doctorId,
+            "clinicId": doctor_user.clinicId,
+            "specializationId": doctor_user.specializationId,
+            "clinic": {
+                **clinic_row(doctor_user.clinic),
+                "createdAt": doctor_user.clinic.createdAt,
+                "updatedAt": doctor_user.clinic.updatedAt,
+                "isDeleted": doctor_user.clinic.isDeleted,
+            },
+            "specialization": {
+                **specialty_row(doctor_user.specialization),
+                "createdAt": doctor_user.specialization.createdAt,
+                "updatedAt": doctor_user.specialization.updatedAt,
+                "isDeleted": doctor_user.specialization.isDeleted,
+            },
+        } if doctor_user else None,
+    }
+
+def patient_row(patient: Patient) -> PatientRow:
+    return {
+        "id": patient.id,
+        "name": patient.name,
+        "phone": patient.phone,
+        "email": patient.email,
+        "gender": patient.gender,
+        "address": patient.address,
+        "description": patient.description,
+    }
+
+def supporter_queue_item(schedule: Schedule, patient_schedule: PatientSchedule) -> SupporterQueueItem:
+    return {
+        "patient": patient_row(patient_schedule.patient),
+        "scheduleId": schedule.id,
+        "startTime": schedule.startTime,
+        "endTime": schedule.endTime,
+        "price": schedule.price,
+        "maxBooking": schedule.maxBooking,
+        "doctor": {
+            "name": schedule.doctor.name,
+            "phone": schedule.doctor.phone,
+        },
+    }
+
+def supporter_queue_row(patient_schedule: PatientSchedule) -> SupporterQueueRow:
+    """Needs schedule -> doctor and patient loaded on the PatientSchedule"""
+    return {
+        **supporter_queue_item(patient_schedule.schedule, patient_schedule),
+        "status": patient_schedule.status,
+    }
+
+def patient_schedule_row(patient_schedule: PatientSchedule) -> PatientScheduleRow:
+    return {
+        "status": patient_schedule.status,
+        "patient": patient_row(patient_schedule.patient),
+    }
+
+def available_slot_row(slot: Union[Schedule, Slot]) -> AvailableSlotRow:
+    return {
+        "id": slot.id,
+        "startTime": slot.startTime,
+        "endTime": slot.endTime,
+        "price": slot.price,
+        "maxBooking": slot.maxBooking,
+        "sumBooking": slot.sumBooking,
+    }
+
+def doctor_slot_row(slot: Union[Schedule, Slot]) -> DoctorSlotRow:
+    return {**available_slot_row(slot), "doctorId": slot.doctorId}
+
+def schedule_row(schedule: Schedule) -> ScheduleRow:
+    return {
+        "id": schedule.id,
+        "startTime": schedule.startTime,
+        "endTime": schedule.endTime,
+        "price": schedule.price,
+        "maxBooking": schedule.maxBooking,
+    }
+
+def doctor_schedule_row(schedule: Schedule, statuses: Iterable[Status]) -> DoctorScheduleRow:
+    """Needs patient_schedules -> patient loaded; keeps the bookings in `statuses`"""
+    return {
+        **schedule_row(schedule),
+        "Patient_Schedule": [patient_schedule_row(ps) for ps in schedule.patient_schedules if ps.status in statuses],
+    }
+
+def doctor_card_row(doctor: User) -> DoctorCardRow:
+    """Needs the "doctor_card" loader profile"""
+    return {
+        "id": doctor.id,
+        "name": doctor.name,
+        "avatar": doctor.avatar,
+        "doctor_user": {
+            "specialization": {"name": doctor.doctor_user.specialization.name},
+            "clinic": {"name": doctor.doctor_user.clinic.name},
+        },
+    }
+
+def doctor_by_specialization_row(doctor: User) -> DoctorBySpecializationRow:
+    """Needs the "doctor_card" loader profile"""
+    return {
+        "doctor": {
+            "id": doctor.id,
+            "name": doctor.name,
+            "email": doctor.email,
+            "address": doctor.address,
+            "phone": doctor.phone,
+            "avatar": doctor.avatar,
+            "gender": doctor.gender,
+            "description": doctor.description,
+        },
+        "specialization": {"name": doctor.doctor_user.specialization.name},
+        "clinic": {"name": doctor.doctor_user.clinic.name},
+    }
+
+def doctor_by_clinic_row(doctor: User) -> DoctorByClinicRow:
+    """Needs the "doctor_card" loader profile"""
+    clinic = doctor.doctor_user.clinic
+    return {
+        "doctor": {
+            "id": doctor.id,
+            "name": doctor.name,
+            "avatar": doctor.avatar,
+        },
+        "clinic": {
+            "name": clinic.name,
+            "address": clinic.address,
+            "image": clinic.image,
+            "description": clinic.description,
+        },
+        "specialization": {"name": doctor.doctor_user.specialization.name},
+    }
+
+def doctor_detail_row(doctor: User) -> DoctorDetailRow:
+    """Needs the "doctor_detail" loader profile"""
+    specialization = doctor.doctor_user.specialization
+    clinic = doctor.doctor_user.clinic
+    return {
+        "id": doctor.id,
+        "name": doctor.name,
+        "avatar": doctor.avatar,
+        "address": doctor.address,
+        "phone": doctor.phone,
+        "gender": doctor.gender,
+        "description": doctor.description,
+        "doctor_user": {
+            "specialization": {
+                "name": specialization.name,
+                "description": specialization.description,
+            },
+            "clinic": {
+                "name": clinic.name,
+                "address": clinic.address,
+                "description": clinic.description,
+            },
+        },
+    }
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime, time
 from enum import Enum
 
 class Status(str, Enum):
@@ -25,4 +25,14 @@ class UpdateScheduleDto(BaseModel):
     startTime: datetime = Field(..., description="Thời gian bắt đầu")
     endTime: datetime = Field(..., description="Thời gian kết thúc")
     price: float = Field(..., description="Giá khám")
-    maxBooking: int = Field(..., description="Số lượng bệnh nhân tối đa") 
\ No newline at end of file
+    maxBooking: int = Field(..., description="Số lượng bệnh nhân tối đa") 
+class CreateScheduleTemplateDto(BaseModel):
+    dateFrom: date = Field(..., description="Ngày đầu tiên áp dụng")
+    dateTo: date = Field(..., description="Ngày cuối cùng áp dụng (tính cả ngày này)")
+    weekdays: List[int] = Field(..., description="Các ngày trong tuần: 1 = Thứ hai ... 7 = Chủ nhật")
+    startTime: time = Field(..., description="Giờ bắt đầu mỗi ngày (giờ Việt Nam)")
+    endTime: time = Field(..., description="Giờ kết thúc mỗi ngày (giờ Việt Nam)")
+    slotMinutes: int = Field(..., description="Độ dài mỗi lịch khám (phút)")
+    price: int = Field(..., description="Giá khám")
+    maxBooking: int = Field(..., description="Số lượng bệnh nhân tối đa mỗi lịch")
+    skipConflicts: bool = Field(False, description="Bỏ qua lịch bị trùng thay vì không tạo lịch nào")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from .role import RoleResponse
 from .clinic import ClinicResponse
 from .specialty import SpecialtyResponse
@@ -41,4 +41,11 @@ class UserResponse(UserBase):
     isDeleted: Optional[bool] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class UserPageResponse(BaseModel):
+    items: List[UserResponse]
+    # Cursor của trang tiếp theo, None nếu đã hết
+    nextCursor: Optional[str] = None
+    total: int
+    totalIsEstimate: bool
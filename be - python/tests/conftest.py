@@ -0,0 +1,52 @@
+"""
+Tests run against a real PostgreSQL server (settings from .env / environment).
+
+A dedicated database, TEST_POSTGRES_DB (default "doctorcare_test"), is
+created if needed and its schema rebuilt and seeded once per session.
+Tests using the `db` fixture are skipped when the server is unreachable.
+"""
+import os
+
+os.environ["POSTGRES_DB"] = os.environ.get("TEST_POSTGRES_DB", "doctorcare_test")
+
+import asyncpg
+import pytest
+from app.core.config import settings
+
+@pytest.fixture(scope="session")
+async def db():
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    admin_dsn = dsn.rsplit("/", 1)[0] + "/postgres"
+    try:
+        connection = await asyncpg.connect(admin_dsn, timeout=5)
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"PostgreSQL not available: {e}")
+    try:
+        exists = await connection.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", settings.POSTGRES_DB)
+        if not exists:
+            await connection.execute(f'CREATE DATABASE "{settings.POSTGRES_DB}"')
+    finally:
+        await connection.close()
+
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(f'DROP SCHEMA IF EXISTS "{settings.POSTGRES_SCHEMA}" CASCADE')
+    finally:
+        await connection.close()
+
+    from app.db.database import engine, init_db
+    from app.db.seed import create_seed_data
+
+    await init_db()
+    await create_seed_data()
+    yield engine
+    await engine.dispose()
+
+@pytest.fixture(scope="session")
+async def client(db):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
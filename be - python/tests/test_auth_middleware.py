@@ -0,0 +1,47 @@
+from fastapi import FastAPI
+from app.api.middleware.auth_middleware import AuthMiddleware
+
+def build_middleware() -> AuthMiddleware:
+    app = FastAPI()
+
+    @app.get("/schedules/supporter")
+    async def supporter():
+        return {}
+
+    @app.get("/schedules/{id}")
+    async def by_id(id: str):
+        return {}
+
+    @app.delete("/schedules/{id}")
+    async def delete(id: str):
+        return {}
+
+    @app.get("/clinic")
+    async def clinic():
+        return {}
+
+    public = {f"{by_id.__module__}.{by_id.__name__}", f"{clinic.__module__}.{clinic.__name__}"}
+    return AuthMiddleware(app, app.routes, public)
+
+def test_earlier_protected_route_wins_over_parametrised_public_route():
+    middleware = build_middleware()
+    assert middleware.is_public("GET", "/schedules/supporter") is False
+    assert middleware.is_public("GET", "/schedules/42") is True
+
+def test_public_status_is_per_method():
+    middleware = build_middleware()
+    assert middleware.is_public("DELETE", "/schedules/42") is False
+    assert middleware.is_public("GET", "/clinic") is True
+    assert middleware.is_public("POST", "/clinic") is False
+
+def test_unknown_path_is_protected():
+    assert build_middleware().is_public("GET", "/nope") is False
+
+def test_app_schedule_routes():
+    from app.api.deps import public_endpoints
+    from app.main import app
+
+    middleware = AuthMiddleware(app, app.routes, public_endpoints)
+    assert middleware.is_public("GET", "/api/v1/schedules/supporter") is False
+    assert middleware.is_public("GET", "/api/v1/schedules/patient-accept") is False
+    assert middleware.is_public("GET", "/api/v1/schedules/availability") is True
@@ -0,0 +1,159 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from uuid import uuid4
+import asyncpg
+import pytest
+from sqlalchemy import select
+import app.core.availability as availability_module
+from app.core.availability import AvailabilityIndex, availability_index
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+from app.core.principal import principal_cache
+from app.db.database import AsyncSessionLocal
+from app.models.user import User
+
+DAY = date(2097, 2, 1)
+SCHEDULES = f'"{settings.POSTGRES_SCHEMA}".schedules'
+
+async def execute_elsewhere(sql: str, *args) -> None:
+    """Ghi từ một connection khác, như một worker khác"""
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(sql, *args)
+    finally:
+        await connection.close()
+
+async def eventually(check) -> None:
+    for _ in range(100):
+        if await check():
+            return
+        await asyncio.sleep(0.05)
+    assert await check()
+
+@pytest.fixture
+async def doctor_id(db):
+    async with AsyncSessionLocal() as session:
+        doctor_id = (await session.execute(
+            select(User.id).where(User.email == "doctor1@hospital.com")
+        )).scalar_one()
+    yield doctor_id
+    await execute_elsewhere(f'DELETE FROM {SCHEDULES} WHERE "doctorId" = $1 AND "startTime"::date = $2', doctor_id, DAY)
+
+async def insert_schedule(doctor_id, hour: int, max_booking: int = 3):
+    schedule_id = uuid4()
+    await execute_elsewhere(
+        f'INSERT INTO {SCHEDULES} (id, "doctorId", "startTime", "endTime", price, "maxBooking", "sumBooking", '
+        f'"createdAt", "updatedAt", "isDeleted") VALUES ($1, $2, $3, $4, 100000, $5, 0, now(), now(), false)',
+        schedule_id, doctor_id, datetime.combine(DAY, datetime.min.time()).replace(hour=hour),
+        datetime.combine(DAY, datetime.min.time()).replace(hour=hour + 1), max_booking,
+    )
+    return schedule_id
+
+@asynccontextmanager
+async def listening():
+    pg_listener.start()
+    availability_index.start()
+    try:
+        for _ in range(100):
+            if availability_index.ready:
+                break
+            await asyncio.sleep(0.05)
+        assert availability_index.ready
+        yield
+    finally:
+        await pg_listener.stop()
+        await availability_index.stop()
+        availability_index.on_disconnect()
+        catalog_cache.on_disconnect()
+        principal_cache.on_disconnect()
+
+async def available(client, doctor_id) -> list:
+    response = await client.get(
+        "/api/v1/schedules/availability",
+        params={"doctorIds": str(doctor_id), "from": DAY.isoformat(), "to": DAY.isoformat()},
+    )
+    assert response.status_code == 200
+    return response.json()["data"][str(doctor_id)]
+
+async def contains(client, doctor_id, schedule_id) -> bool:
+    return str(schedule_id) in {slot["id"] for slot in await available(client, doctor_id)}
+
+async def test_notify_keeps_the_index_current(client, doctor_id):
+    async with listening():
+        schedule_id = await insert_schedule(doctor_id, 8)
+
+        async def listed():
+            return [(slot["id"], slot["sumBooking"], slot["maxBooking"]) for slot in await available(client, doctor_id)]
+
+        async def becomes(expected):
+            return await listed() == expected
+
+        await eventually(lambda: becomes([(str(schedule_id), 0, 3)]))
+
+        await execute_elsewhere(f'UPDATE {SCHEDULES} SET "sumBooking" = 3 WHERE id = $1', schedule_id)
+        await eventually(lambda: becomes([]))
+
+        await execute_elsewhere(f'UPDATE {SCHEDULES} SET "maxBooking" = 5 WHERE id = $1', schedule_id)
+        await eventually(lambda: becomes([(str(schedule_id), 3, 5)]))
+
+        await execute_elsewhere(f'DELETE FROM {SCHEDULES} WHERE id = $1', schedule_id)
+        await eventually(lambda: becomes([]))
+        assert availability_index.ready
+
+async def test_events_during_reload_are_replayed(client, doctor_id, monkeypatch):
+    async with listening():
+        schedule_id = await insert_schedule(doctor_id, 9)
+        await eventually(lambda: contains(client, doctor_id, schedule_id))
+
+        real_session = availability_module.AsyncSessionLocal
+
+        @asynccontextmanager
+        async def racing_session():
+            async with real_session() as session:
+                execute = session.execute
+
+                async def racing_execute(*args, **kwargs):
+                    # Snapshot đã đọc lịch còn trống, rồi lịch bị đặt kín trước khi reload xong
+                    result = await execute(*args, **kwargs)
+                    await execute_elsewhere(f'UPDATE {SCHEDULES} SET "sumBooking" = 3 WHERE id = $1', schedule_id)
+                    for _ in range(100):
+                        if availability_index._pending:
+                            break
+                        await asyncio.sleep(0.05)
+                    assert availability_index._pending
+                    return result
+
+                session.execute = racing_execute
+                yield session
+
+        monkeypatch.setattr(availability_module, "AsyncSessionLocal", racing_session)
+        await availability_index.reload()
+
+        assert availability_index.ready
+        assert not await contains(client, doctor_id, schedule_id)
+
+async def test_periodic_reload_picks_up_missed_changes(doctor_id, monkeypatch):
+    monkeypatch.setattr(settings, "AVAILABILITY_RELOAD_SECONDS", 0.1)
+    # Index không nhận NOTIFY: chỉ lần reload định kỳ mới thấy lịch mới
+    index = AvailabilityIndex()
+    index.on_connect()
+    index.start()
+    try:
+        for _ in range(100):
+            if index.ready:
+                break
+            await asyncio.sleep(0.05)
+        assert index.ready
+
+        schedule_id = await insert_schedule(doctor_id, 10)
+        start = datetime.combine(DAY, datetime.min.time())
+
+        async def reloaded():
+            return schedule_id in {slot.id for slot in index.next_slots([doctor_id], start)[doctor_id]}
+
+        await eventually(reloaded)
+    finally:
+        await index.stop()
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import func, select
+from app.db.database import AsyncSessionLocal
+from app.models.patient_schedule import PatientSchedule
+from app.models.schedule import Schedule
+from app.models.user import User
+
+MAX_BOOKING = 25
+REQUESTS = 300
+
+async def create_schedule(max_booking: int) -> Schedule:
+    async with AsyncSessionLocal() as session:
+        doctor_id = (await session.execute(select(User.id).where(User.roleId == 2).limit(1))).scalar_one()
+        start = datetime(2100, 1, 1, 8) + timedelta(hours=(uuid4().int % 10000))
+        schedule = Schedule(
+            doctorId=doctor_id,
+            startTime=start,
+            endTime=start + timedelta(hours=1),
+            price=100000,
+            maxBooking=max_booking,
+            sumBooking=0,
+        )
+        session.add(schedule)
+        await session.commit()
+        return schedule
+
+def booking(schedule_id, i: int) -> dict:
+    return {
+        "name": f"Concurrent {i}",
+        "email": f"concurrent{i}@example.com",
+        "phone": "0123456789",
+        "address": "1 Test Street",
+        "description": "",
+        "scheduleId": str(schedule_id),
+        "gender": "Male",
+    }
+
+async def test_parallel_bookings_never_overbook(client):
+    schedule = await create_schedule(MAX_BOOKING)
+
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/patient", json=booking(schedule.id, i)) for i in range(REQUESTS)
+    ))
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(201) == MAX_BOOKING
+    assert statuses.count(400) == REQUESTS - MAX_BOOKING
+
+    async with AsyncSessionLocal() as session:
+        sum_booking = (await session.execute(
+            select(Schedule.sumBooking).where(Schedule.id == schedule.id)
+        )).scalar_one()
+        bookings = (await session.execute(
+            select(func.count()).select_from(PatientSchedule).where(PatientSchedule.scheduleId == schedule.id)
+        )).scalar_one()
+    assert sum_booking == MAX_BOOKING
+    assert bookings == MAX_BOOKING
+
+async def test_unknown_schedule_is_404(client):
+    response = await client.post("/api/v1/patient", json=booking(uuid4(), 0))
+    assert response.status_code == 404
@@ -0,0 +1,115 @@
+import asyncio
+from contextlib import asynccontextmanager
+import asyncpg
+from app.core.cache import CLINIC, DOCTOR, SPECIALTY, CatalogCache, catalog_cache
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+from app.core.principal import principal_cache
+
+def synced_cache() -> CatalogCache:
+    cache = CatalogCache(ttl=60)
+    cache.on_connect()
+    return cache
+
+async def test_bypassed_until_listener_connects():
+    cache = CatalogCache(ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return "value"
+
+    await cache.get_or_load("key", (CLINIC,), loader)
+    await cache.get_or_load("key", (CLINIC,), loader)
+    assert len(calls) == 2
+
+    cache.on_connect()
+    await cache.get_or_load("key", (CLINIC,), loader)
+    await cache.get_or_load("key", (CLINIC,), loader)
+    assert len(calls) == 3
+
+    cache.on_disconnect()
+    assert cache.get("key", (CLINIC,)) is None
+
+async def test_single_flight_and_lock_discarded():
+    cache = synced_cache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(cache.get_or_load("key", (CLINIC,), loader) for _ in range(20)))
+    assert results == ["value"] * 20
+    assert len(calls) == 1
+    assert cache._locks == {}
+
+async def test_notify_invalidates_namespaces():
+    cache = synced_cache()
+    cache.set("clinics", cache.version((CLINIC,)), "cached")
+    cache.on_notify({"namespaces": [DOCTOR]})
+    assert cache.get("clinics", (CLINIC,)) == "cached"
+    cache.on_notify({"namespaces": [CLINIC, DOCTOR]})
+    assert cache.get("clinics", (CLINIC,)) is None
+
+@asynccontextmanager
+async def listening():
+    pg_listener.start()
+    try:
+        for _ in range(100):
+            if catalog_cache._synced:
+                break
+            await asyncio.sleep(0.05)
+        assert catalog_cache._synced
+        yield
+    finally:
+        await pg_listener.stop()
+        catalog_cache.on_disconnect()
+        principal_cache.on_disconnect()
+
+async def execute_elsewhere(sql: str) -> None:
+    """Ghi trực tiếp vào DB như một worker khác, không gọi invalidate() của process này"""
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(sql)
+    finally:
+        await connection.close()
+
+async def test_write_from_another_connection_invalidates(db):
+    async with listening():
+        async def loader():
+            return "cached"
+
+        await catalog_cache.get_or_load("clinics", (CLINIC,), loader)
+        assert catalog_cache.get("clinics", (CLINIC,)) == "cached"
+
+        await execute_elsewhere(
+            f'UPDATE "{settings.POSTGRES_SCHEMA}".clinics SET name = name '
+            f'WHERE id = (SELECT id FROM "{settings.POSTGRES_SCHEMA}".clinics LIMIT 1)'
+        )
+
+        for _ in range(100):
+            if catalog_cache.get("clinics", (CLINIC,)) is None:
+                break
+            await asyncio.sleep(0.05)
+        assert catalog_cache.get("clinics", (CLINIC,)) is None
+
+async def test_home_snapshot_follows_writes_from_another_worker(db, client):
+    async with listening():
+        before = (await client.get("/api/v1/home")).json()["data"]
+        assert catalog_cache.get("home", (CLINIC, SPECIALTY, DOCTOR)) is not None
+        doctor_id = before["doctors"][0]["id"]
+
+        await execute_elsewhere(
+            f'UPDATE "{settings.POSTGRES_SCHEMA}".users SET name = \'Renamed elsewhere\' '
+            f"WHERE id = '{doctor_id}'"
+        )
+
+        for _ in range(100):
+            if catalog_cache.get("home", (CLINIC, SPECIALTY, DOCTOR)) is None:
+                break
+            await asyncio.sleep(0.05)
+        after = (await client.get("/api/v1/home")).json()["data"]
+        assert {"id": doctor_id, "name": "Renamed elsewhere", "avatar": before["doctors"][0]["avatar"]} in after["doctors"]
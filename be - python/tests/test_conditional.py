@@ -0,0 +1,34 @@
+from datetime import datetime
+from app.core.conditional import is_not_modified
+
+def test_is_not_modified():
+    etag = '"abc"'
+    modified = datetime(2024, 1, 2, 3, 4, 5)
+    assert is_not_modified(etag, None, '"abc"', None)
+    assert is_not_modified(etag, None, 'W/"abc"', None)
+    assert is_not_modified(etag, None, '"x", W/"abc"', None)
+    assert is_not_modified(etag, None, "*", None)
+    assert not is_not_modified(etag, None, '"x"', None)
+    assert not is_not_modified(etag, None, None, None)
+    # If-None-Match được ưu tiên hơn If-Modified-Since
+    assert not is_not_modified(etag, modified, '"x"', "Tue, 02 Jan 2024 03:04:05 GMT")
+    assert is_not_modified(etag, modified, None, "Tue, 02 Jan 2024 03:04:05 GMT")
+    assert not is_not_modified(etag, modified, None, "Tue, 02 Jan 2024 03:04:04 GMT")
+    assert not is_not_modified(etag, modified, None, "not a date")
+
+async def test_home_and_catalog_answer_304(db, client):
+    for path in ("/api/v1/home", "/api/v1/clinic"):
+        first = await client.get(path)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        cached = await client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+
+        weak = await client.get(path, headers={"If-None-Match": "W/" + etag.removeprefix("W/")})
+        assert weak.status_code == 304
+
+        stale = await client.get(path, headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == 200
@@ -0,0 +1,142 @@
+import asyncio
+import socket
+from email import message_from_bytes
+import pytest
+from aiosmtpd.controller import Controller
+from fastapi_mail import ConnectionConfig, FastMail
+from sqlalchemy import select, update
+import app.core.email as email
+from app.core.config import settings
+from app.core.email_worker import email_outbox_worker
+from app.db.database import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+
+class RecordingHandler:
+    def __init__(self) -> None:
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def mailer(port: int) -> FastMail:
+    return FastMail(ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+        TIMEOUT=5,
+    ))
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(email, "fastmail", mailer(controller.port))
+    yield handler
+    controller.stop()
+
+async def queue_forgot_password(recipient: str, password: str) -> EmailOutbox:
+    async with AsyncSessionLocal() as session:
+        message = email.queue_forgot_password_email(session, recipient, {"name": "Test", "new_password": password})
+        await session.commit()
+        return message
+
+async def load(message_id) -> EmailOutbox:
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(EmailOutbox).where(EmailOutbox.id == message_id))).scalar_one()
+
+async def drain() -> None:
+    while await email_outbox_worker.drain_once():
+        pass
+
+async def mark_due_messages_sent() -> None:
+    """Mark every due message sent, so a test only sees the rows it queues"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.status.in_([OutboxStatus.Pending, OutboxStatus.Sending]))
+            .values(status=OutboxStatus.Sent, lockedUntil=None)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+async def test_sends_over_smtp_and_scrubs_body(db, smtp_server):
+    message = await queue_forgot_password("outbox-sent@example.com", "Secret123")
+
+    await drain()
+
+    delivered = [envelope for envelope in smtp_server.messages if "outbox-sent@example.com" in envelope.rcpt_tos]
+    assert len(delivered) == 1
+    parsed = message_from_bytes(delivered[0].content)
+    html = next(part for part in parsed.walk() if part.get_content_type() == "text/html")
+    assert "Secret123" in html.get_payload(decode=True).decode()
+
+    row = await load(message.id)
+    assert row.status == OutboxStatus.Sent
+    assert row.sentAt is not None
+    assert row.lockedUntil is None
+    assert row.body == ""
+
+async def test_permanent_failure_scrubs_body(db, monkeypatch):
+    await mark_due_messages_sent()
+    # Không có SMTP server nào trên cổng này
+    monkeypatch.setattr(email, "fastmail", mailer(free_port()))
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_BASE_BACKOFF_SECONDS", 0.0)
+    message = await queue_forgot_password("outbox-failed@example.com", "Secret456")
+
+    await email_outbox_worker.drain_once()
+    row = await load(message.id)
+    assert row.status == OutboxStatus.Pending
+    assert row.attempts == 1
+    assert "Secret456" in row.body
+
+    await email_outbox_worker.drain_once()
+    row = await load(message.id)
+    assert row.status == OutboxStatus.Failed
+    assert row.attempts == 2
+    assert row.lastError
+    assert row.body == ""
+
+async def test_claim_commits_lease_before_sending(db, monkeypatch):
+    await mark_due_messages_sent()
+    message = await queue_forgot_password("outbox-lease@example.com", "Secret789")
+    claimed = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_send(outbox_message):
+        claimed.set()
+        await release.wait()
+
+    monkeypatch.setattr("app.core.email_worker.send_outbox_message", slow_send)
+    drain_task = asyncio.create_task(email_outbox_worker.drain_once())
+    await asyncio.wait_for(claimed.wait(), timeout=5)
+
+    # Trong lúc đang "gửi": row đã commit ở trạng thái Sending và không bị khóa
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(EmailOutbox).where(EmailOutbox.id == message.id).values(lastError=None)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    row = await load(message.id)
+    assert row.status == OutboxStatus.Sending
+    assert row.lockedUntil is not None
+    messages, _ = await email_outbox_worker.claim_batch()
+    assert message.id not in {m.id for m in messages}
+
+    release.set()
+    await drain_task
+    assert (await load(message.id)).status == OutboxStatus.Sent
@@ -0,0 +1,34 @@
+import csv
+import io
+import pytest
+from app.core.export import _cell, _csv_chunks, _xlsx_chunks
+
+ROWS = [
+    ("=HYPERLINK(\"http://evil\",\"x\")", "+84123", "-1+1", "@SUM(A1)", "\tcmd", "\rcmd", "Nguyễn Văn A", -5),
+]
+
+async def rows():
+    for row in ROWS:
+        yield row
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+def test_formula_cells_are_prefixed():
+    assert [_cell(value) for value in ROWS[0]] == [
+        "'=HYPERLINK(\"http://evil\",\"x\")", "'+84123", "'-1+1", "'@SUM(A1)", "'\tcmd", "'\rcmd", "Nguyễn Văn A", -5,
+    ]
+
+async def test_csv_export_escapes_formulas():
+    body = (await collect(_csv_chunks(["a", "b", "c", "d", "e", "f", "g", "h"], rows()))).decode("utf-8-sig")
+    header, row = list(csv.reader(io.StringIO(body, newline="")))
+    assert all(cell.startswith("'") for cell in row[:6])
+    assert row[6:] == ["Nguyễn Văn A", "-5"]
+
+async def test_xlsx_export_escapes_formulas():
+    openpyxl = pytest.importorskip("openpyxl")
+    body = await collect(_xlsx_chunks("Users", ["a", "b", "c", "d", "e", "f", "g", "h"], rows()))
+    sheet = openpyxl.load_workbook(io.BytesIO(body)).active
+    cells = [cell.value for cell in sheet[2]]
+    assert all(value.startswith("'") for value in cells[:6])
+    assert [cell.data_type for cell in sheet[2]][:6] == ["s"] * 6
@@ -0,0 +1,73 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import delete, select, update
+import app.core.image_gc as image_gc_module
+from app.core.image_gc import image_gc
+from app.db.database import AsyncSessionLocal
+from app.models.clinic import Clinic
+from app.models.image_blob import ImageBlob
+
+async def blob(name: str):
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(
+            select(ImageBlob).where(ImageBlob.directory == "clinics", ImageBlob.name == name)
+        )).scalar_one_or_none()
+
+async def set_clinic_image(clinic_id, image) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Clinic).where(Clinic.id == clinic_id).values(image=image))
+        await session.commit()
+
+async def test_reference_during_gc_is_not_lost(db, monkeypatch):
+    name = hashlib.sha256(uuid4().bytes).hexdigest() + ".jpg"
+    async with AsyncSessionLocal() as session:
+        session.add(ImageBlob(
+            directory="clinics", name=name, size=10, refCount=0,
+            updatedAt=datetime.utcnow() - timedelta(days=30),
+        ))
+        clinic_id, image = (await session.execute(select(Clinic.id, Clinic.image).limit(1))).one()
+        await session.commit()
+
+    deleting = asyncio.Event()
+    release = asyncio.Event()
+    deleted = []
+
+    async def slow_delete(key):
+        deleted.append(key)
+        deleting.set()
+        await release.wait()
+
+    monkeypatch.setattr(image_gc_module.image_storage, "delete", slow_delete)
+    try:
+        collect = asyncio.create_task(image_gc.collect_once())
+        await asyncio.wait_for(deleting.wait(), timeout=5)
+
+        # GC đang giữ lock của blob: tham chiếu mới phải chờ rồi tạo lại row
+        reference = asyncio.create_task(set_clinic_image(clinic_id, name))
+        await asyncio.sleep(0.2)
+        assert not reference.done()
+
+        release.set()
+        await collect
+        await asyncio.wait_for(reference, timeout=5)
+
+        assert f"clinics/{name}" in deleted
+        row = await blob(name)
+        assert row is not None and row.refCount == 1
+    finally:
+        await set_clinic_image(clinic_id, image)
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(ImageBlob).where(ImageBlob.name == name))
+            await session.commit()
+
+async def test_legacy_names_are_not_tracked(db):
+    name = f"{uuid4()}.jpg"
+    async with AsyncSessionLocal() as session:
+        clinic_id, image = (await session.execute(select(Clinic.id, Clinic.image).limit(1))).one()
+    try:
+        await set_clinic_image(clinic_id, name)
+        assert await blob(name) is None
+    finally:
+        await set_clinic_image(clinic_id, image)
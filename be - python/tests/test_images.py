@@ -0,0 +1,76 @@
+from uuid import uuid4
+import pytest
+from sqlalchemy import select, update
+from app.core import images
+from app.core.image_backfill import image_variant_backfill
+from app.core.images import IMAGE_ROOT, IMAGE_SIZES, VARIANT_FORMATS, image_processor, variant_name
+from app.db.database import AsyncSessionLocal
+from app.models.clinic import Clinic
+
+Image = pytest.importorskip("PIL.Image")
+
+@pytest.fixture
+def legacy_image():
+    """An original uploaded before the variant pipeline: uuid name, no variants on disk"""
+    name = f"{uuid4()}.png"
+    folder = IMAGE_ROOT / "clinics"
+    folder.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (800, 600), "teal").save(folder / name)
+    yield name
+    for path in folder.glob(f"{name.rsplit('.', 1)[0]}*"):
+        path.unlink()
+
+async def test_get_never_generates_variants(db, client, legacy_image, monkeypatch):
+    async def fail(path):
+        raise AssertionError("GET must not start image processing")
+
+    monkeypatch.setattr(image_processor, "generate", fail)
+    response = await client.get(f"/api/v1/media/clinics/{legacy_image}?size=card", headers={"Accept": "image/webp"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    # Ảnh gốc thay cho cỡ card: không được cache vĩnh viễn
+    assert "immutable" not in response.headers["cache-control"]
+
+async def test_backfill_generates_and_stores_variants(db, client, legacy_image):
+    async with AsyncSessionLocal() as session:
+        clinic_id, image, variants = (await session.execute(
+            select(Clinic.id, Clinic.image, Clinic.imageVariants).limit(1)
+        )).one()
+        await session.execute(
+            update(Clinic).where(Clinic.id == clinic_id).values(image=legacy_image, imageVariants=None)
+        )
+        await session.commit()
+    try:
+        await check_backfill(client, clinic_id, legacy_image)
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Clinic).where(Clinic.id == clinic_id).values(image=image, imageVariants=variants))
+            await session.commit()
+
+async def check_backfill(client, clinic_id, legacy_image):
+    # Chỉ xử lý ảnh của test, không tạo variant cho ảnh seed trong app/public
+    assert legacy_image in await image_variant_backfill._next_batch(Clinic.image, Clinic.imageVariants, "")
+    assert await image_variant_backfill._backfill("clinics", legacy_image, Clinic.image, Clinic.imageVariants)
+
+    async with AsyncSessionLocal() as session:
+        variants = (await session.execute(select(Clinic.imageVariants).where(Clinic.id == clinic_id))).scalar_one()
+    assert set(variants) == set(IMAGE_SIZES)
+    assert variants["card"]["webp"] == variant_name(legacy_image, "card", "webp")
+
+    response = await client.get(f"/api/v1/media/clinics/{legacy_image}?size=card", headers={"Accept": "image/webp"})
+    assert response.headers["content-type"] in {f"image/{fmt}" for fmt in VARIANT_FORMATS}
+    assert "immutable" in response.headers["cache-control"]
+
+async def test_failed_images_are_retried_after_expiry(tmp_path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    processor = images.ImageProcessor(workers=1)
+    try:
+        assert await processor.generate(broken) is None
+        assert processor._failed.get(str(broken))
+
+        processor._failed = images.TTLCache(ttl=0)
+        assert await processor.generate(broken) is None
+        assert processor._failed.get(str(broken)) is None
+    finally:
+        processor.shutdown()
@@ -0,0 +1,177 @@
+"""
+EXPLAIN checks that the hot schedule, booking and doctor lookups use the
+indexes from the migrations. A larger dataset is generated inside a
+transaction that is rolled back, so the planner sees realistic row counts
+(and statistics from ANALYZE) without leaking rows into other tests.
+"""
+import json
+from typing import Iterator, List
+import pytest
+from sqlalchemy import text
+
+DOCTORS = 2000
+CLINICS = 200
+SPECIALTIES = 100
+SLOTS_PER_DOCTOR = 50
+BOOKED_SCHEDULES = 20000
+
+BULK_DATA = [
+    """
+    INSERT INTO clinics (id, name, address, phone, "createdAt", "updatedAt", "isDeleted")
+    SELECT md5('clinic' || g)::uuid, 'Bulk clinic ' || g, 'Address', '0', now(), now(), false
+    FROM generate_series(1, :clinics) g
+    """,
+    """
+    INSERT INTO specializations (id, name, "createdAt", "updatedAt", "isDeleted")
+    SELECT md5('specialty' || g)::uuid, 'Bulk specialty ' || g, now(), now(), false
+    FROM generate_series(1, :specialties) g
+    """,
+    """
+    INSERT INTO users (id, name, email, password, phone, gender, "roleId", address, "createdAt", "updatedAt", "isDeleted")
+    SELECT md5('doctor' || g)::uuid, 'Bulk doctor ' || g, 'bulk-doctor' || g || '@example.com', 'x', '0',
+           'Male', 2, 'Address', now(), now(), false
+    FROM generate_series(1, :doctors) g
+    """,
+    """
+    INSERT INTO doctor_user ("doctorId", "clinicId", "specializationId", "createdAt", "updatedAt", "isDeleted")
+    SELECT md5('doctor' || g)::uuid, md5('clinic' || (g % :clinics + 1))::uuid,
+           md5('specialty' || (g % :specialties + 1))::uuid, now(), now(), false
+    FROM generate_series(1, :doctors) g
+    """,
+    # Phần lớn lịch đã đầy, chỉ một phần nhỏ còn chỗ
+    """
+    INSERT INTO schedules (id, "doctorId", "startTime", "endTime", price, "maxBooking", "sumBooking",
+                           "createdAt", "updatedAt", "isDeleted")
+    SELECT md5('schedule' || d || '-' || s)::uuid, md5('doctor' || d)::uuid,
+           timestamp '2090-01-01' + s * interval '1 hour', timestamp '2090-01-01' + (s + 1) * interval '1 hour',
+           100000, 3, CASE WHEN s % 10 = 0 THEN 0 ELSE 3 END, now(), now(), false
+    FROM generate_series(1, :doctors) d, generate_series(1, :slots) s
+    """,
+    """
+    INSERT INTO patients (id, name, phone, email, gender, address, "createdAt", "updatedAt", "isDeleted")
+    SELECT md5('patient' || g)::uuid, 'Bulk patient ' || g, '0', 'p' || g || '@example.com', 'Male', 'Address',
+           now(), now(), false
+    FROM generate_series(1, :booked) g
+    """,
+    """
+    INSERT INTO patient_schedule ("patientId", "scheduleId", status, "createdAt", "updatedAt", "isDeleted")
+    SELECT md5('patient' || g)::uuid, md5('schedule' || (g % :doctors + 1) || '-' || (g / :doctors + 1))::uuid,
+           CASE WHEN g % 100 = 0 THEN 'Pending' ELSE 'Accept' END::status, now(), now(), false
+    FROM generate_series(1, :booked) g
+    """,
+    "ANALYZE clinics",
+    "ANALYZE specializations",
+    "ANALYZE users",
+    "ANALYZE doctor_user",
+    "ANALYZE schedules",
+    "ANALYZE patients",
+    "ANALYZE patient_schedule",
+]
+
+PARAMS = {
+    "clinics": CLINICS,
+    "specialties": SPECIALTIES,
+    "doctors": DOCTORS,
+    "slots": SLOTS_PER_DOCTOR,
+    "booked": BOOKED_SCHEDULES,
+}
+
+# (mô tả, câu query như trong endpoint, index phải được dùng)
+CASES = [
+    (
+        "get_schedules_by_doctor_id: available slots of a doctor",
+        """
+        SELECT * FROM schedules
+        WHERE "doctorId" = md5('doctor42')::uuid AND "startTime" >= timestamp '2090-01-01'
+          AND "sumBooking" < "maxBooking"
+        ORDER BY "startTime"
+        """,
+        "ix_schedules_available_doctorId_startTime",
+    ),
+    (
+        "get_schedules_for_doctor: all slots of a doctor by start time",
+        """
+        SELECT * FROM schedules
+        WHERE "doctorId" = md5('doctor42')::uuid AND "startTime" >= timestamp '2090-01-01'
+        ORDER BY "startTime"
+        """,
+        "ix_schedules_doctorId_startTime",
+    ),
+    (
+        "create/update_schedule: overlap with another active slot",
+        """
+        SELECT 1 FROM schedules
+        WHERE "doctorId" = md5('doctor42')::uuid AND NOT "isDeleted"
+          AND "timeRange" && tsrange(timestamp '2090-01-02 10:30', timestamp '2090-01-02 11:30', '[)')
+        """,
+        "ex_schedules_doctorId_timeRange",
+    ),
+    (
+        "supporter queue: bookings of a schedule",
+        """
+        SELECT * FROM patient_schedule
+        WHERE "scheduleId" = md5('schedule42-1')::uuid
+        """,
+        "ix_patient_schedule_scheduleId",
+    ),
+    (
+        "supporter queue: pending bookings",
+        """
+        SELECT * FROM patient_schedule WHERE status = 'Pending'
+        """,
+        "ix_patient_schedule_status",
+    ),
+    (
+        "get_doctors_by_clinic",
+        """
+        SELECT users.* FROM users JOIN doctor_user ON users.id = doctor_user."doctorId"
+        WHERE users."roleId" = 2 AND doctor_user."clinicId" = md5('clinic7')::uuid
+        """,
+        "ix_doctor_user_clinicId",
+    ),
+    (
+        "get_doctors_by_specialization",
+        """
+        SELECT users.* FROM users JOIN doctor_user ON users.id = doctor_user."doctorId"
+        WHERE users."roleId" = 2 AND doctor_user."specializationId" = md5('specialty7')::uuid
+        """,
+        "ix_doctor_user_specializationId",
+    ),
+    (
+        "users by role",
+        """
+        SELECT * FROM users WHERE "roleId" = 3
+        """,
+        "ix_users_roleId",
+    ),
+]
+
+def index_names(plan: dict) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from index_names(child)
+
+@pytest.fixture(scope="module")
+async def plans(db) -> List[List[str]]:
+    async with db.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            for statement in BULK_DATA:
+                used = {key: value for key, value in PARAMS.items() if f":{key}" in statement}
+                await conn.execute(text(statement), used)
+
+            result = []
+            for _, query, _ in CASES:
+                plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))).scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                result.append(list(index_names(plan[0]["Plan"])))
+            return result
+        finally:
+            await transaction.rollback()
+
+@pytest.mark.parametrize("case", range(len(CASES)), ids=[case[0] for case in CASES])
+async def test_query_uses_index(plans, case):
+    _, _, index = CASES[case]
+    assert index in plans[case], f"{index} not used, plan uses {plans[case]}"
@@ -0,0 +1,49 @@
+from datetime import datetime
+from uuid import uuid4
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from app.core.config import settings
+from app.db.migrations import MIGRATIONS
+
+EXCLUSION = next(migration for migration in MIGRATIONS if migration.version == 8)
+
+SCHEDULE = """
+    INSERT INTO schedules (id, "doctorId", "startTime", "endTime", price, "maxBooking", "sumBooking",
+                           "createdAt", "updatedAt", "isDeleted")
+    SELECT :id, id, :start, :end, 100000, 3, 0, now(), now(), false
+    FROM users WHERE email = 'doctor1@hospital.com'
+"""
+
+async def apply_exclusion(conn) -> None:
+    for statement in EXCLUSION.statements:
+        await conn.execute(text(statement.format(schema=settings.POSTGRES_SCHEMA)))
+
+async def test_exclusion_migration_is_rerunnable(db):
+    async with db.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await apply_exclusion(conn)
+        finally:
+            await transaction.rollback()
+
+async def test_exclusion_migration_reports_overlaps(db):
+    first, second = uuid4(), uuid4()
+    async with db.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            # Như một DB cũ: chưa có constraint và đã có hai lịch trùng giờ
+            await conn.execute(text(
+                'ALTER TABLE schedules DROP CONSTRAINT "ex_schedules_doctorId_timeRange"'
+            ))
+            await conn.execute(text(SCHEDULE), {"id": first, "start": datetime(2091, 1, 1, 8), "end": datetime(2091, 1, 1, 9)})
+            await conn.execute(text(SCHEDULE), {"id": second, "start": datetime(2091, 1, 1, 8, 30), "end": datetime(2091, 1, 1, 9, 30)})
+
+            with pytest.raises(DBAPIError) as error:
+                await apply_exclusion(conn)
+        finally:
+            await transaction.rollback()
+
+    message = str(error.value)
+    assert "1 pair(s) of active schedules overlap" in message
+    assert str(first) in message and str(second) in message
@@ -0,0 +1,39 @@
+from sqlalchemy import event
+from app.core.principal import principal_cache
+
+async def admin_headers(client) -> dict:
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "adminpassword"},
+    )
+    return {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+
+async def test_user_search_estimate_binds_the_query(db, client):
+    headers = await admin_headers(client)
+    principal_cache.clear()
+    explained = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("EXPLAIN"):
+            explained.append((statement, parameters))
+
+    event.listen(db.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await client.get("/api/v1/users", params={"q": "doctor'1%_"}, headers=headers)
+        matched = await client.get("/api/v1/users", params={"q": "Doctor1"}, headers=headers)
+    finally:
+        event.remove(db.sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["total"] == 0
+    assert response.json()["data"]["items"] == []
+
+    # Giá trị tìm kiếm đi qua tham số, không bị nhúng (và nhân đôi %) vào câu SQL
+    statement, parameters = explained[0]
+    assert "'1" not in statement and "%%" not in statement
+    assert "doctor'1\\%\\_%" in [str(value) for value in parameters]
+
+    assert matched.status_code == 200
+    emails = [item["email"] for item in matched.json()["data"]["items"]]
+    assert emails and all(email.startswith("doctor1") for email in emails)
+    assert matched.json()["data"]["total"] == len(emails)
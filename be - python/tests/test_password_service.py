@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import bcrypt
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from app.core.security import PasswordService, password_service, verify_and_update_password, verify_password
+from app.db.database import AsyncSessionLocal
+from app.models.user import User
+
+async def test_pending_limit_rejects_with_retry_after():
+    service = PasswordService(workers=1, max_pending=2)
+    release = threading.Event()
+    try:
+        blocked = [asyncio.create_task(service._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(HTTPException) as error:
+            await service._run(release.wait)
+        assert error.value.status_code == 503
+        assert error.value.headers == {"Retry-After": "1"}
+        assert service.stats() == {
+            "workers": 1, "inFlight": 1, "queued": 1, "maxPending": 2, "completed": 0, "failed": 0, "rejected": 1,
+        }
+
+        release.set()
+        await asyncio.gather(*blocked)
+        assert service.stats()["completed"] == 2
+    finally:
+        release.set()
+        service.shutdown()
+
+async def test_failures_are_not_counted_as_completed():
+    service = PasswordService(workers=1, max_pending=2)
+
+    def broken():
+        raise ValueError("boom")
+
+    try:
+        with pytest.raises(ValueError):
+            await service._run(broken)
+        stats = service.stats()
+        assert (stats["completed"], stats["failed"], stats["inFlight"]) == (0, 1, 0)
+    finally:
+        service.shutdown()
+
+def test_non_bcrypt_hash_does_not_verify():
+    assert verify_password("secret", "not-a-hash") is False
+    assert verify_and_update_password("secret", "not-a-hash") == (False, None)
+
+async def test_login_answers_503_when_the_pool_is_full(client, monkeypatch):
+    monkeypatch.setattr(password_service, "max_pending", 0)
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "doctor3@hospital.com", "password": "doctor123"},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+@pytest.mark.parametrize("prefix", ["$2a$", "$2y$"])
+async def test_login_upgrades_legacy_bcrypt_prefixes(client, prefix):
+    async with AsyncSessionLocal() as session:
+        user_id, original = (await session.execute(
+            select(User.id, User.password).where(User.email == "doctor3@hospital.com")
+        )).one()
+        await session.execute(update(User).where(User.id == user_id).values(password=prefix + original[4:]))
+        await session.commit()
+    try:
+        response = await client.post(
+            "/api/v1/auth/login",
+            data={"username": "doctor3@hospital.com", "password": "doctor123"},
+        )
+        assert response.status_code == 201
+
+        async with AsyncSessionLocal() as session:
+            upgraded = (await session.execute(select(User.password).where(User.id == user_id))).scalar_one()
+        assert upgraded.startswith("$2b$12$") and upgraded[7:] != original[7:]
+        assert bcrypt.checkpw(b"doctor123", upgraded.encode())
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(User).where(User.id == user_id).values(password=original))
+            await session.commit()
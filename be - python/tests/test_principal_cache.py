@@ -0,0 +1,89 @@
+import asyncio
+from uuid import uuid4
+import asyncpg
+from app.core.availability import availability_index
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+from app.core.principal import Principal, PrincipalCache, principal_cache
+
+def principal(name: str) -> Principal:
+    return Principal(id=uuid4(), email="cache@example.com", name=name, roleId=3)
+
+def test_bypassed_until_listener_connects():
+    cache = PrincipalCache(ttl=60, maxsize=10)
+    cache.set("user", (1, principal("a")))
+    assert cache.get("user") is None
+
+    cache.on_connect()
+    cache.set("user", (1, principal("a")))
+    assert cache.get("user") is not None
+
+    cache.on_disconnect()
+    assert cache.get("user") is None
+
+def test_notify_drops_one_user_or_everything():
+    cache = PrincipalCache(ttl=60, maxsize=10)
+    cache.on_connect()
+    cache.set("a", (1, principal("a")))
+    cache.set("b", (1, principal("b")))
+
+    cache.on_notify({"id": "a"})
+    assert cache.get("a") is None and cache.get("b") is not None
+    cache.on_notify({})
+    assert cache.get("b") is None
+
+def test_load_racing_a_change_is_not_cached():
+    cache = PrincipalCache(ttl=60, maxsize=10)
+    cache.on_connect()
+    version = cache.version
+    # User đổi trong lúc principal đang được load: giá trị cũ không được lưu
+    cache.on_notify({"id": "a"})
+    cache.set("a", (1, principal("old")), version=version)
+    assert cache.get("a") is None
+
+async def execute_elsewhere(sql: str) -> None:
+    """Ghi trực tiếp vào DB như một worker khác, không gọi invalidate_principal() của process này"""
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(sql)
+    finally:
+        await connection.close()
+
+async def test_write_from_another_worker_reaches_the_cache(db, client):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "supporter2@hospital.com", "password": "supporter123"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+    before = (await client.get("/api/v1/auth/account", headers=headers)).json()["data"]
+    user_id = before["id"]
+    users = f'"{settings.POSTGRES_SCHEMA}".users'
+
+    pg_listener.start()
+    try:
+        for _ in range(100):
+            if principal_cache._synced:
+                break
+            await asyncio.sleep(0.05)
+        assert principal_cache._synced
+
+        assert (await client.get("/api/v1/auth/account", headers=headers)).status_code == 200
+        assert principal_cache.get(user_id) is not None
+
+        await execute_elsewhere(f"UPDATE {users} SET name = 'Renamed principal' WHERE id = '{user_id}'")
+        for _ in range(100):
+            if principal_cache.get(user_id) is None:
+                break
+            await asyncio.sleep(0.05)
+        assert principal_cache.get(user_id) is None
+
+        after = (await client.get("/api/v1/auth/account", headers=headers)).json()["data"]
+        assert after["name"] == "Renamed principal"
+    finally:
+        await pg_listener.stop()
+        principal_cache.on_disconnect()
+        catalog_cache.on_disconnect()
+        availability_index.on_disconnect()
+        await execute_elsewhere(f"UPDATE {users} SET name = '{before['name']}' WHERE id = '{user_id}'")
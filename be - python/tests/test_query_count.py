@@ -0,0 +1,126 @@
+"""
+Statements sent to PostgreSQL per request for the main endpoints, counted
+with a before_cursor_execute listener. Session setup (search_path) happens
+once per connection, so no request may issue a SET of its own.
+
+The catalog cache is not synced in tests (no LISTEN connection), so
+catalog endpoints are measured cold: one validator query for the
+conditional GET plus the list itself.
+"""
+from typing import List
+import pytest
+from sqlalchemy import event, select
+from app.core.principal import principal_cache
+from app.db.database import AsyncSessionLocal
+from app.models.schedule import Schedule
+from app.models.user import User
+
+@pytest.fixture
+def statements(db):
+    captured: List[str] = []
+    # Đo như request đầu tiên của token: principal chưa có trong cache
+    principal_cache.clear()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(db.sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(db.sync_engine, "before_cursor_execute", capture)
+
+@pytest.fixture
+async def ids(db):
+    async with AsyncSessionLocal() as session:
+        doctor_id = (await session.execute(
+            select(User.id).where(User.email == "doctor1@hospital.com")
+        )).scalar_one()
+        schedule_id = (await session.execute(
+            select(Schedule.id)
+            .where(Schedule.doctorId == doctor_id, Schedule.sumBooking < Schedule.maxBooking)
+            .order_by(Schedule.startTime.desc())
+            .limit(1)
+        )).scalar_one()
+    return {"doctor": doctor_id, "schedule": schedule_id}
+
+@pytest.fixture
+async def admin_headers(client):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "adminpassword"},
+    )
+    return {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+
+GET_CASES = [
+    ("/api/v1/clinic", 2),
+    ("/api/v1/specialty", 2),
+    ("/api/v1/doctor", 2),
+    ("/api/v1/doctor/{doctor}", 2),
+    ("/api/v1/home", 3),
+    ("/api/v1/schedules/{doctor}", 1),
+    ("/api/v1/schedules/availability?doctorIds={doctor}", 1),
+    # principal + một trang + ước lượng từ planner + COUNT chính xác (bảng nhỏ)
+    ("/api/v1/users", 4),
+]
+
+@pytest.mark.parametrize("path, expected", GET_CASES, ids=[path for path, _ in GET_CASES])
+async def test_get_statement_count(client, statements, ids, admin_headers, path, expected):
+    statements.clear()
+    response = await client.get(path.format(**ids), headers=admin_headers)
+    assert response.status_code == 200
+    assert not [s for s in statements if s.lstrip().upper().startswith("SET")]
+    assert len(statements) == expected, statements
+
+async def test_authenticated_principal_is_loaded_once(client, statements, admin_headers):
+    # Cache principal chỉ dùng khi LISTEN đã kết nối
+    principal_cache.on_connect()
+    try:
+        statements.clear()
+        assert (await client.get("/api/v1/auth/account", headers=admin_headers)).status_code == 200
+        assert len(statements) == 1, statements
+
+        statements.clear()
+        assert (await client.get("/api/v1/auth/account", headers=admin_headers)).status_code == 200
+        assert statements == []
+    finally:
+        principal_cache.on_disconnect()
+
+async def test_booking_statement_count(client, statements, ids):
+    statements.clear()
+    response = await client.post("/api/v1/patient", json={
+        "name": "Query count",
+        "email": "query-count@example.com",
+        "phone": "0123456789",
+        "address": "1 Test Street",
+        "description": "",
+        "scheduleId": str(ids["schedule"]),
+        "gender": "Male",
+    })
+    assert response.status_code == 201
+    # đọc lịch khám, INSERT patient / patient_schedule / email_outbox, UPDATE giữ chỗ
+    assert len(statements) == 5, statements
+
+async def test_create_schedule_statement_count(client, statements):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "doctor1@hospital.com", "password": "doctor123"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+    principal_cache.clear()
+
+    statements.clear()
+    response = await client.post("/api/v1/schedules", headers=headers, json={
+        "startTime": "2093-03-04T08:00:00+07:00",
+        "endTime": "2093-03-04T09:00:00+07:00",
+        "price": 100000,
+        "maxBooking": 3,
+    })
+    assert response.status_code == 200, response.text
+    # principal + INSERT, không SELECT lại lịch vừa tạo
+    assert len(statements) == 2, statements
+    created = response.json()["data"]
+
+    async with AsyncSessionLocal() as session:
+        schedule = await session.get(Schedule, created["id"])
+        assert schedule.startTime.isoformat() == created["startTime"] == "2093-03-04T08:00:00"
+        await session.delete(schedule)
+        await session.commit()
@@ -0,0 +1,38 @@
+from datetime import datetime
+from uuid import uuid4
+import orjson
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+from app.core.responses import SuccessResponse
+
+def test_renders_asyncpg_uuid():
+    value = uuid4()
+    response = SuccessResponse(content={"id": AsyncpgUUID(str(value)), "ids": [value]})
+    body = orjson.loads(response.body)
+    assert body["data"] == {"id": str(value), "ids": [str(value)]}
+
+async def test_doctor_payloads_from_projections(db, client):
+    from sqlalchemy import select
+    from app.db.database import AsyncSessionLocal
+    from app.models.doctor_user import DoctorUser
+
+    async with AsyncSessionLocal() as session:
+        link = (await session.execute(select(DoctorUser).limit(1))).scalar_one()
+
+    detail = (await client.get(f"/api/v1/doctor/{link.doctorId}")).json()["data"]
+    assert detail["id"] == str(link.doctorId)
+    assert set(detail["doctor_user"]) == {"specialization", "clinic"}
+    assert set(detail["doctor_user"]["clinic"]) == {"name", "address", "description"}
+
+    by_specialization = (await client.get(f"/api/v1/doctor/spec/{link.specializationId}")).json()["data"]
+    assert str(link.doctorId) in {row["doctor"]["id"] for row in by_specialization}
+    assert set(by_specialization[0]) == {"doctor", "specialization", "clinic"}
+
+    by_clinic = (await client.get(f"/api/v1/doctor/clinic/{link.clinicId}")).json()["data"]
+    assert str(link.doctorId) in {row["doctor"]["id"] for row in by_clinic}
+    assert set(by_clinic[0]["clinic"]) == {"name", "address", "image", "description"}
+
+    slots = (await client.get(f"/api/v1/schedules/{link.doctorId}")).json()["data"]
+    for slot in slots:
+        assert slot["doctorId"] == str(link.doctorId)
+        # orjson ghi datetime naive giống isoformat()
+        assert datetime.fromisoformat(slot["startTime"]).isoformat() == slot["startTime"]
@@ -0,0 +1,144 @@
+from datetime import date, datetime, time, timedelta
+import pytest
+from sqlalchemy import delete, select
+from app.api.v1.endpoints.schedules import expand_template
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, get_db
+from app.main import app
+from app.models.schedule import Schedule
+from app.models.user import User
+from app.schemas.schedule import CreateScheduleTemplateDto
+
+# Mỗi test dùng một tuần riêng ở xa trong tương lai
+MONDAY = date(2096, 1, 2)
+
+def template(**overrides) -> dict:
+    body = {
+        "dateFrom": MONDAY.isoformat(),
+        "dateTo": (MONDAY + timedelta(days=6)).isoformat(),
+        "weekdays": [1, 3],
+        "startTime": "08:00:00",
+        "endTime": "10:00:00",
+        "slotMinutes": 60,
+        "price": 100000,
+        "maxBooking": 3,
+    }
+    body.update(overrides)
+    return body
+
+@pytest.fixture
+async def doctor(client):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "doctor1@hospital.com", "password": "doctor123"},
+    )
+    async with AsyncSessionLocal() as session:
+        doctor_id = (await session.execute(
+            select(User.id).where(User.email == "doctor1@hospital.com")
+        )).scalar_one()
+    yield {"id": doctor_id, "headers": {"Authorization": f"Bearer {login.json()['data']['access_token']}"}}
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Schedule).where(
+            Schedule.doctorId == doctor_id,
+            Schedule.startTime >= datetime.combine(MONDAY, time()),
+            Schedule.startTime < datetime.combine(MONDAY + timedelta(days=7), time()),
+        ))
+        await session.commit()
+
+async def add_schedule(doctor_id, start: datetime, end: datetime) -> Schedule:
+    async with AsyncSessionLocal() as session:
+        schedule = Schedule(doctorId=doctor_id, startTime=start, endTime=end, price=100000, maxBooking=3, sumBooking=0)
+        session.add(schedule)
+        await session.commit()
+        return schedule
+
+async def schedules_of(doctor_id) -> list:
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(
+            select(Schedule.startTime)
+            .where(
+                Schedule.doctorId == doctor_id,
+                Schedule.startTime >= datetime.combine(MONDAY, time()),
+                Schedule.startTime < datetime.combine(MONDAY + timedelta(days=7), time()),
+            )
+            .order_by(Schedule.startTime)
+        )).scalars().all()
+
+def test_expand_template_weekdays_and_limit():
+    dto = CreateScheduleTemplateDto(**template(dateTo=(MONDAY + timedelta(days=13)).isoformat()))
+    slots = expand_template(dto, 100)
+    assert [start.date().isoweekday() for start, _ in slots] == [1, 1, 3, 3] * 2
+    assert slots[0] == (datetime(2096, 1, 2, 8), datetime(2096, 1, 2, 9))
+    assert slots[-1] == (datetime(2096, 1, 11, 9), datetime(2096, 1, 11, 10))
+    assert expand_template(dto, 3) == slots[:3]
+
+def test_expand_template_converts_offsets_to_vietnam_time():
+    dto = CreateScheduleTemplateDto(**template(weekdays=[1], startTime="01:00:00+00:00", endTime="02:00:00Z"))
+    assert expand_template(dto, 100) == [(datetime(2096, 1, 2, 8), datetime(2096, 1, 2, 9))]
+
+async def test_template_creates_every_slot(client, doctor):
+    response = await client.post("/api/v1/schedules/template", headers=doctor["headers"], json=template())
+    assert response.status_code == 201, response.text
+    assert response.json()["data"] == {"created": 4, "conflicts": []}
+    assert await schedules_of(doctor["id"]) == [
+        datetime(2096, 1, 2, 8), datetime(2096, 1, 2, 9),
+        datetime(2096, 1, 4, 8), datetime(2096, 1, 4, 9),
+    ]
+
+async def test_template_slot_limit(client, doctor, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULE_TEMPLATE_MAX_SLOTS", 3)
+    response = await client.post("/api/v1/schedules/template", headers=doctor["headers"], json=template())
+    assert response.status_code == 400
+    assert await schedules_of(doctor["id"]) == []
+
+async def test_template_reports_conflicts(client, doctor):
+    existing = await add_schedule(doctor["id"], datetime(2096, 1, 2, 8, 30), datetime(2096, 1, 2, 9, 30))
+
+    response = await client.post("/api/v1/schedules/template", headers=doctor["headers"], json=template())
+    assert response.status_code == 409
+    conflicts = response.json()["errors"]
+    assert [(row["startTime"], row["endTime"]) for row in conflicts] == [
+        ("2096-01-02T08:00:00", "2096-01-02T09:00:00"),
+        ("2096-01-02T09:00:00", "2096-01-02T10:00:00"),
+    ]
+    assert all(row["conflictsWith"][0]["id"] == str(existing.id) for row in conflicts)
+    # Có trùng thì không tạo lịch nào
+    assert await schedules_of(doctor["id"]) == [datetime(2096, 1, 2, 8, 30)]
+
+async def test_template_skip_conflicts(client, doctor):
+    await add_schedule(doctor["id"], datetime(2096, 1, 2, 8, 30), datetime(2096, 1, 2, 9, 30))
+
+    response = await client.post(
+        "/api/v1/schedules/template", headers=doctor["headers"], json=template(skipConflicts=True)
+    )
+    assert response.status_code == 201, response.text
+    data = response.json()["data"]
+    assert data["created"] == 2
+    assert len(data["conflicts"]) == 2
+    assert await schedules_of(doctor["id"]) == [
+        datetime(2096, 1, 2, 8, 30), datetime(2096, 1, 4, 8), datetime(2096, 1, 4, 9),
+    ]
+
+async def test_template_concurrent_schedule_hits_the_constraint(client, doctor):
+    async def racing_db():
+        # Một lịch khác được tạo giữa lúc kiểm tra trùng và lúc INSERT
+        async for session in get_db():
+            execute = session.execute
+
+            async def racing_execute(statement, *args, **kwargs):
+                if getattr(statement, "is_insert", False):
+                    await add_schedule(doctor["id"], datetime(2096, 1, 4, 9, 30), datetime(2096, 1, 4, 10, 30))
+                return await execute(statement, *args, **kwargs)
+
+            session.execute = racing_execute
+            yield session
+
+    app.dependency_overrides[get_db] = racing_db
+    try:
+        response = await client.post(
+            "/api/v1/schedules/template", headers=doctor["headers"], json=template(skipConflicts=True)
+        )
+    finally:
+        del app.dependency_overrides[get_db]
+    assert response.status_code == 409
+    assert await schedules_of(doctor["id"]) == [datetime(2096, 1, 4, 9, 30)]
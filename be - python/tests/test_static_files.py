@@ -0,0 +1,72 @@
+import httpx
+import pytest
+from app.core.config import settings
+from app.core.images import IMAGE_ROOT
+from app.core.static_files import IMMUTABLE, CachedStaticFiles
+
+FINGERPRINT = "a" * 64
+
+@pytest.fixture
+async def static(tmp_path):
+    (tmp_path / "logo.svg").write_text("<svg/>")
+    (tmp_path / f"{FINGERPRINT}.jpg").write_bytes(b"\xff\xd8\xff")
+    transport = httpx.ASGITransport(app=CachedStaticFiles(directory=str(tmp_path)))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+async def test_fingerprinted_names_are_immutable(static):
+    response = await static.get(f"/{FINGERPRINT}.jpg")
+    assert response.headers["cache-control"] == IMMUTABLE
+
+async def test_only_the_current_version_is_immutable(static):
+    plain = await static.get("/logo.svg")
+    assert plain.headers["cache-control"] != IMMUTABLE
+    version = plain.headers["etag"].strip('"')
+
+    pinned = await static.get(f"/logo.svg?v={version}")
+    assert pinned.headers["cache-control"] == IMMUTABLE
+
+    # ?v= cũ hoặc tự đặt không được giữ file một năm trong cache
+    for stale in ("1", "deadbeef", ""):
+        response = await static.get(f"/logo.svg?v={stale}")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] != IMMUTABLE
+
+async def test_x_sendfile_hands_the_file_to_the_proxy(static, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STATIC_SENDFILE_HEADER", "X-Sendfile")
+    response = await static.get(f"/{FINGERPRINT}.jpg")
+    assert response.status_code == 200
+    assert response.headers["x-sendfile"] == str((tmp_path / f"{FINGERPRINT}.jpg").resolve())
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.content == b""
+
+async def test_media_uses_x_accel_redirect(client, monkeypatch):
+    name = f"{'b' * 64}.jpg"
+    path = IMAGE_ROOT / "clinics" / name
+    path.write_bytes(b"\xff\xd8\xff")
+    monkeypatch.setattr(settings, "STATIC_SENDFILE_HEADER", "X-Accel-Redirect")
+    try:
+        response = await client.get(f"/api/v1/media/clinics/{name}?size=original")
+    finally:
+        path.unlink()
+    assert response.status_code == 200
+    assert response.headers["x-accel-redirect"] == f"/_public/images/clinics/{name}"
+    assert response.content == b""
+
+async def test_images_mount_serves_only_fingerprinted_files(client):
+    name = f"{'c' * 64}.jpg"
+    path = IMAGE_ROOT / "clinics" / name
+    path.write_bytes(b"\xff\xd8\xff")
+    try:
+        fingerprinted = await client.get(f"/images/clinics/{name}")
+    finally:
+        path.unlink()
+    assert fingerprinted.status_code == 200
+    assert fingerprinted.headers["cache-control"] == IMMUTABLE
+
+    # Tên tự đặt chỉ còn đi qua /api/v1/media, /public đã bỏ hẳn
+    legacy = next(path.name for path in (IMAGE_ROOT / "clinics").iterdir() if not path.stem.count("-"))
+    assert (await client.get(f"/images/clinics/{legacy}")).status_code == 404
+    # /public không còn là route public nên rơi vào middleware xác thực
+    assert (await client.get(f"/public/images/clinics/{legacy}")).status_code == 401
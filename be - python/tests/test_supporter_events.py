@@ -0,0 +1,161 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from uuid import uuid4
+import asyncpg
+import pytest
+from sqlalchemy import delete, select
+from app.core.availability import availability_index
+from app.core.booking_events import booking_events
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.pg_listener import pg_listener
+from app.core.principal import principal_cache
+from app.db.database import AsyncSessionLocal
+from app.main import app
+from app.models.patient import Patient
+from app.models.schedule import Schedule
+from app.models.user import User
+
+class EventStream:
+    """
+    Drives the ASGI app directly: httpx's ASGITransport buffers the whole
+    body, which never ends for an SSE stream.
+    """
+
+    def __init__(self, token: str) -> None:
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/v1/schedules/supporter/events",
+            "raw_path": b"/api/v1/schedules/supporter/events",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"test"), (b"authorization", f"Bearer {token}".encode())],
+            "client": ("127.0.0.1", 1234),
+            "server": ("test", 80),
+        }
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.status = None
+        self._requested = False
+        self._disconnected = asyncio.Event()
+        self._task = None
+
+    async def _receive(self) -> dict:
+        if not self._requested:
+            self._requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message.get("body"):
+            for block in message["body"].decode().split("\n\n"):
+                fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+                if "event" in fields:
+                    await self.events.put((fields["event"], json.loads(fields["data"])))
+
+    def open(self) -> None:
+        self._task = asyncio.create_task(app(self.scope, self._receive, self._send))
+
+    async def next(self, event_type: str) -> dict:
+        while True:
+            received_type, data = await asyncio.wait_for(self.events.get(), timeout=5)
+            if received_type == event_type:
+                return data
+
+    async def close(self) -> None:
+        self._disconnected.set()
+        await asyncio.wait_for(self._task, timeout=5)
+
+async def execute_elsewhere(sql: str, *args) -> None:
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(sql, *args)
+    finally:
+        await connection.close()
+
+@pytest.fixture
+async def schedule_id(db):
+    async with AsyncSessionLocal() as session:
+        doctor_id = (await session.execute(
+            select(User.id).where(User.email == "doctor2@hospital.com")
+        )).scalar_one()
+        start = datetime(2099, 6, 1, 8) + timedelta(hours=uuid4().int % 1000)
+        schedule = Schedule(
+            id=uuid4(), doctorId=doctor_id, startTime=start, endTime=start + timedelta(hours=1),
+            price=100000, maxBooking=3, sumBooking=0,
+        )
+        session.add(schedule)
+        await session.commit()
+    yield schedule.id
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Schedule).where(Schedule.id == schedule.id))
+        await session.execute(delete(Patient).where(Patient.email == "sse@example.com"))
+        await session.commit()
+
+@pytest.fixture
+async def supporter_token(client):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "supporter1@hospital.com", "password": "supporter123"},
+    )
+    return login.json()["data"]["access_token"]
+
+async def test_stream_follows_booking_lifecycle(client, supporter_token, schedule_id):
+    stream = EventStream(supporter_token)
+    stream.open()
+    pg_listener.start()
+    try:
+        # LISTEN vừa kết nối: client được báo tải lại danh sách
+        assert await stream.next("resync") == {"type": "resync"}
+        assert stream.status == 200
+        assert len(booking_events._subscribers) == 1
+
+        response = await client.post("/api/v1/patient", json={
+            "name": "SSE patient",
+            "email": "sse@example.com",
+            "phone": "0123456789",
+            "address": "1 Test Street",
+            "description": "",
+            "scheduleId": str(schedule_id),
+            "gender": "Female",
+        })
+        assert response.status_code == 201
+        created = await stream.next("booking_created")
+        patient_id = created["patientId"]
+        assert created == {
+            "type": "booking_created", "scheduleId": str(schedule_id), "patientId": patient_id, "status": "Pending",
+        }
+
+        await execute_elsewhere(
+            f'UPDATE "{settings.POSTGRES_SCHEMA}".patient_schedule SET status = \'Accept\' '
+            f'WHERE "scheduleId" = $1', schedule_id
+        )
+        assert await stream.next("status_changed") == {
+            "type": "status_changed", "scheduleId": str(schedule_id), "patientId": patient_id, "status": "Accept",
+        }
+
+        await execute_elsewhere(
+            f'DELETE FROM "{settings.POSTGRES_SCHEMA}".patient_schedule WHERE "scheduleId" = $1', schedule_id
+        )
+        assert await stream.next("booking_deleted") == {
+            "type": "booking_deleted", "scheduleId": str(schedule_id), "patientId": patient_id, "status": "Accept",
+        }
+
+        # Client ngắt kết nối: queue của nó bị gỡ khỏi hub
+        await stream.close()
+        assert booking_events._subscribers == set()
+    finally:
+        await pg_listener.stop()
+        catalog_cache.on_disconnect()
+        principal_cache.on_disconnect()
+        availability_index.on_disconnect()
+        if not stream._task.done():
+            await stream.close()
@@ -0,0 +1,123 @@
+from datetime import datetime
+from uuid import uuid4
+import pytest
+from sqlalchemy import delete, select
+from app.db.database import AsyncSessionLocal
+from app.models.patient import Patient
+from app.models.patient_schedule import PatientSchedule, Status
+from app.models.schedule import Schedule
+from app.models.user import Gender, User
+
+# (bác sĩ, giờ bắt đầu, [(tên bệnh nhân, trạng thái)]) — hai bác sĩ trùng giờ để thử thứ tự theo scheduleId
+BOOKINGS = [
+    (1, datetime(2098, 3, 1, 8), [("Queuetest An", Status.Pending), ("Queuetest Binh", Status.Accept)]),
+    (2, datetime(2098, 3, 1, 8), [("Queuetest Chi", Status.Pending), ("Queuetest Dung", Status.Done)]),
+    (1, datetime(2098, 3, 2, 9), [("Queuetest Giang", Status.Accept), ("Queuetest Ha", Status.Reject),
+                                  ("Queuetest Khoa", Status.Pending)]),
+    (2, datetime(2098, 3, 3, 10), [("Queuetest Lan", Status.Accept)]),
+]
+RANGE = {"dateFrom": "2098-03-01", "dateTo": "2098-03-03"}
+
+@pytest.fixture
+async def queue(db):
+    """Bookings of BOOKINGS in queue order: [(scheduleId, patientId, doctorId, name, status, phone)]"""
+    rows = []
+    async with AsyncSessionLocal() as session:
+        doctors = {
+            i: (await session.execute(select(User.id).where(User.email == f"doctor{i}@hospital.com"))).scalar_one()
+            for i in (1, 2)
+        }
+        for doctor, start, patients in BOOKINGS:
+            schedule = Schedule(
+                id=uuid4(), doctorId=doctors[doctor], startTime=start, endTime=start.replace(hour=start.hour + 1),
+                price=100000, maxBooking=5, sumBooking=len(patients),
+            )
+            session.add(schedule)
+            for n, (name, booking_status) in enumerate(patients):
+                patient = Patient(
+                    id=uuid4(), name=name, phone=f"09{len(rows)}{n}00000", email="queue@example.com",
+                    gender=Gender.Female, address="1 Test Street",
+                )
+                session.add(patient)
+                session.add(PatientSchedule(patientId=patient.id, scheduleId=schedule.id, status=booking_status))
+                rows.append((start, schedule.id, patient.id, doctors[doctor], name, booking_status, patient.phone))
+        await session.commit()
+
+    yield [row[1:] for row in sorted(rows, key=lambda row: row[:3])]
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(PatientSchedule).where(PatientSchedule.patientId.in_([row[2] for row in rows])))
+        await session.execute(delete(Patient).where(Patient.id.in_([row[2] for row in rows])))
+        await session.execute(delete(Schedule).where(Schedule.id.in_({row[1] for row in rows})))
+        await session.commit()
+
+@pytest.fixture
+async def supporter_headers(client):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "supporter1@hospital.com", "password": "supporter123"},
+    )
+    return {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+
+async def fetch(client, headers, **params) -> dict:
+    response = await client.get("/api/v1/schedules/supporter/queue", headers=headers, params={**RANGE, **params})
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+def keys(items) -> list:
+    return [(item["scheduleId"], item["patient"]["id"]) for item in items]
+
+def expected(queue, **match) -> list:
+    fields = ("scheduleId", "patientId", "doctorId", "name", "status", "phone")
+    return [
+        (str(row[0]), str(row[1])) for row in queue
+        if all(dict(zip(fields, row))[field] == value for field, value in match.items())
+    ]
+
+async def test_cursor_pages_have_no_duplicates_or_gaps(client, supporter_headers, queue):
+    for limit in (1, 2, 3):
+        seen, cursor = [], None
+        while True:
+            data = await fetch(client, supporter_headers, limit=limit, **({"cursor": cursor} if cursor else {}))
+            assert len(data["items"]) <= limit
+            seen += keys(data["items"])
+            cursor = data["nextCursor"]
+            if cursor is None:
+                break
+        assert seen == expected(queue)
+
+async def test_status_filter_keeps_counts(client, supporter_headers, queue):
+    data = await fetch(client, supporter_headers, status="Accept", limit=2)
+    accepted = expected(queue, status=Status.Accept)
+    assert keys(data["items"]) == accepted[:2]
+    rest = await fetch(client, supporter_headers, status="Accept", limit=2, cursor=data["nextCursor"])
+    assert keys(rest["items"]) == accepted[2:]
+    assert rest["nextCursor"] is None
+    # Số lượng theo trạng thái không bị filter status thu hẹp
+    assert data["counts"] == {"Pending": 3, "Accept": 3, "Reject": 1, "Done": 1}
+
+async def test_date_doctor_and_search_filters(client, supporter_headers, queue):
+    second_day = await fetch(client, supporter_headers, dateFrom="2098-03-02", dateTo="2098-03-02")
+    assert sorted(item["patient"]["name"] for item in second_day["items"]) == ["Queuetest Giang", "Queuetest Ha", "Queuetest Khoa"]
+    assert second_day["counts"] == {"Pending": 1, "Accept": 1, "Reject": 1, "Done": 0}
+
+    doctor_id = next(row[2] for row in queue if row[3] == "Queuetest An")
+    by_doctor = await fetch(client, supporter_headers, doctorId=str(doctor_id))
+    assert keys(by_doctor["items"]) == expected(queue, doctorId=doctor_id)
+
+    by_name = await fetch(client, supporter_headers, q="queuetest g")
+    assert [item["patient"]["name"] for item in by_name["items"]] == ["Queuetest Giang"]
+
+    phone = next(row[5] for row in queue if row[3] == "Queuetest Lan")
+    by_phone = await fetch(client, supporter_headers, q=phone[:4])
+    assert "Queuetest Lan" in [item["patient"]["name"] for item in by_phone["items"]]
+    assert all(item["patient"]["phone"].startswith(phone[:4]) for item in by_phone["items"])
+
+    # Ký tự LIKE trong q được escape
+    assert (await fetch(client, supporter_headers, q="queuetest%"))["items"] == []
+
+async def test_bad_cursor_is_400(client, supporter_headers, queue):
+    response = await client.get(
+        "/api/v1/schedules/supporter/queue", headers=supporter_headers, params={**RANGE, "cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
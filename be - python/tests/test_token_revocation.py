@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.token_revocation import TokenRevocationList, _timestamp
+
+class FakeSession:
+    def add(self, row) -> None:
+        self.row = row
+
+def test_token_issued_in_the_same_second_is_revoked():
+    revocations = TokenRevocationList()
+    user_id = str(uuid4())
+    issued_at = _timestamp(datetime.utcnow())
+
+    not_before = revocations.revoke(FakeSession(), user_id)
+    # Chưa commit: token vẫn hợp lệ
+    assert not revocations.is_revoked(user_id, issued_at)
+    revocations.apply(user_id, not_before)
+
+    assert not_before.microsecond == 0
+    assert revocations.is_revoked(user_id, issued_at)
+    assert not revocations.is_revoked(user_id, _timestamp(not_before))
+    assert revocations.is_revoked(user_id, _timestamp(not_before - timedelta(seconds=1)))
+
+async def test_change_password_returns_a_working_token(client):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "supporter10@hospital.com", "password": "supporter123"},
+    )
+    old_token = login.json()["data"]["access_token"]
+
+    changed = await client.post(
+        "/api/v1/auth/change-password",
+        json={"oldPassword": "supporter123", "newPassword": "supporter456"},
+        headers={"Authorization": f"Bearer {old_token}"},
+    )
+    assert changed.status_code == 200
+    new_token = changed.json()["data"]["access_token"]
+
+    old = await client.get("/api/v1/auth/account", headers={"Authorization": f"Bearer {old_token}"})
+    assert old.status_code == 401
+    new = await client.get("/api/v1/auth/account", headers={"Authorization": f"Bearer {new_token}"})
+    assert new.status_code == 200
+    assert new.json()["data"]["email"] == "supporter10@hospital.com"
+
+async def test_failed_commit_revokes_nothing(client, monkeypatch):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "supporter9@hospital.com", "password": "supporter123"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+
+    async def failing_commit(self):
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+    changed = await client.post(
+        "/api/v1/auth/change-password",
+        json={"oldPassword": "supporter123", "newPassword": "supporter456"},
+        headers=headers,
+    )
+    monkeypatch.undo()
+    assert changed.status_code == 500
+
+    # Mật khẩu không đổi nên token đang dùng vẫn phải được chấp nhận
+    account = await client.get("/api/v1/auth/account", headers=headers)
+    assert account.status_code == 200
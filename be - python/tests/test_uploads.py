@@ -0,0 +1,135 @@
+import io
+import pytest
+from sqlalchemy import delete
+from app.core.config import settings
+from app.core.images import IMAGE_ROOT
+from app.db.database import AsyncSessionLocal
+from app.models.image_blob import ImageBlob
+
+Image = pytest.importorskip("PIL.Image")
+
+BOUNDARY = "upload-test-boundary"
+
+@pytest.fixture
+async def admin_headers(client):
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "adminpassword"},
+    )
+    return {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+
+@pytest.fixture
+def stored():
+    """File names written under IMAGE_ROOT/clinics by a test, removed with their variants and blob rows"""
+    names = []
+    yield names
+    for name in names:
+        for path in (IMAGE_ROOT / "clinics").glob(f"{name.rsplit('.', 1)[0]}*"):
+            path.unlink()
+
+async def forget_blobs(names) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(ImageBlob).where(ImageBlob.directory == "clinics", ImageBlob.name.in_(names)))
+        await session.commit()
+
+def image_bytes(fmt: str, color: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, fmt)
+    return buffer.getvalue()
+
+def temp_files() -> set:
+    return set((IMAGE_ROOT / "clinics").glob(".upload-*"))
+
+@pytest.mark.parametrize("fmt, extension", [("PNG", ".png"), ("JPEG", ".jpg")])
+async def test_valid_images_are_stored_by_hash(client, admin_headers, stored, fmt, extension):
+    content = image_bytes(fmt, "navy" if fmt == "PNG" else "olive")
+    response = await client.post(
+        "/api/v1/clinic/image",
+        headers=admin_headers,
+        # Tên và Content-Type của client không quyết định phần mở rộng
+        files={"clinicImage": ("photo.bin", content, "application/octet-stream")},
+    )
+    assert response.status_code == 200, response.text
+    name = response.json()["data"]
+    stored.append(name)
+    try:
+        assert name.endswith(extension) and len(name) == 64 + len(extension)
+        assert (IMAGE_ROOT / "clinics" / name).read_bytes() == content
+    finally:
+        await forget_blobs([name])
+
+async def test_spoofed_extension_is_rejected(client, admin_headers):
+    before = set((IMAGE_ROOT / "clinics").iterdir())
+    response = await client.post(
+        "/api/v1/clinic/image",
+        headers=admin_headers,
+        files={"clinicImage": ("avatar.png", b"<?php echo 'not an image'; ?>" * 10, "image/png")},
+    )
+    assert response.status_code == 400
+    assert "File type not allowed" in response.json()["message"]
+    assert set((IMAGE_ROOT / "clinics").iterdir()) == before
+
+def multipart_head() -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="clinicImage"; filename="big.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + b"\x89PNG\r\n\x1a\n"
+
+async def test_oversized_content_length_is_413_unread(client, admin_headers):
+    sent = []
+
+    async def body():
+        sent.append(1)
+        yield multipart_head()
+        while True:
+            sent.append(1)
+            yield b"\0" * 65536
+
+    size = settings.UPLOAD_MAX_BYTES * 4
+    response = await client.post(
+        "/api/v1/clinic/image",
+        headers={
+            **admin_headers,
+            "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+            "Content-Length": str(size),
+        },
+        content=body(),
+    )
+    assert response.status_code == 413
+    assert response.json()["error"] == "Payload Too Large"
+    # Bị từ chối chỉ từ header, body không được đọc
+    assert sent == []
+
+async def test_oversized_chunked_body_is_cut_off_with_413(client, admin_headers):
+    sent = 0
+    chunk = b"\0" * 65536
+
+    async def body():
+        nonlocal sent
+        yield multipart_head()
+        while sent < settings.UPLOAD_MAX_BYTES * 4:
+            sent += len(chunk)
+            yield chunk
+
+    before = temp_files()
+    response = await client.post(
+        "/api/v1/clinic/image",
+        headers={**admin_headers, "Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        content=body(),
+    )
+    assert response.status_code == 413
+    # Dừng đọc ngay khi vượt giới hạn, không đợi hết body
+    assert sent <= settings.UPLOAD_MAX_BYTES + settings.UPLOAD_MULTIPART_OVERHEAD_BYTES + len(chunk)
+    assert temp_files() == before
+
+async def test_file_over_the_limit_inside_the_allowance_is_413(client, admin_headers):
+    content = b"\x89PNG\r\n\x1a\n" + b"\0" * settings.UPLOAD_MAX_BYTES
+    before = temp_files()
+    response = await client.post(
+        "/api/v1/clinic/image",
+        headers=admin_headers,
+        files={"clinicImage": ("big.png", content, "image/png")},
+    )
+    assert response.status_code == 413
+    assert temp_files() == before
@@ -19,6 +19,7 @@ import { doLogoutAction, doUpdateInfoAction } from '../../redux/account/accountS
 import { callUploadAvt, changePassword } from '../../services/apiUser/apiInfo';
 import { toast } from 'react-toastify';
 import { callLogout } from '../../services/apiUser/apiAuth';
+import { imageUrl } from '../../utils/imageUrl';
 
 const drawerWidth = 280;
 
@@ -191,6 +192,10 @@ const LayoutManagement = () => {
         try {
             const res = await changePassword(oldPassword, newPassword);
             if (res && res.statusCode === 200) {
+                // Token cũ đã bị thu hồi khi đổi mật khẩu, dùng token mới server trả về
+                if (res.data?.access_token) {
+                    localStorage.setItem('access_token', res.data.access_token);
+                }
                 toast.success('Đổi mật khẩu thành công');
                 setOpenPasswordDialog(false);
                 // Reset form
@@ -306,7 +311,7 @@ const LayoutManagement = () => {
                         >
                             {avatar ? (
                                 <Avatar
-                                    src={`${import.meta.env.VITE_BACKEND_URL}/images/users/${avatar}`}
+                                    src={imageUrl('users', avatar, 'thumb')}
                                     alt={user?.name}
                                     sx={{
                                         width: '100%',
@@ -453,7 +458,7 @@ const LayoutManagement = () => {
                             >
                                 {((previewAvatar !== '') || avatar !== '') ? (
                                     <Avatar
-                                        src={previewAvatar || `${import.meta.env.VITE_BACKEND_URL}/images/users/${avatar}`}
+                                        src={previewAvatar || imageUrl('users', avatar, 'card')}
                                         alt={editedName}
                                         sx={{ width: '100%', height: '100%' }}
                                     />
@@ -0,0 +1,50 @@
+import { Box, Chip, Typography } from "@mui/material";
+import EventAvailableIcon from '@mui/icons-material/EventAvailable';
+
+interface Slot {
+    id: string;
+    startTime: string;
+    endTime: string;
+}
+
+const formatSlot = (dateTime: string) => {
+    const date = new Date(dateTime);
+    return date.toLocaleString('vi-VN', {
+        weekday: 'short',
+        day: '2-digit',
+        month: '2-digit',
+        hour: '2-digit',
+        minute: '2-digit',
+        hour12: false
+    });
+};
+
+// Các lịch trống sớm nhất của một bác sĩ (dữ liệu từ callAvailability)
+const NextSlots = ({ slots }: { slots?: Slot[] }) => {
+    if (!slots) {
+        return null;
+    }
+
+    return (
+        <Box sx={{ display: 'flex', alignItems: 'center', gap: 1, flexWrap: 'wrap', mt: 1.5 }}>
+            <EventAvailableIcon sx={{ color: 'primary.main' }} />
+            {slots.length > 0 ? (
+                slots.map((slot) => (
+                    <Chip
+                        key={slot.id}
+                        size="small"
+                        variant="outlined"
+                        color="primary"
+                        label={formatSlot(slot.startTime)}
+                    />
+                ))
+            ) : (
+                <Typography sx={{ color: 'text.secondary', fontSize: '0.9rem' }}>
+                    Chưa có lịch trống
+                </Typography>
+            )}
+        </Box>
+    );
+};
+
+export default NextSlots;
@@ -4,6 +4,7 @@ import ServiceCard from "../../components/card/ServiceCard";
 import { useNavigate } from "react-router-dom";
 import Skeleton from '@mui/material/Skeleton';
 import { callAllClinics } from "../../services/apiPatient/apiHome";
+import { imageUrl } from "../../utils/imageUrl";
 const Clinic = () => {
     const [clinics, setClinics] = useState<any[]>([]);
     const navigate = useNavigate();
@@ -93,7 +94,7 @@ const Clinic = () => {
                     clinics?.map((clinic) => (
                         <Grid item xs={12} sm={6} md={4} lg={3} key={`clinic-${clinic.id}`}>
                             <ServiceCard
-                                image={`${import.meta.env.VITE_BACKEND_URL}/images/clinics/${clinic.image}`}
+                                image={imageUrl('clinics', clinic.image, 'card')}
                                 title={clinic.name}
                                 onClick={() => handleClinicClick(clinic.id)}
                             />
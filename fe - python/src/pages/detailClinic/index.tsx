@@ -3,10 +3,12 @@ import { useParams, useNavigate } from "react-router-dom";
 import { Container, Typography, Box, Grid, Paper, Button } from "@mui/material";
 import ArrowBackIcon from '@mui/icons-material/ArrowBack';
 import Skeleton from '@mui/material/Skeleton';
-import { callDoctorByClinicId } from "../../services/apiPatient/apiHome";
+import { callAvailability, callDoctorByClinicId } from "../../services/apiPatient/apiHome";
+import NextSlots from "../../components/nextSlots";
 import LocationOnIcon from '@mui/icons-material/LocationOn';
 import LocalHospitalIcon from '@mui/icons-material/LocalHospital';
 import { alpha } from '@mui/material/styles';
+import { imageUrl } from '../../utils/imageUrl';
 
 const DetailClinic = () => {
     const { id } = useParams();
@@ -14,6 +16,7 @@ const DetailClinic = () => {
     const [clinic, setClinic] = useState<any | null>(null);
     const [loading, setLoading] = useState(true);
     const [doctors, setDoctors] = useState<any[]>([]);
+    const [availability, setAvailability] = useState<Record<string, any[]>>({});
 
     const fetchDetailClinic = async () => {
         setLoading(true);
@@ -23,6 +26,14 @@ const DetailClinic = () => {
             setDoctors(res.data);
         }
         setLoading(false);
+
+        // Một request cho lịch trống của mọi bác sĩ trong phòng khám
+        if (res && res.data && res.data.length) {
+            const slots = await callAvailability(res.data.map((item: any) => item.doctor.id), 3);
+            if (slots && slots.data) {
+                setAvailability(slots.data);
+            }
+        }
     }
 
     useEffect(() => {
@@ -225,7 +236,7 @@ const DetailClinic = () => {
                                         }}
                                     >
                                         <img
-                                            src={`${import.meta.env.VITE_BACKEND_URL}/images/clinics/${clinic.image}`}
+                                            src={imageUrl('clinics', clinic.image, 'large')}
                                             alt={clinic.name}
                                             style={{
                                                 width: '100%',
@@ -368,7 +379,7 @@ const DetailClinic = () => {
                                                     }}
                                                 >
                                                     <img
-                                                        src={`${import.meta.env.VITE_BACKEND_URL}/images/users/${item.doctor.avatar}`}
+                                                        src={imageUrl('users', item.doctor.avatar, 'card')}
                                                         alt={item.doctor.name}
                                                         style={{
                                                             width: '100%',
@@ -395,6 +406,7 @@ const DetailClinic = () => {
                                                 >
                                                     {item.specialization.name}
                                                 </Typography>
+                                                <NextSlots slots={availability[item.doctor.id]} />
                                             </Paper>
                                         </Grid>
                                     ))}
@@ -5,6 +5,7 @@ import ArrowBackIcon from '@mui/icons-material/ArrowBack';
 import { useNavigate, useParams } from "react-router-dom";
 import { callCreateSchedule, callDoctorById, callSchedulesByDoctorId } from "../../services/apiPatient/apiHome";
 import { toast } from "react-toastify";
+import { imageUrl } from "../../utils/imageUrl";
 
 // Schedule type
 interface Schedule {
@@ -532,7 +533,7 @@ const DetailDoctor = () => {
                                 }}>
                                     <Box
                                         component="img"
-                                        src={`${import.meta.env.VITE_BACKEND_URL}/images/users/${doctor.avatar}`}
+                                        src={imageUrl('users', doctor.avatar, 'card')}
                                         alt={doctor.name}
                                         sx={{
                                             width: 120,
@@ -5,13 +5,16 @@ import LocationOnIcon from '@mui/icons-material/LocationOn';
 import PhoneIcon from '@mui/icons-material/Phone';
 import MedicalServicesIcon from '@mui/icons-material/MedicalServices';
 import ArrowBackIcon from '@mui/icons-material/ArrowBack';
-import { callDoctorBySpecialty } from "../../services/apiPatient/apiHome";
+import { callAvailability, callDoctorBySpecialty } from "../../services/apiPatient/apiHome";
+import NextSlots from "../../components/nextSlots";
+import { imageUrl } from '../../utils/imageUrl';
 
 const DetailSpecialty = () => {
     const navigate = useNavigate();
     const [loading, setLoading] = useState(true);
     const [doctors, setDoctors] = useState<any[]>([]);
     const [specialty, setSpecialty] = useState<any>(null);
+    const [availability, setAvailability] = useState<Record<string, any[]>>({});
     const { id } = useParams();
 
 
@@ -22,6 +25,12 @@ const DetailSpecialty = () => {
         setDoctors(res.data);
         setSpecialty(res.data[0].specialization.name);
         setLoading(false);
+
+        // Một request cho lịch trống của mọi bác sĩ trong trang
+        const slots = await callAvailability(res.data.map((item: any) => item.doctor.id), 3);
+        if (slots && slots.data) {
+            setAvailability(slots.data);
+        }
     }
 
     useEffect(() => {
@@ -164,7 +173,7 @@ const DetailSpecialty = () => {
                                 >
                                     <Box sx={{ display: 'flex', gap: 3, flexWrap: { xs: 'wrap', md: 'nowrap' } }}>
                                         <Avatar
-                                            src={`${import.meta.env.VITE_BACKEND_URL}/images/users/${item.doctor.avatar}`}
+                                            src={imageUrl('users', item.doctor.avatar, 'thumb')}
                                             sx={{
                                                 width: { xs: 100, md: 160 },
                                                 height: { xs: 100, md: 160 },
@@ -185,6 +194,7 @@ const DetailSpecialty = () => {
                                                 <PhoneIcon />
                                                 <Typography>{item.doctor.phone}</Typography>
                                             </Box>
+                                            <NextSlots slots={availability[item.doctor.id]} />
                                         </Box>
                                     </Box>
                                 </Card>
@@ -2,6 +2,7 @@ import { useEffect, useState } from "react";
 import { Container, Card, Typography, Grid, Skeleton, Box, Chip } from "@mui/material";
 import { useNavigate } from "react-router-dom";
 import { callAllDoctors } from "../../services/apiPatient/apiHome";
+import { imageUrl } from "../../utils/imageUrl";
 
 
 const Doctor = () => {
@@ -99,7 +100,7 @@ const Doctor = () => {
                                     <Box sx={{ display: 'flex', gap: 3 }}>
                                         <Box
                                             component="img"
-                                            src={`${import.meta.env.VITE_BACKEND_URL}/images/users/${doctor.avatar}`}
+                                            src={imageUrl('users', doctor.avatar, 'card')}
                                             sx={{
                                                 width: 120,
                                                 height: 120,
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { callCreateSchedule, callDeleteSchedule, callDoctorSchedule, callUpdateSchedule } from "../../services/apiDoctor/apiManage";
+import { callCreateSchedule, callCreateScheduleTemplate, callDeleteSchedule, callDoctorSchedule, callUpdateSchedule } from "../../services/apiDoctor/apiManage";
 import {
     Paper,
     Table,
@@ -21,6 +21,8 @@ import {
     TextField,
     DialogActions,
     InputAdornment,
+    FormControlLabel,
+    Checkbox,
 } from "@mui/material";
 import {
     AccessTime,
@@ -37,6 +39,7 @@ import {
     Delete as DeleteIcon,
     CloudUpload as CloudUploadIcon,
     CloudDownload as CloudDownloadIcon,
+    EventRepeat as EventRepeatIcon,
 } from '@mui/icons-material';
 import { toast } from 'react-toastify';
 import * as XLSX from 'xlsx';
@@ -67,6 +70,17 @@ interface Patient {
     description: string;
 }
 
+// 1 = Thứ hai ... 7 = Chủ nhật (theo backend)
+const TEMPLATE_WEEKDAYS = [
+    { value: 1, label: 'T2' },
+    { value: 2, label: 'T3' },
+    { value: 3, label: 'T4' },
+    { value: 4, label: 'T5' },
+    { value: 5, label: 'T6' },
+    { value: 6, label: 'T7' },
+    { value: 7, label: 'CN' },
+];
+
 interface GroupedSchedules {
     [date: string]: DoctorSchedule[];
 }
@@ -82,6 +96,18 @@ const DoctorPatient = () => {
     const [openScheduleDialog, setOpenScheduleDialog] = useState(false);
     const [dialogMode, setDialogMode] = useState<'add' | 'edit'>('add');
     const [selectedSchedule, setSelectedSchedule] = useState<DoctorSchedule | null>(null);
+    const [openTemplateDialog, setOpenTemplateDialog] = useState(false);
+    const [templateForm, setTemplateForm] = useState({
+        dateFrom: moment().format('YYYY-MM-DD'),
+        dateTo: moment().add(1, 'month').format('YYYY-MM-DD'),
+        weekdays: [1, 2, 3, 4, 5],
+        startTime: '08:00',
+        endTime: '17:00',
+        slotMinutes: 30,
+        price: 0,
+        maxBooking: 1,
+        skipConflicts: false,
+    });
     const [scheduleForm, setScheduleForm] = useState({
         startTime: new Date(),
         endTime: new Date(),
@@ -318,6 +344,39 @@ const DoctorPatient = () => {
         }
     };
 
+    const toggleTemplateWeekday = (day: number) => {
+        setTemplateForm(prev => ({
+            ...prev,
+            weekdays: prev.weekdays.includes(day)
+                ? prev.weekdays.filter(d => d !== day)
+                : [...prev.weekdays, day].sort()
+        }));
+    };
+
+    // Tạo lịch định kỳ: backend sinh toàn bộ lịch khám và kiểm tra trùng trong một request
+    const handleSubmitTemplate = async () => {
+        if (templateForm.weekdays.length === 0) {
+            toast.error('Chọn ít nhất một ngày trong tuần');
+            return;
+        }
+        if (templateForm.price <= 0) {
+            toast.error('Giá khám phải lớn hơn 0');
+            return;
+        }
+
+        const res = await callCreateScheduleTemplate(templateForm);
+        if (res && res.statusCode === 201) {
+            const skipped = res.data.conflicts.length;
+            toast.success(`Đã tạo ${res.data.created} lịch khám` + (skipped ? `, bỏ qua ${skipped} lịch bị trùng` : ''));
+            setOpenTemplateDialog(false);
+            fetchData();
+        } else if (res && res.statusCode === 409) {
+            toast.error(`${res.message} (${res.errors.length} lịch). Chọn "Bỏ qua lịch bị trùng" để tạo các lịch còn lại`);
+        } else {
+            toast.error(res?.message || 'Có lỗi xảy ra');
+        }
+    };
+
     // Kiểm tra xem lịch có thể chỉnh sửa không
     const canEditSchedule = (schedule: DoctorSchedule) => {
         return schedule.Patient_Schedule.length === 0;
@@ -526,6 +585,14 @@ const DoctorPatient = () => {
                         onChange={handleFileUpload}
                     />
                 </Button>
+                <Button
+                    variant="outlined"
+                    startIcon={<EventRepeatIcon />}
+                    onClick={() => setOpenTemplateDialog(true)}
+                    sx={{ borderRadius: 2 }}
+                >
+                    Tạo lịch định kỳ
+                </Button>
                 <Button
                     variant="contained"
                     startIcon={<AddIcon />}
@@ -855,6 +922,129 @@ const DoctorPatient = () => {
                 </DialogActions>
             </Dialog>
 
+            {/* Recurring Schedule Template Dialog */}
+            <Dialog
+                open={openTemplateDialog}
+                onClose={() => setOpenTemplateDialog(false)}
+                maxWidth="sm"
+                fullWidth
+            >
+                <DialogTitle>Tạo lịch khám định kỳ</DialogTitle>
+                <DialogContent sx={{ p: 3, mt: 1 }}>
+                    <Box sx={{ display: 'flex', flexDirection: 'column', gap: 3, pt: 1 }}>
+                        <Box sx={{ display: 'flex', gap: 2 }}>
+                            <TextField
+                                label="Từ ngày"
+                                type="date"
+                                value={templateForm.dateFrom}
+                                onChange={(e) => setTemplateForm(prev => ({ ...prev, dateFrom: e.target.value }))}
+                                InputLabelProps={{ shrink: true }}
+                                inputProps={{ min: formatDateForInput(new Date()) }}
+                                fullWidth
+                            />
+                            <TextField
+                                label="Đến ngày"
+                                type="date"
+                                value={templateForm.dateTo}
+                                onChange={(e) => setTemplateForm(prev => ({ ...prev, dateTo: e.target.value }))}
+                                InputLabelProps={{ shrink: true }}
+                                inputProps={{ min: templateForm.dateFrom }}
+                                fullWidth
+                            />
+                        </Box>
+
+                        <Box sx={{ display: 'flex', gap: 1, flexWrap: 'wrap' }}>
+                            {TEMPLATE_WEEKDAYS.map((day) => (
+                                <Chip
+                                    key={day.value}
+                                    label={day.label}
+                                    color={templateForm.weekdays.includes(day.value) ? 'primary' : 'default'}
+                                    variant={templateForm.weekdays.includes(day.value) ? 'filled' : 'outlined'}
+                                    onClick={() => toggleTemplateWeekday(day.value)}
+                                />
+                            ))}
+                        </Box>
+
+                        <Box sx={{ display: 'flex', gap: 2 }}>
+                            <TextField
+                                label="Giờ bắt đầu"
+                                type="time"
+                                value={templateForm.startTime}
+                                onChange={(e) => setTemplateForm(prev => ({ ...prev, startTime: e.target.value }))}
+                                InputLabelProps={{ shrink: true }}
+                                fullWidth
+                            />
+                            <TextField
+                                label="Giờ kết thúc"
+                                type="time"
+                                value={templateForm.endTime}
+                                onChange={(e) => setTemplateForm(prev => ({ ...prev, endTime: e.target.value }))}
+                                InputLabelProps={{ shrink: true }}
+                                fullWidth
+                            />
+                        </Box>
+
+                        <TextField
+                            label="Thời lượng mỗi lịch"
+                            type="number"
+                            value={templateForm.slotMinutes}
+                            onChange={(e) => setTemplateForm(prev => ({ ...prev, slotMinutes: Math.max(5, Number(e.target.value)) }))}
+                            InputProps={{
+                                endAdornment: <InputAdornment position="end">phút</InputAdornment>,
+                            }}
+                            inputProps={{ min: 5, step: 5 }}
+                            fullWidth
+                        />
+
+                        <TextField
+                            label="Giá khám"
+                            type="text"
+                            value={templateForm.price === 0 ? '' : templateForm.price}
+                            onChange={(e) => {
+                                const value = e.target.value.replace(/[^0-9]/g, '');
+                                setTemplateForm(prev => ({ ...prev, price: value === '' ? 0 : Number(value) }));
+                            }}
+                            InputProps={{
+                                startAdornment: <InputAdornment position="start">VNĐ</InputAdornment>,
+                            }}
+                            inputProps={{ style: { textAlign: 'right' } }}
+                            fullWidth
+                        />
+
+                        <TextField
+                            label="Số lượng bệnh nhân tối đa"
+                            type="number"
+                            value={templateForm.maxBooking}
+                            onChange={(e) => setTemplateForm(prev => ({ ...prev, maxBooking: Math.max(1, Number(e.target.value)) }))}
+                            inputProps={{ min: 1 }}
+                            fullWidth
+                        />
+
+                        <FormControlLabel
+                            control={
+                                <Checkbox
+                                    checked={templateForm.skipConflicts}
+                                    onChange={(e) => setTemplateForm(prev => ({ ...prev, skipConflicts: e.target.checked }))}
+                                />
+                            }
+                            label="Bỏ qua lịch bị trùng"
+                        />
+                    </Box>
+                </DialogContent>
+                <DialogActions sx={{ p: 2.5, gap: 1 }}>
+                    <Button onClick={() => setOpenTemplateDialog(false)} color="inherit">
+                        Hủy
+                    </Button>
+                    <Button
+                        variant="contained"
+                        onClick={handleSubmitTemplate}
+                        sx={{ bgcolor: 'success.main', '&:hover': { bgcolor: 'success.dark' } }}
+                    >
+                        Tạo lịch
+                    </Button>
+                </DialogActions>
+            </Dialog>
+
             {/* Patient Detail Dialog */}
             <Dialog
                 open={openDialog}
@@ -9,7 +9,8 @@ import AccessTimeIcon from '@mui/icons-material/AccessTime';
 import ResponsiveSlider from "../../components/slider";
 import { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
-import { callAllClinics, callAllDoctors, callAllSpecialities } from "../../services/apiPatient/apiHome";
+import { callHome } from "../../services/apiPatient/apiHome";
+import { imageUrl } from "../../utils/imageUrl";
 
 
 const Home = () => {
@@ -23,13 +24,11 @@ const Home = () => {
 
     const fetchData = async () => {
         setLoading(true);
-        const res_specialities = await callAllSpecialities();
-        const res_clinics = await callAllClinics();
-        const res_doctors = await callAllDoctors();
-        if (res_specialities?.data || res_clinics?.data || res_doctors?.data) {
-            setSpecialities(res_specialities.data);
-            setClinics(res_clinics.data);
-            setDoctors(res_doctors.data);
+        const res = await callHome();
+        if (res?.data) {
+            setSpecialities(res.data.specialties);
+            setClinics(res.data.clinics);
+            setDoctors(res.data.doctors);
         }
         setLoading(false);
     }
@@ -253,7 +252,7 @@ const Home = () => {
                                     >
                                         <Box
                                             component="img"
-                                            src={`${import.meta.env.VITE_BACKEND_URL}/images/specializations/${speciality.image}`}
+                                            src={imageUrl('specializations', speciality.image, 'card')}
                                             sx={{
                                                 height: { xs: 150, md: 200 },
                                                 width: '100%',
@@ -363,7 +362,7 @@ const Home = () => {
                                 >
                                     <Box
                                         component="img"
-                                        src={`${import.meta.env.VITE_BACKEND_URL}/images/clinics/${clinic.image}`}
+                                        src={imageUrl('clinics', clinic.image, 'card')}
                                         sx={{
                                             height: { xs: 150, md: 200 },
                                             width: '100%',
@@ -468,7 +467,7 @@ const Home = () => {
                                     >
                                         <Box
                                             component="img"
-                                            src={`${import.meta.env.VITE_BACKEND_URL}/images/users/${doctor.avatar}`}
+                                            src={imageUrl('users', doctor.avatar, 'card')}
                                             sx={{
                                                 height: { xs: 150, md: 200 },
                                                 width: { xs: 150, md: 200 },
@@ -31,6 +31,7 @@ import {
 import { toast } from 'react-toastify';
 import { callAllClinics } from '../../services/apiPatient/apiHome';
 import { callCreateClinic, callUploadImgClinic, callUpdateClinic, callDeleteClinic } from '../../services/apiAdmin';
+import { imageUrl } from '../../utils/imageUrl';
 
 // Interface Clinic     
 interface Clinic {
@@ -162,7 +163,7 @@ const ManageClinic = () => {
                 description: clinic.description,
                 image: clinic.image
             });
-            setPreviewImage(clinic.image ? `${import.meta.env.VITE_BACKEND_URL}/images/clinics/${clinic.image}` : '');
+            setPreviewImage(clinic.image ? imageUrl('clinics', clinic.image) : '');
         } else {
             setSelectedClinic(null);
             setFormData({
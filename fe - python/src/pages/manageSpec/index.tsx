@@ -32,6 +32,7 @@ import {
 import { toast } from 'react-toastify';
 import { callAllSpecialities } from '../../services/apiPatient/apiHome';
 import { callCreateSpecialty, callDeleteSpecialty, callUpdateSpecialty, callUploadImgSpecialty } from '../../services/apiAdmin';
+import { imageUrl } from '../../utils/imageUrl';
 
 // Định nghĩa interfaces
 interface Specialty {
@@ -137,7 +138,7 @@ const ManageSpec = () => {
             image: null
         });
         if (specialty.image) {
-            setPreviewImage(`${import.meta.env.VITE_BACKEND_URL}/images/specializations/${specialty.image}`);
+            setPreviewImage(imageUrl('specializations', specialty.image));
         } else {
             setPreviewImage('');
         }
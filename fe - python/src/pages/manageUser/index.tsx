@@ -151,6 +151,10 @@ const ManageUser = () => {
     const [page, setPage] = useState(0);
     const [rowsPerPage, setRowsPerPage] = useState(10);
     const [searchTerm, setSearchTerm] = useState('');
+    const [query, setQuery] = useState('');
+    // cursors[i] là cursor để tải trang i (phân trang keyset phía server)
+    const [cursors, setCursors] = useState<(string | null)[]>([null]);
+    const [total, setTotal] = useState(0);
     const [openDialog, setOpenDialog] = useState(false);
     const [selectedUser, setSelectedUser] = useState<User | null>(null);
     const [sortConfig, setSortConfig] = useState<SortConfig[]>([]);
@@ -179,12 +183,22 @@ const ManageUser = () => {
         { id: 'clinic', label: 'Phòng khám', sortable: true },
     ];
 
-    const fetchUsers = async () => {
+    const fetchUsers = async (targetPage: number = page) => {
         setLoading(true);
         try {
-            const res = await callGetAllUsers();
+            const res = await callGetAllUsers({
+                cursor: cursors[targetPage] ?? undefined,
+                limit: rowsPerPage,
+                q: query || undefined,
+            });
             if (res && res.data) {
-                setUsers(res.data);
+                setUsers(res.data.items);
+                setTotal(res.data.total);
+                setCursors(prev => {
+                    const next = prev.slice(0, targetPage + 1);
+                    next[targetPage + 1] = res.data.nextCursor;
+                    return next;
+                });
             } else {
                 toast.error('Không thể tải danh sách người dùng');
             }
@@ -196,8 +210,19 @@ const ManageUser = () => {
     };
 
     useEffect(() => {
-        fetchUsers();
-    }, []);
+        fetchUsers(page);
+    }, [page, rowsPerPage, query]);
+
+    // Chờ người dùng gõ xong rồi mới tìm kiếm phía server
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            if (searchTerm.trim() === query) return;
+            setQuery(searchTerm.trim());
+            setCursors([null]);
+            setPage(0);
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
 
     useEffect(() => {
         const fetchSpecializationsAndClinics = async () => {
@@ -223,17 +248,19 @@ const ManageUser = () => {
     }, []);
 
     const handleChangePage = (_: unknown, newPage: number) => {
+        // Chỉ đi tới trang đã biết cursor
+        if (newPage > page && !cursors[newPage]) return;
         setPage(newPage);
     };
 
     const handleChangeRowsPerPage = (event: React.ChangeEvent<HTMLInputElement>) => {
         setRowsPerPage(parseInt(event.target.value, 10));
+        setCursors([null]);
         setPage(0);
     };
 
     const handleSearch = (event: React.ChangeEvent<HTMLInputElement>) => {
         setSearchTerm(event.target.value);
-        setPage(0);
     };
 
     const handleEdit = (user: User) => {
@@ -267,13 +294,8 @@ const ManageUser = () => {
         }
     };
 
-    const filteredUsers = users.filter(user =>
-        Object.entries(user)
-            .filter(([key]) => ['name', 'email', 'phone', 'address'].includes(key))
-            .some(([_, value]) =>
-                value?.toString().toLowerCase().includes(searchTerm.toLowerCase())
-            )
-    );
+    // Tìm kiếm theo tên/email đã được lọc phía server
+    const filteredUsers = users;
 
 
     // Thay đổi hàm sortData
@@ -596,7 +618,7 @@ const ManageUser = () => {
                     <Button
                         variant="outlined"
                         startIcon={<Refresh />}
-                        onClick={fetchUsers}
+                        onClick={() => fetchUsers()}
                         sx={{
                             borderColor: 'primary.main',
                             color: 'primary.main',
@@ -652,7 +674,7 @@ const ManageUser = () => {
                     flexWrap: 'wrap'
                 }}>
                     <TextField
-                        placeholder="Tìm kiếm người dùng..."
+                        placeholder="Tìm theo tên hoặc email..."
                         variant="outlined"
                         size="small"
                         fullWidth
@@ -731,7 +753,6 @@ const ManageUser = () => {
                                 </TableRow>
                             ) : (
                                 sortedUsers
-                                    .slice(page * rowsPerPage, page * rowsPerPage + rowsPerPage)
                                     .map((user) => (
                                         <TableRow
                                             key={user.id}
@@ -774,7 +795,9 @@ const ManageUser = () => {
 
                 <TablePagination
                     component="div"
-                    count={sortedUsers.length}
+                    count={cursors[page + 1]
+                        ? Math.max(total, (page + 2) * rowsPerPage)
+                        : page * rowsPerPage + users.length}
                     page={page}
                     onPageChange={handleChangePage}
                     rowsPerPage={rowsPerPage}
@@ -3,6 +3,7 @@ import { Grid, Container, Typography, Box, Fade } from "@mui/material";
 import { useNavigate } from "react-router-dom";
 import ServiceCard from "../../components/card/ServiceCard";
 import { callAllSpecialities } from "../../services/apiPatient/apiHome";
+import { imageUrl } from "../../utils/imageUrl";
 
 
 const Specialty = () => {
@@ -99,7 +100,7 @@ const Specialty = () => {
                         specialities?.map((speciality: any, index: any) => (
                             <Grid item xs={12} sm={6} md={4} lg={3} key={`spec-${index}`}>
                                 <ServiceCard
-                                    image={`${import.meta.env.VITE_BACKEND_URL}/images/specializations/${speciality.image}`}
+                                    image={imageUrl('specializations', speciality.image, 'card')}
                                     title={speciality.name}
                                     onClick={() => navigate(`/specialty/${speciality.id}`)}
                                 />
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect } from 'react';
 import {
     Box,
     Typography,
@@ -29,23 +29,15 @@ import {
     Delete as DeleteIcon,
 } from '@mui/icons-material';
 import { toast } from 'react-toastify';
-import { callDeleteAppointment, callGetPatientForSupporter, callUpdateAppointmentStatus, } from '../../services/apiSupporter/apiManage';
-
-
-// Interface data
-interface Data {
-    Accept:
-    {
-        patients: AppointmentData[]
-    }
-    Pending:
-    {
-        patients: AppointmentData[]
-    }
-    Reject:
-    {
-        patients: AppointmentData[]
-    }
+import { callDeleteAppointment, callGetSupporterQueue, callUpdateAppointmentStatus, subscribeSupporterEvents, } from '../../services/apiSupporter/apiManage';
+
+
+// Số lượng lịch hẹn theo trạng thái (server đếm)
+interface QueueCounts {
+    Pending: number;
+    Accept: number;
+    Reject: number;
+    Done: number;
 }
 
 interface Patient {
@@ -72,10 +64,29 @@ interface AppointmentData {
     status?: 'pending' | 'confirmed' | 'cancelled';
 }
 
+// Trạng thái trên giao diện <-> trạng thái ở server
+const STATUS_TO_SERVER: Record<string, string> = {
+    pending: 'Pending',
+    confirmed: 'Accept',
+    cancelled: 'Reject',
+};
+
+const STATUS_FROM_SERVER: Record<string, AppointmentData['status']> = {
+    Pending: 'pending',
+    Accept: 'confirmed',
+    Reject: 'cancelled',
+};
+
 
 
 const Supporter = () => {
-    const [data, setData] = useState<Data>();
+    const [appointments, setAppointments] = useState<AppointmentData[]>([]);
+    const [counts, setCounts] = useState<QueueCounts>({ Pending: 0, Accept: 0, Reject: 0, Done: 0 });
+    // cursors[i] là cursor để tải trang i (phân trang keyset phía server)
+    const [cursors, setCursors] = useState<(string | null)[]>([null]);
+    const [query, setQuery] = useState('');
+    // Tăng khi có event từ server để tải lại trang hiện tại
+    const [refreshKey, setRefreshKey] = useState(0);
     const [loading, setLoading] = useState(true);
     const [page, setPage] = useState(0);
     const [rowsPerPage, setRowsPerPage] = useState(10);
@@ -97,37 +108,6 @@ const Supporter = () => {
         { id: 'status', label: 'Trạng thái', sortable: true },
     ];
 
-    // Transform data to display
-    const transformAppointments = useCallback(() => {
-        if (!data) return [];
-        try {
-            const pendingAppointments = data.Pending?.patients?.map(item => ({
-                ...item,
-                status: 'pending' as const
-            })) || [];
-
-            const acceptedAppointments = data.Accept?.patients?.map(item => ({
-                ...item,
-                status: 'confirmed' as const
-            })) || [];
-
-            const rejectedAppointments = data.Reject?.patients?.map(item => ({
-                ...item,
-                status: 'cancelled' as const
-            })) || [];
-
-            const allAppointments = [
-                ...pendingAppointments,
-                ...acceptedAppointments,
-                ...rejectedAppointments
-            ];
-
-            return allAppointments;
-        } catch (error) {
-            return [];
-        }
-    }, [data]);
-
     // Render table rows
     const renderTableRows = () => {
         if (loading) {
@@ -140,34 +120,7 @@ const Supporter = () => {
             );
         }
 
-        // Get appointments list by status
-        let appointments = [];
-        if (selectedStatus === 'pending') {
-            appointments = data?.Pending?.patients || [];
-        } else if (selectedStatus === 'confirmed') {
-            appointments = data?.Accept?.patients || [];
-        } else if (selectedStatus === 'cancelled') {
-            appointments = data?.Reject?.patients || [];
-        } else {
-            // If no status is selected, display all
-            appointments = transformAppointments();
-        }
-
-        // Filter by search term
-        const filteredAppointments = appointments.filter(appointment => {
-            const searchFields = [
-                appointment.patient.name,
-                appointment.patient.phone,
-                appointment.doctor.name,
-                appointment.doctor.phone
-            ];
-
-            return searchFields.some(field =>
-                field?.toLowerCase().includes(searchTerm.toLowerCase())
-            );
-        });
-
-        if (!filteredAppointments.length) {
+        if (!appointments.length) {
             return (
                 <TableRow>
                     <TableCell colSpan={8} align="center">
@@ -177,8 +130,7 @@ const Supporter = () => {
             );
         }
 
-        return filteredAppointments
-            .slice(page * rowsPerPage, page * rowsPerPage + rowsPerPage)
+        return appointments
             .map((appointment, index) => (
                 <TableRow
                     key={index}
@@ -324,47 +276,52 @@ const Supporter = () => {
         }
     };
 
-    // Search handler
+    // Search handler (tìm kiếm phía server theo tên/số điện thoại bệnh nhân)
     const handleSearch = (event: React.ChangeEvent<HTMLInputElement>) => {
         setSearchTerm(event.target.value);
-        setPage(0);
     };
 
     // Status filter handler
     const handleStatusFilter = (status: string | null) => {
         setSelectedStatus(status);
+        setCursors([null]);
         setPage(0);
     };
 
-    // Page change handler
+    // Page change handler (chỉ đi tới trang đã biết cursor)
     const handleChangePage = (_: unknown, newPage: number) => {
+        if (newPage > page && !cursors[newPage]) return;
         setPage(newPage);
     };
 
     // Rows per page change handler
     const handleChangeRowsPerPage = (event: React.ChangeEvent<HTMLInputElement>) => {
         setRowsPerPage(parseInt(event.target.value, 10));
+        setCursors([null]);
         setPage(0);
     };
 
-    // Fetch data
-    const fetchData = async () => {
+    // Fetch data: số lượng theo trạng thái + một trang lịch hẹn
+    const fetchData = async (targetPage: number = page) => {
         try {
-            const response = await callGetPatientForSupporter();
+            const response = await callGetSupporterQueue({
+                status: selectedStatus ? STATUS_TO_SERVER[selectedStatus] : undefined,
+                q: query || undefined,
+                cursor: cursors[targetPage] ?? undefined,
+                limit: rowsPerPage,
+            });
 
             if (response?.data) {
-                const formattedData = {
-                    Pending: {
-                        patients: response.data.Pending?.patients || []
-                    },
-                    Accept: {
-                        patients: response.data.Accept?.patients || []
-                    },
-                    Reject: {
-                        patients: response.data.Reject?.patients || []
-                    }
-                };
-                setData(formattedData);
+                setCounts(response.data.counts);
+                setAppointments(response.data.items.map((item: any) => ({
+                    ...item,
+                    status: STATUS_FROM_SERVER[item.status]
+                })));
+                setCursors(prev => {
+                    const next = prev.slice(0, targetPage + 1);
+                    next[targetPage + 1] = response.data.nextCursor;
+                    return next;
+                });
             } else {
                 toast.error('Dữ liệu không hợp lệ');
             }
@@ -376,10 +333,39 @@ const Supporter = () => {
     };
 
     useEffect(() => {
+        fetchData(page);
+    }, [page, rowsPerPage, selectedStatus, query, refreshKey]);
 
-        fetchData();
+    // Nhận lịch hẹn mới/thay đổi trạng thái theo thời gian thực thay vì phải tải lại trang
+    useEffect(() => {
+        let timer: ReturnType<typeof setTimeout> | undefined;
+        const unsubscribe = subscribeSupporterEvents((event) => {
+            if (event.type === 'booking_created') {
+                toast.info('Có lịch hẹn mới');
+            }
+            // Gộp nhiều event liên tiếp thành một lần tải lại
+            clearTimeout(timer);
+            timer = setTimeout(() => setRefreshKey(key => key + 1), 300);
+        });
+        return () => {
+            clearTimeout(timer);
+            unsubscribe();
+        };
     }, []);
 
+    // Chờ người dùng gõ xong rồi mới tìm kiếm phía server
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            if (searchTerm.trim() === query) return;
+            setQuery(searchTerm.trim());
+            setCursors([null]);
+            setPage(0);
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    const totalCount = counts.Pending + counts.Accept + counts.Reject + counts.Done;
+
     // Delete handler
     const handleDelete = async () => {
         if (!selectedAppointment) return;
@@ -564,7 +550,7 @@ const Supporter = () => {
                     borderBottom: '1px solid rgba(224, 224, 224, 1)'
                 }}>
                     <TextField
-                        placeholder="Tìm kiếm theo tên, số điện thoại..."
+                        placeholder="Tìm theo tên hoặc số điện thoại bệnh nhân..."
                         variant="outlined"
                         size="small"
                         fullWidth
@@ -587,28 +573,28 @@ const Supporter = () => {
                         justifyContent: { xs: 'flex-start', sm: 'flex-end' }
                     }}>
                         <Chip
-                            label={`Tất cả (${transformAppointments().length})`}
+                            label={`Tất cả (${totalCount})`}
                             color={selectedStatus === null ? 'primary' : 'default'}
                             onClick={() => handleStatusFilter(null)}
                             variant={selectedStatus === null ? 'filled' : 'outlined'}
                             sx={{ '&:hover': { opacity: 0.8 } }}
                         />
                         <Chip
-                            label={`Chờ xác nhận (${data?.Pending?.patients?.length || 0})`}
+                            label={`Chờ xác nhận (${counts.Pending})`}
                             color={selectedStatus === 'pending' ? 'warning' : 'default'}
                             onClick={() => handleStatusFilter('pending')}
                             variant={selectedStatus === 'pending' ? 'filled' : 'outlined'}
                             sx={{ '&:hover': { opacity: 0.8 } }}
                         />
                         <Chip
-                            label={`Đã xác nhận (${data?.Accept?.patients?.length || 0})`}
+                            label={`Đã xác nhận (${counts.Accept})`}
                             color={selectedStatus === 'confirmed' ? 'success' : 'default'}
                             onClick={() => handleStatusFilter('confirmed')}
                             variant={selectedStatus === 'confirmed' ? 'filled' : 'outlined'}
                             sx={{ '&:hover': { opacity: 0.8 } }}
                         />
                         <Chip
-                            label={`Đã hủy (${data?.Reject?.patients?.length || 0})`}
+                            label={`Đã hủy (${counts.Reject})`}
                             color={selectedStatus === 'cancelled' ? 'error' : 'default'}
                             onClick={() => handleStatusFilter('cancelled')}
                             variant={selectedStatus === 'cancelled' ? 'filled' : 'outlined'}
@@ -654,12 +640,8 @@ const Supporter = () => {
                 <TablePagination
                     component="div"
                     count={selectedStatus === null
-                        ? transformAppointments().length
-                        : selectedStatus === 'pending'
-                            ? data?.Pending?.patients?.length || 0
-                            : selectedStatus === 'confirmed'
-                                ? data?.Accept?.patients?.length || 0
-                                : data?.Reject?.patients?.length || 0
+                        ? totalCount
+                        : counts[STATUS_TO_SERVER[selectedStatus] as keyof QueueCounts]
                     }
                     page={page}
                     onPageChange={handleChangePage}
@@ -669,7 +651,6 @@ const Supporter = () => {
                     labelRowsPerPage="Số hàng mỗi trang:"
                     labelDisplayedRows={({ from, to, count }) => `${from}-${to} trên ${count}`}
                     showFirstButton
-                    showLastButton
                     sx={{
                         borderTop: '1px solid rgba(224, 224, 224, 1)',
                         '.MuiTablePagination-selectLabel': {
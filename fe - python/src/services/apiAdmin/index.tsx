@@ -53,8 +53,17 @@ export const callUploadImgSpecialty = (fileImg: any) => {
     })
 }
 
-export const callGetAllUsers = () => {
-    return axios.get('/api/v1/users');
+export interface GetUsersParams {
+    cursor?: string;
+    limit?: number;
+    roleId?: number;
+    clinicId?: string;
+    specializationId?: string;
+    q?: string;
+}
+
+export const callGetAllUsers = (params: GetUsersParams = {}) => {
+    return axios.get('/api/v1/users', { params });
 }
 
 
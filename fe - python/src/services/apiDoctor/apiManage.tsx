@@ -8,6 +8,23 @@ export const callCreateSchedule = (startTime: string, endTime: string, price: nu
     return axios.post(`/api/v1/schedules`, { startTime, endTime, price, maxBooking })
 }
 
+export interface ScheduleTemplate {
+    dateFrom: string;
+    dateTo: string;
+    weekdays: number[]; // 1 = Thứ hai ... 7 = Chủ nhật
+    startTime: string; // "HH:mm", giờ Việt Nam
+    endTime: string;
+    slotMinutes: number;
+    price: number;
+    maxBooking: number;
+    skipConflicts?: boolean;
+}
+
+// Tạo hàng loạt lịch khám lặp lại theo tuần trong một request
+export const callCreateScheduleTemplate = (template: ScheduleTemplate) => {
+    return axios.post(`/api/v1/schedules/template`, template)
+}
+
 export const callUpdateSchedule = (
     id: string,
     startTime: string,
@@ -1,5 +1,10 @@
 import axios from "../../utils/axiosCustomize";
 
+// Chuyên khoa, phòng khám và bác sĩ cho trang chủ trong một request (có ETag)
+export const callHome = () => {
+    return axios.get(`/api/v1/home`)
+}
+
 export const callAllSpecialities = () => {
     return axios.get(`/api/v1/specialty`)
 }
@@ -28,6 +33,11 @@ export const callSchedulesByDoctorId = (id: any) => {
     return axios.get(`/api/v1/schedules/${id}`)
 }
 
+// Lịch trống của nhiều bác sĩ trong một request, nhóm theo doctorId
+export const callAvailability = (doctorIds: string[], limit?: number) => {
+    return axios.get(`/api/v1/schedules/availability`, { params: { doctorIds: doctorIds.join(','), limit } })
+}
+
 export const callCreateSchedule = (scheduleId: string, name: string, phone: string, email: string, gender: string, address: string, description: string) => {
     return axios.post(`/api/v1/patient`, { scheduleId, name, phone, email, gender, address, description })
 }
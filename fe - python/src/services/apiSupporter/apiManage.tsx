@@ -5,6 +5,20 @@ export const callGetPatientForSupporter = () => {
     return axios.get("/api/v1/schedules/supporter");
 }
 
+export interface SupporterQueueParams {
+    status?: string;
+    dateFrom?: string;
+    dateTo?: string;
+    doctorId?: string;
+    q?: string;
+    cursor?: string;
+    limit?: number;
+}
+
+export const callGetSupporterQueue = (params: SupporterQueueParams = {}) => {
+    return axios.get("/api/v1/schedules/supporter/queue", { params });
+}
+
 
 export const callUpdateAppointmentStatus = (scheduleId: string, patientId: string, status: string) => {
     return axios.put(`/api/v1/schedules/change-status`, { scheduleId, patientId, status });
@@ -12,4 +26,53 @@ export const callUpdateAppointmentStatus = (scheduleId: string, patientId: strin
 
 export const callDeleteAppointment = (schedulesId: string, patientId: string) => {
     return axios.delete(`/api/v1/schedules/${schedulesId}/${patientId}`);
-}; 
\ No newline at end of file
+}; 
+
+export interface BookingEvent {
+    type: 'booking_created' | 'status_changed' | 'booking_deleted' | 'resync';
+    scheduleId?: string;
+    patientId?: string;
+    status?: string;
+}
+
+// SSE qua fetch (EventSource không gửi được header Authorization), tự kết nối lại khi mất kết nối
+export const subscribeSupporterEvents = (onEvent: (event: BookingEvent) => void) => {
+    const controller = new AbortController();
+
+    const connect = async () => {
+        while (!controller.signal.aborted) {
+            try {
+                const response = await fetch(`${import.meta.env.VITE_BACKEND_URL}/api/v1/schedules/supporter/events`, {
+                    headers: { Authorization: `Bearer ${localStorage.getItem("access_token")}` },
+                    credentials: 'include',
+                    signal: controller.signal,
+                });
+                if (!response.ok || !response.body) throw new Error(`SSE ${response.status}`);
+
+                const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += value;
+                    const messages = buffer.split('\n\n');
+                    buffer = messages.pop() || '';
+                    for (const message of messages) {
+                        const data = message
+                            .split('\n')
+                            .filter(line => line.startsWith('data: '))
+                            .map(line => line.slice(6))
+                            .join('\n');
+                        if (data) onEvent(JSON.parse(data));
+                    }
+                }
+            } catch (error) {
+                if (controller.signal.aborted) return;
+            }
+            await new Promise(resolve => setTimeout(resolve, 3000));
+        }
+    };
+
+    connect();
+    return () => controller.abort();
+}
@@ -0,0 +1,6 @@
+export type ImageDirectory = 'clinics' | 'specializations' | 'users';
+export type ImageSize = 'thumb' | 'card' | 'large' | 'original';
+
+// Ảnh được resize và chuyển sang AVIF/WebP ở backend (/api/v1/media)
+export const imageUrl = (directory: ImageDirectory, fileName: string, size: ImageSize = 'card') =>
+    `${import.meta.env.VITE_BACKEND_URL}/api/v1/media/${directory}/${fileName}?size=${size}`;